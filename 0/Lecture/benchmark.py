@@ -0,0 +1,95 @@
+import sys
+import os
+import io
+import json
+import argparse
+import contextlib
+import resource
+import subprocess
+import tempfile
+import importlib.util
+
+from maze import Maze
+from generate import generate
+
+# Solver benchmark: generates mazes of growing size (generate.py) and solves each with every strategy,
+# reporting states explored, solve time and the peak memory of the process.
+#   - Each (maze, strategy) runs in its own fresh Python process, so peak RSS is that solver's alone
+#     and a runaway strategy can be stopped by --timeout without losing the rest of the table.
+#   - "wavefront" is gridmaze.GridMaze (NumPy BFS), included when numpy is installed.
+
+
+def strategies():
+    available = list(Maze.STRATEGIES)
+    if importlib.util.find_spec("numpy") is not None:
+        available.append("wavefront")
+    return available
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process, in MiB (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def run_one(strategy, filename):
+    """Solves one maze with one strategy (in this process); returns the stats as a dict."""
+    if strategy == "wavefront":
+        from gridmaze import GridMaze
+        m = GridMaze(filename)
+    else:
+        with contextlib.redirect_stdout(io.StringIO()): # Maze.__init__ prints the whole file
+            m = Maze(filename)
+    try:
+        m.solve() if strategy == "wavefront" else m.solve(strategy)
+        length = len(m.solution[1])
+    except Exception:
+        length = None
+    return {"explored": m.num_explored, "length": length, "seconds": m.elapsed, "peak_mb": peak_rss_mb()}
+
+
+def run_child(strategy, filename, timeout):
+    """run_one in a fresh interpreter; None if it timed out or crashed (e.g. out of memory)."""
+    command = [sys.executable, os.path.abspath(__file__), "--run", strategy, filename]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return None
+    if result.returncode != 0:
+        return None
+    return json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(usage="python benchmark.py [--sizes N,N,...] [--mode {backtracker,random}] [--strategies S,S,...]")
+    parser.add_argument("--sizes", default="10,100,500,1000,2000,5000", help="maze sizes (height = width, in characters)")
+    parser.add_argument("--mode", default="backtracker", choices=["backtracker", "random"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--loops", type=float, default=0.0, help="backtracker mode: extra wall removal probability")
+    parser.add_argument("--density", type=float, default=0.3, help="random mode: wall probability")
+    parser.add_argument("--strategies", default=",".join(strategies()))
+    parser.add_argument("--timeout", type=float, default=600, help="seconds before a run is abandoned")
+    parser.add_argument("--run", nargs=2, metavar=("STRATEGY", "MAZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_one(*args.run)))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'size':>6} {'strategy':<10} {'explored':>10} {'length':>8} {'seconds':>9} {'peak MiB':>9}")
+        for size in (int(size) for size in args.sizes.split(",")):
+            filename = os.path.join(directory, f"maze{size}.txt")
+            generate(filename, size, size, args.mode, args.seed, args.density, args.loops)
+            for strategy in args.strategies.split(","):
+                stats = run_child(strategy, filename, args.timeout)
+                if stats is None:
+                    print(f"{size:>6} {strategy:<10} {'timed out / failed':>38}")
+                    continue
+                length = "-" if stats["length"] is None else stats["length"]
+                print(f"{size:>6} {strategy:<10} {stats['explored']:>10} {length:>8} {stats['seconds']:>9.3f} {stats['peak_mb']:>9.1f}")
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import sys
+import argparse
+import random
+
+# Maze generator: writes the text format Maze.__init__ reads ("#" wall, " " open, A start, B goal, 1-9 weighted cell)
+#   backtracker: recursive-backtracker (randomized depth-first) "perfect" maze: long corridors, exactly one
+#                path between any two cells. --loops knocks out extra walls to add cycles / open areas.
+#   random:      every cell is a wall with probability --density, plus a random monotone path
+#                carved from A (top left) to B (bottom right) so there is always a solution.
+# Same arguments + seed always give the same maze.
+
+
+def backtracker(height, width, rng, loops=0.0):
+    """Rows of a (height x width character) perfect maze: cells at odd coordinates, carved depth-first."""
+    rows, cols = (height - 1) // 2, (width - 1) // 2
+    if rows < 1 or cols < 1 or rows * cols < 2:
+        raise ValueError("backtracker mazes need at least 2 cells (3x5 or 5x3 characters) so A and B differ")
+    grid = [bytearray(b"#" * width) for _ in range(height)]
+    visited = bytearray(rows * cols)
+    visited[0] = 1
+    grid[1][1] = ord(" ")
+    stack = [0]
+    while stack:
+        cell = stack[-1]
+        r, c = divmod(cell, cols)
+        # Unvisited neighboring cells (up, down, left, right)
+        options = []
+        if r > 0 and not visited[cell - cols]:
+            options.append(cell - cols)
+        if r < rows - 1 and not visited[cell + cols]:
+            options.append(cell + cols)
+        if c > 0 and not visited[cell - 1]:
+            options.append(cell - 1)
+        if c < cols - 1 and not visited[cell + 1]:
+            options.append(cell + 1)
+        if not options:
+            stack.pop()
+            continue
+        following = rng.choice(options)
+        visited[following] = 1
+        nr, nc = divmod(following, cols)
+        # Open the next cell and the wall between
+        grid[2 * nr + 1][2 * nc + 1] = ord(" ")
+        grid[r + nr + 1][c + nc + 1] = ord(" ")
+        stack.append(following)
+
+    # Extra openings: any interior wall between two open cells
+    if loops > 0:
+        for i in range(1, 2 * rows):
+            for j in range(1, 2 * cols):
+                if (i + j) % 2 == 1 and grid[i][j] == ord("#") and rng.random() < loops:
+                    grid[i][j] = ord(" ")
+    grid[1][1] = ord("A")
+    grid[2 * rows - 1][2 * cols - 1] = ord("B")
+    return grid
+
+
+def random_walls(height, width, rng, density=0.3):
+    """Rows of a maze with random walls and a carved monotone A -> B path."""
+    if height < 1 or width < 1 or height * width < 2:
+        raise ValueError("random mazes need at least 2 characters (1x2 or 2x1) so A and B differ")
+    wall, space = ord("#"), ord(" ")
+    grid = [bytearray(wall if rng.random() < density else space for _ in range(width)) for _ in range(height)]
+    r = c = 0
+    grid[0][0] = ord("A")
+    while (r, c) != (height - 1, width - 1):
+        if c == width - 1 or (r < height - 1 and rng.random() < 0.5):
+            r += 1
+        else:
+            c += 1
+        grid[r][c] = space
+    grid[height - 1][width - 1] = ord("B")
+    return grid
+
+
+def add_weights(grid, rng, fraction):
+    """Turns a fraction of the open cells into weighted cells (digits 2-9)."""
+    for row in grid:
+        for j, char in enumerate(row):
+            if char == ord(" ") and rng.random() < fraction:
+                row[j] = ord(str(rng.randint(2, 9)))
+
+
+def generate(filename, height, width, mode="backtracker", seed=0, density=0.3, loops=0.0, weights=0.0):
+    rng = random.Random(seed)
+    if mode == "backtracker":
+        grid = backtracker(height, width, rng, loops)
+    elif mode == "random":
+        grid = random_walls(height, width, rng, density)
+    else:
+        raise ValueError(f"unknown mode: {mode}")
+    if weights > 0:
+        add_weights(grid, rng, weights)
+    with open(filename, "wb") as f:
+        for row in grid:
+            f.write(row + b"\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(usage="python generate.py maze.txt height width [--mode {backtracker,random}] [--seed S]")
+    parser.add_argument("filename")
+    parser.add_argument("height", type=int)
+    parser.add_argument("width", type=int)
+    parser.add_argument("--mode", default="backtracker", choices=["backtracker", "random"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--density", type=float, default=0.3, help="random mode: wall probability")
+    parser.add_argument("--loops", type=float, default=0.0, help="backtracker mode: extra wall removal probability")
+    parser.add_argument("--weights", type=float, default=0.0, help="fraction of open cells given a 2-9 weight")
+    args = parser.parse_args()
+    try:
+        generate(args.filename, args.height, args.width, args.mode, args.seed, args.density, args.loops, args.weights)
+    except ValueError as e:
+        sys.exit(str(e))
+    print(f"Wrote {args.height}x{args.width} {args.mode} maze to {args.filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import sys
+import argparse
+import time
+
+import numpy as np
+
+# Moves in the same order as Maze.neighbors, as (action, row step, col step)
+MOVES = [("up", -1, 0), ("down", 1, 0), ("left", 0, -1), ("right", 0, 1)]
+
+
+class GridMaze():
+    # Same maze files and solution format as maze.Maze, but the grid is a NumPy boolean array
+    # and BFS runs as a vectorized wavefront: no Node objects, no per-cell Python calls.
+    #   - The grid is padded with a border of walls and flattened, so the 4 neighbors of cell i
+    #     are just i - w, i + w, i - 1, i + 1 (w = padded width): one shifted copy of the frontier each.
+    #   - dist[i] is the BFS distance from the start (-1 until reached); the path is recovered by
+    #     stepping down the distance field from the goal.
+
+    def __init__(self, filename):
+
+        # Read the file as bytes: one row of the char grid per line (short lines are padded with spaces)
+        with open(filename, "rb") as f:
+            lines = f.read().splitlines()
+        self.height = len(lines)
+        self.width = max(len(line) for line in lines)
+        chars = np.full((self.height, self.width), ord(" "), dtype=np.uint8)
+        for i, line in enumerate(lines):
+            chars[i, :len(line)] = np.frombuffer(line, dtype=np.uint8)
+
+        # Validate start and goal
+        starts, goals = np.argwhere(chars == ord("A")), np.argwhere(chars == ord("B"))
+        if len(starts) != 1:
+            raise Exception("maze must have exactly one start point")
+        if len(goals) != 1:
+            raise Exception("maze must have exactly one goal")
+        self.start, self.goal = tuple(int(x) for x in starts[0]), tuple(int(x) for x in goals[0])
+
+        # Walls: anything but A, B, space or a cell weight 1-9 (weights are ignored: BFS counts steps)
+        open_chars = np.frombuffer(b" AB123456789", dtype=np.uint8)
+        self.walls = ~np.isin(chars, open_chars)
+
+        self.solution = None
+        self.explored = None # boolean array: cells expanded before reaching the goal
+
+
+    def solve(self):
+        """Finds a shortest solution (fewest steps) to the maze, if one exists."""
+        started = time.perf_counter()
+        w = self.width + 2
+        open_cells = np.pad(~self.walls, 1, constant_values=False).ravel()
+        shifts = np.array([dr * w + dc for _, dr, dc in MOVES])
+        start = (self.start[0] + 1) * w + self.start[1] + 1
+        goal = (self.goal[0] + 1) * w + self.goal[1] + 1
+
+        # Wavefront: each round, every frontier cell's open, unreached neighbors become the next frontier
+        dist = np.full(open_cells.size, -1, dtype=np.int32)
+        dist[start] = 0
+        owner = np.empty(open_cells.size, dtype=np.int32) # scratch: first position of each candidate cell
+        frontier = np.array([start])
+        depth = 0
+        while frontier.size and dist[goal] < 0:
+            depth += 1
+            candidates = (frontier[:, None] + shifts).ravel()
+            candidates = candidates[open_cells[candidates] & (dist[candidates] < 0)]
+            # Drop duplicates (cells reached from two frontier cells) without sorting, keeping each cell's first
+            # occurrence in candidate order (the order Maze.solve("bfs")'s queue would hold them): np.minimum.at
+            # is unbuffered, so a cell listed twice gets the smaller position, by definition, not write order
+            positions = np.arange(candidates.size, dtype=np.int32)
+            owner[candidates] = candidates.size
+            np.minimum.at(owner, candidates, positions)
+            frontier = candidates[owner[candidates] == positions]
+            dist[frontier] = depth
+
+        # Explored like Maze.solve("bfs"): every layer before the goal's, then the goal's layer up to the goal
+        if dist[goal] < 0:
+            explored = dist >= 0
+        else:
+            explored = (dist >= 0) & (dist < depth)
+            explored[frontier[:np.flatnonzero(frontier == goal)[0]]] = True
+        self.explored = explored.reshape(self.height + 2, w)[1:-1, 1:-1]
+        self.num_explored = int(np.count_nonzero(explored)) + (dist[goal] >= 0) # + the goal itself
+        if dist[goal] < 0:
+            self.elapsed = time.perf_counter() - started
+            raise Exception("no solution")
+
+        # Walk back from the goal, always to a neighbor one step closer to the start
+        actions = []
+        cells = []
+        cell = goal
+        while cell != start:
+            for (action, dr, dc), shift in zip(MOVES, shifts):
+                previous = cell - shift
+                if dist[previous] == dist[cell] - 1:
+                    actions.append(action)
+                    cells.append((int(cell // w) - 1, int(cell % w) - 1))
+                    cell = previous
+                    break
+        actions.reverse()
+        cells.reverse()
+        self.solution = (actions, cells)
+        self.elapsed = time.perf_counter() - started
+
+
+    def output_image(self, filename, show_solution=True, show_explored=False, cell_size=50, cell_border=2):
+        """Draws the maze as a PNG (see render.py)."""
+        from render import output_image
+        output_image(self, filename, show_solution, show_explored, cell_size, cell_border)
+
+
+def main():
+    parser = argparse.ArgumentParser(usage="python gridmaze.py maze.txt [--image maze.png [--cell-size N]]")
+    parser.add_argument("maze")
+    parser.add_argument("--image", help="write the solved maze to this PNG")
+    parser.add_argument("--cell-size", type=int, default=4, help="pixels per cell in the image")
+    args = parser.parse_args()
+
+    m = GridMaze(args.maze)
+    print(f"Maze: {m.height}x{m.width}")
+    print("Solving...")
+    try:
+        m.solve()
+    except Exception as e:
+        sys.exit(str(e))
+    print("States Explored:", m.num_explored)
+    print("Solution length:", len(m.solution[1]))
+    print(f"Time: {m.elapsed:.4f}s")
+    if args.image:
+        m.output_image(args.image, show_explored=True, cell_size=args.cell_size, cell_border=0)
+
+
+if __name__ == "__main__":
+    main()
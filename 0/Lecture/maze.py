@@ -1,21 +1,28 @@
-import sys
+import argparse
+import heapq
+import time
+from collections import deque
 
 class Node():
-    def __init__(self, state, parent, action):
+    def __init__(self, state, parent, action, cost=0):
         self.state = state
         self.parent = parent
         self.action = action
+        self.cost = cost # path cost from the start (sum of the cells' costs)
 
 
 class StackFrontier():
+    # deque + per-state counts: add/remove/contains_state are all O(1)
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -24,10 +31,17 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.forget(node)
             return node
 
+    def forget(self, node):
+        count = self.states[node.state]
+        if count == 1:
+            del self.states[node.state]
+        else:
+            self.states[node.state] = count - 1
+
 
 class QueueFrontier(StackFrontier):
 
@@ -35,12 +49,52 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.forget(node)
             return node
 
+
+class PriorityFrontier():
+    # heapq of (priority, insertion count, node): remove() returns the lowest priority first (ties: first added).
+    # Re-adding a state (cheaper path found) leaves its old entry in the heap; it's skipped when popped.
+    def __init__(self):
+        self.frontier = []
+        self.nodes = {} # state -> its live node
+        self.count = 0
+
+    def add(self, node, priority=0):
+        heapq.heappush(self.frontier, (priority, self.count, node))
+        self.nodes[node.state] = node
+        self.count += 1
+
+    def contains_state(self, state):
+        return state in self.nodes
+
+    def get(self, state):
+        return self.nodes.get(state)
+
+    def empty(self):
+        return len(self.nodes) == 0
+
+    def remove(self):
+        while self.frontier:
+            node = heapq.heappop(self.frontier)[2]
+            if self.nodes.get(node.state) is node:
+                del self.nodes[node.state]
+                return node
+        raise Exception("empty frontier")
+
+
 class Maze():
 
+    # Search strategies for solve():
+    #   dfs, bfs: uninformed (stack / queue frontier); bfs is optimal only when every cell costs 1
+    #   ucs:      uniform-cost search (Dijkstra): cheapest path, cell costs included
+    #   greedy:   greedy best-first on the Manhattan distance to the goal: fast, not optimal
+    #   astar:    A* on path cost + Manhattan distance: optimal, explores far less than ucs
+    #   jps:      Jump Point Search: A* that only expands jump points (uniform-cost mazes only, see solve_jps)
+    STRATEGIES = ("dfs", "bfs", "ucs", "greedy", "astar", "jps")
+
     def __init__(self, filename):
 
         # Read file and set height and width of maze
@@ -59,7 +113,8 @@ class Maze():
         self.height = len(contents)
         self.width = max(len(line) for line in contents)
 
-        # Keep track of walls
+        # Keep track of walls (and of weighted cells: a digit 1-9 is an open cell that costs that much to enter)
+        self.costs = {}
         self.walls = []
         for i in range(self.height):
             row = []
@@ -73,6 +128,9 @@ class Maze():
                         row.append(False)
                     elif contents[i][j] == " ":
                         row.append(False)
+                    elif contents[i][j] in "123456789":
+                        self.costs[(i, j)] = int(contents[i][j])
+                        row.append(False)
                     else:
                         row.append(True)
                 except IndexError:
@@ -117,18 +175,49 @@ class Maze():
         return result
 
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
+    def cost(self, state):
+        """Cost of moving into a cell (1 unless the maze gives it a digit weight)."""
+        return self.costs.get(state, 1)
+
+
+    def manhattan(self, state):
+        """Manhattan distance to the goal: admissible and consistent, every move costs at least 1."""
+        return abs(state[0] - self.goal[0]) + abs(state[1] - self.goal[1])
+
+
+    def priority(self, strategy, node):
+        """Frontier ordering of node for the priority-queue strategies (lowest first)."""
+        if strategy == "ucs":
+            return node.cost
+        h = self.manhattan(node.state)
+        if strategy == "greedy":
+            return h
+        return (node.cost + h, h) # astar: f = g + h, ties to the node nearer the goal
+
+
+    def solve(self, strategy="dfs"):
+        """Finds a solution to maze, if one exists (see STRATEGIES); sets num_explored and elapsed seconds."""
+
+        if strategy == "jps":
+            return self.solve_jps()
 
         # Keep track of number of states explored
         self.num_explored = 0
+        started = time.perf_counter()
 
         # Initialize frontier to just the starting position
         start = Node(state=self.start, parent=None, action=None)
 
-        """ Toggle Search Strategy here: """
-      # frontier = QueueFrontier        #-->(BFS uses Queue: first-in, first-out)
-        frontier = StackFrontier()      #-->(DFS uses Stack as data structure)
+        """ Search Strategy: """
+        if strategy == "dfs":
+            frontier = StackFrontier()      #-->(DFS uses Stack as data structure)
+        elif strategy == "bfs":
+            frontier = QueueFrontier()      #-->(BFS uses Queue: first-in, first-out)
+        elif strategy in ("ucs", "greedy", "astar"):
+            frontier = PriorityFrontier()   #-->(lowest cost / heuristic / cost + heuristic first)
+        else:
+            raise ValueError(f"unknown strategy: {strategy}")
+        informed = isinstance(frontier, PriorityFrontier)
         """ * * * * * * * * * * * * * *  """
 
         frontier.add(start)
@@ -141,6 +230,7 @@ class Maze():
 
             # If nothing left in frontier, then no path
             if frontier.empty():
+                self.elapsed = time.perf_counter() - started
                 raise Exception("no solution") #--No possible solution! No more forks to check.
 
             # Choose a node from the frontier
@@ -160,6 +250,7 @@ class Maze():
                 actions.reverse()
                 cells.reverse()
                 self.solution = (actions, cells)
+                self.elapsed = time.perf_counter() - started
                 return
 
             # Mark node as explored
@@ -167,72 +258,169 @@ class Maze():
 
             # Add neighbors to frontier
             for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
-                    child = Node(state=state, parent=node, action=action)
+                if informed:
+                    # Queue the neighbor unless it's already queued at least as cheaply
+                    cost = node.cost + self.cost(state)
+                    queued = frontier.get(state)
+                    if state not in self.explored and (queued is None or cost < queued.cost):
+                        child = Node(state=state, parent=node, action=action, cost=cost)
+                        frontier.add(child, self.priority(strategy, child))
+                elif not frontier.contains_state(state) and state not in self.explored:
+                    child = Node(state=state, parent=node, action=action, cost=node.cost + self.cost(state))
                     frontier.add(child)
 
 
-    def output_image(self, filename, show_solution=True, show_explored=False):
-        from PIL import Image, ImageDraw
-        cell_size = 50
-        cell_border = 2
+    def solve_jps(self):
+        """
+        Jump Point Search for 4-connected, uniform-cost mazes (JPS4): A* over "jump points" only.
+        Shortest paths are taken in a canonical order (a horizontal move may turn vertical at any cell,
+        a vertical move only turns horizontal where it has to), which prunes all the symmetric ones:
+          - Horizontal jumps stop at the goal or at a cell whose vertical jump finds something.
+          - Vertical jumps stop at the goal or at a forced neighbor: side cell open, side-behind blocked.
+        Runs of plain cells are scanned, not queued, so num_explored counts only expanded jump points.
+        """
+        if self.costs:
+            raise ValueError("jump point search needs a uniform-cost maze (no weighted cells)")
+        self.num_explored = 0
+        started = time.perf_counter()
 
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size, self.height * cell_size),
-            "black"
-        )
-        draw = ImageDraw.Draw(img)
+        # A Node's action here is the direction (row step, col step) of the jump that reached it
+        start = Node(state=self.start, parent=None, action=None)
+        frontier = PriorityFrontier()
+        frontier.add(start, self.manhattan(self.start))
+        self.explored = set()
 
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
+        while True:
+            if frontier.empty():
+                self.elapsed = time.perf_counter() - started
+                raise Exception("no solution")
 
-                # Walls
-                if col:
-                    fill = (40, 40, 40)
+            node = frontier.remove()
+            self.num_explored += 1
 
-                # Start
-                elif (i, j) == self.start:
-                    fill = (255, 0, 0)
+            if node.state == self.goal:
+                self.solution = self.unpack_jumps(node)
+                self.elapsed = time.perf_counter() - started
+                return
 
-                # Goal
-                elif (i, j) == self.goal:
-                    fill = (0, 171, 28)
+            self.explored.add(node.state)
 
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
+            for direction in self.jump_directions(node):
+                state = self.jump(node.state, direction)
+                if state is None or state in self.explored:
+                    continue
+                cost = node.cost + abs(state[0] - node.state[0]) + abs(state[1] - node.state[1])
+                queued = frontier.get(state)
+                if queued is None or cost < queued.cost:
+                    child = Node(state=state, parent=node, action=direction, cost=cost)
+                    frontier.add(child, self.priority("astar", child))
+
+
+    def is_open(self, row, col):
+        return 0 <= row < self.height and 0 <= col < self.width and not self.walls[row][col]
+
+
+    def jump_directions(self, node):
+        """Directions worth jumping in from a jump point, given how it was reached."""
+        row, col = node.state
+        if node.action is None:
+            return [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        dr, dc = node.action
+        if dr == 0:
+            # Moving horizontally: keep going, or turn up/down
+            return [(0, dc), (-1, 0), (1, 0)]
+        # Moving vertically: keep going, and turn only towards forced neighbors
+        directions = [(dr, 0)]
+        for side in (-1, 1):
+            if self.is_open(row, col + side) and not self.is_open(row - dr, col + side):
+                directions.append((0, side))
+        return directions
+
+
+    def jump(self, state, direction):
+        """The next jump point from state in direction, or None if it runs into a wall."""
+        row, col = state
+        dr, dc = direction
+        if dr != 0:
+            return self.jump_vertical(row, col, dr)
+        while True:
+            col += dc
+            if not self.is_open(row, col):
+                return None
+            if (row, col) == self.goal:
+                return (row, col)
+            if self.jump_vertical(row, col, -1) is not None or self.jump_vertical(row, col, 1) is not None:
+                return (row, col)
 
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
 
-                # Empty cell
-                else:
-                    fill = (237, 240, 252)
-
-                # Draw cell
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
-                )
-
-        img.save(filename)
-
-
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
-
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-#--Comment out show_explored=True to show only solution, not paths taken:
-m.output_image("maze.png", show_explored=True)
+    def jump_vertical(self, row, col, dr):
+        while True:
+            row += dr
+            if not self.is_open(row, col):
+                return None
+            if (row, col) == self.goal:
+                return (row, col)
+            for side in (-1, 1):
+                if self.is_open(row, col + side) and not self.is_open(row - dr, col + side):
+                    return (row, col)
+
+
+    def unpack_jumps(self, node):
+        """(actions, cells) solution: every cell along the straight segments between jump points."""
+        names = {(-1, 0): "up", (1, 0): "down", (0, -1): "left", (0, 1): "right"}
+        actions = []
+        cells = []
+        while node.parent is not None:
+            dr, dc = node.action
+            row, col = node.state
+            while (row, col) != node.parent.state:
+                actions.append(names[(dr, dc)])
+                cells.append((row, col))
+                row, col = row - dr, col - dc
+            node = node.parent
+        actions.reverse()
+        cells.reverse()
+        return (actions, cells)
+
+
+    def output_image(self, filename, show_solution=True, show_explored=False, cell_size=50, cell_border=2):
+        """Draws the maze as a PNG (vectorized, written in strips: see render.py)."""
+        from render import output_image
+        output_image(self, filename, show_solution, show_explored, cell_size, cell_border)
+
+
+def main():
+    parser = argparse.ArgumentParser(usage="python maze.py maze.txt [--strategy {dfs,bfs,ucs,greedy,astar,jps,all}]")
+    parser.add_argument("maze")
+    parser.add_argument("--strategy", default="dfs", choices=Maze.STRATEGIES + ("all",),
+                        help="search strategy, or all to compare them")
+    args = parser.parse_args()
+
+    m = Maze(args.maze)
+    print("Maze:")
+    m.print()
+    if args.strategy == "all":
+        print(f"{'strategy':<8} {'explored':>9} {'length':>7} {'cost':>6} {'seconds':>9}")
+        for strategy in Maze.STRATEGIES:
+            if strategy == "jps" and m.costs:
+                continue
+            try:
+                m.solve(strategy)
+            except Exception:
+                print(f"{strategy:<8} {m.num_explored:>9} {'no solution':>24}")
+                continue
+            cost = sum(m.cost(cell) for cell in m.solution[1])
+            print(f"{strategy:<8} {m.num_explored:>9} {len(m.solution[1]):>7} {cost:>6} {m.elapsed:>9.4f}")
+        return
+    print("Solving...")
+    m.solve(args.strategy)
+    print("States Explored:", m.num_explored)
+    print(f"Time: {m.elapsed:.4f}s")
+    print("Solution:")
+    m.print()
+    #--Comment out show_explored=True to show only solution, not paths taken:
+    m.output_image("maze.png", show_explored=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 
 
 
+from collections import deque
 
 
 class Node():
@@ -15,16 +16,19 @@ class StackFrontier():
     """
     Depth-First Search uses a Stack: last-in, first-out.
     - Algorithm goes as deep as possible in first direction, then returns to 2nd path (deep as possible), &c.
+    - A deque pops from either end in O(1), and counting the states in the frontier makes contains_state a hash lookup.
     """
     #
     def __init__(self):
-        self.frontier = [] # empty frontier to start
+        self.frontier = deque() # empty frontier to start
+        self.states = {} # state -> number of nodes in the frontier holding it
     #
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
     #
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
     #
     def empty(self):
         #--True if frontier is empty else False
@@ -35,11 +39,18 @@ class StackFrontier():
         if self.empty():
             raise Exception("Frontier is empty!")
         else:
-            #--Get LAST-IN node
-            node = self.frontier[-1]
-            #--Save new frontier (all minus LAST-IN)
-            self.frontier = self.frontier[:-1]
+            #--Take LAST-IN node off the frontier:
+            node = self.frontier.pop()
+            self.forget(node)
             return node
+    #
+    def forget(self, node):
+        #--One less node holding this state in the frontier:
+        count = self.states[node.state]
+        if count == 1:
+            del self.states[node.state]
+        else:
+            self.states[node.state] = count - 1
 
 
 class QueueFrontier(StackFrontier):
@@ -53,10 +64,9 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("Frontier is empty!")
         else:
-            #--Get FIRST-IN node to use next:
-            node = self.frontier[0]
-            #--Save new frontier (all minus FIRST-IN node just removed):
-            self.frontier = self.frontier[1:]
+            #--Take FIRST-IN node off the frontier to use next:
+            node = self.frontier.popleft()
+            self.forget(node)
             return node
 
 
@@ -0,0 +1,82 @@
+import zlib
+import struct
+
+import numpy as np
+
+# Maze -> PNG renderer (used by Maze.output_image and GridMaze.output_image)
+#   - One RGB color per cell, picked with boolean masks (walls, explored, solution) over the whole grid at once.
+#   - Each cell becomes a cell_size x cell_size block with a black cell_border, by repeating the colors
+#     and zeroing a precomputed border mask.
+#   - Pixels are produced and compressed a horizontal strip of cells at a time, straight into a PNG
+#     (zlib stream split into IDAT chunks), so memory is bounded by the strip, not the picture.
+
+WALL = (40, 40, 40)
+START = (255, 0, 0)
+GOAL = (0, 171, 28)
+SOLUTION = (220, 235, 113)
+EXPLORED = (212, 97, 85)
+EMPTY = (237, 240, 252)
+
+STRIP_BYTES = 32 * 2 ** 20 # pixel bytes per strip
+
+
+def cell_colors(maze, show_solution=True, show_explored=False):
+    """(height, width, 3) uint8 array: the color of every cell, same precedence as the original renderer."""
+    walls = np.asarray(maze.walls, dtype=bool)
+    colors = np.empty(walls.shape + (3,), dtype=np.uint8)
+    colors[:] = EMPTY
+    if maze.solution is not None:
+        # Lowest precedence first: each mask paints over the ones before it
+        if show_explored:
+            colors[explored_mask(maze, walls.shape)] = EXPLORED
+        if show_solution and maze.solution[1]:
+            rows, cols = zip(*maze.solution[1])
+            colors[list(rows), list(cols)] = SOLUTION
+    colors[maze.goal] = GOAL
+    colors[maze.start] = START
+    colors[walls] = WALL
+    return colors
+
+
+def explored_mask(maze, shape):
+    """maze.explored as a boolean array (GridMaze already keeps one; Maze keeps a set of cells)."""
+    if isinstance(maze.explored, np.ndarray):
+        return maze.explored
+    mask = np.zeros(shape, dtype=bool)
+    if maze.explored:
+        rows, cols = zip(*maze.explored)
+        mask[list(rows), list(cols)] = True
+    return mask
+
+
+def png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def output_image(maze, filename, show_solution=True, show_explored=False, cell_size=50, cell_border=2):
+    """Writes maze as an RGB PNG, cell_size pixels per cell, a strip of cells at a time."""
+    colors = cell_colors(maze, show_solution, show_explored)
+    height, width = colors.shape[:2]
+    pixel_width = width * cell_size
+
+    # Pixels inside a cell's colored square (both ends inclusive, like ImageDraw.rectangle)
+    offsets = np.arange(cell_size)
+    inside = (offsets >= cell_border) & (offsets <= cell_size - cell_border)
+    column_mask = np.tile(inside, width)
+
+    strip = max(1, STRIP_BYTES // (cell_size * pixel_width * 3)) # cells of maze per strip
+    compressor = zlib.compressobj(6)
+    with open(filename, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(png_chunk(b"IHDR", struct.pack(">IIBBBBB", pixel_width, height * cell_size, 8, 2, 0, 0, 0)))
+        for top in range(0, height, strip):
+            block = colors[top:top + strip].repeat(cell_size, axis=0).repeat(cell_size, axis=1)
+            block *= (np.tile(inside, len(block) // cell_size)[:, None] & column_mask)[:, :, None]
+            # Every PNG row starts with its filter type (0: none)
+            rows = np.zeros((len(block), 1 + pixel_width * 3), dtype=np.uint8)
+            rows[:, 1:] = block.reshape(len(block), -1)
+            data = compressor.compress(rows.tobytes())
+            if data:
+                f.write(png_chunk(b"IDAT", data))
+        f.write(png_chunk(b"IDAT", compressor.flush()))
+        f.write(png_chunk(b"IEND", b""))
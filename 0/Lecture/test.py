@@ -0,0 +1,417 @@
+import unittest
+import contextlib
+import heapq
+import importlib.util
+import io
+import os
+import random
+import tempfile
+import zlib
+import unittest.mock
+
+from maze import Maze
+import maze as maze_module # (tests use "maze" for Maze instances)
+import mazer
+from gridmaze import GridMaze
+from generate import generate
+import render
+
+""" TESTS for the maze search strategies:
+
+- FrontierTestCase: the deque frontiers pop in stack/queue order and keep contains_state in step with what's in them– mazer.py and maze.py.
+
+- GenerateTestCase: the same seed and arguments write the same maze, and sizes with no room for both A and B are refused– generate.generate.
+
+- SolveTestCase: bfs finds the fewest steps, ucs/astar the cheapest path, dfs/greedy some valid path– maze.Maze.solve.
+
+- JumpPointTestCase: jps finds paths as short as bfs, unpacked into single steps– maze.Maze.solve_jps.
+
+- GridMazeTestCase: the NumPy wavefront explores exactly what bfs does and finds as short a path– gridmaze.GridMaze.solve.
+
+- RenderTestCase: the streamed PNG has the same pixels as the original ImageDraw renderer, however many strips it's written in– render.output_image.
+
+- To run all tests:
+    $ python3 test.py
+
+"""
+
+LECTURE_MAZES = {"maze1.txt": 10, "maze2.txt": 30, "maze3.txt": 4} # fewest steps from A to B
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+
+def load(filename):
+    """ Maze(filename), without its printout of the file. """
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Maze(filename)
+
+
+def cheapest(maze, cost):
+    """ Dijkstra over maze.neighbors: lowest total cost(cell) from start to goal (None if unreachable). """
+    best = {maze.start: 0}
+    queue = [(0, maze.start)]
+    while queue:
+        total, state = heapq.heappop(queue)
+        if state == maze.goal:
+            return total
+        if total > best[state]:
+            continue
+        for _, neighbor in maze.neighbors(state):
+            if total + cost(neighbor) < best.get(neighbor, float("inf")):
+                best[neighbor] = total + cost(neighbor)
+                heapq.heappush(queue, (best[neighbor], neighbor))
+    return None
+
+
+def generated_mazes(directory):
+    """ Filenames of a few generated mazes, weighted and not. """
+    filenames = []
+    for seed in range(4):
+        for mode, weights in (("backtracker", 0.0), ("backtracker", 0.4), ("random", 0.0), ("random", 0.5)):
+            filename = os.path.join(directory, f"{mode}-{weights}-{seed}.txt")
+            generate(filename, 21, 31, mode, seed, density=0.25, loops=0.2, weights=weights)
+            filenames.append(filename)
+    return filenames
+
+
+def write_maze(filename, rows):
+    with open(filename, "w") as f:
+        f.write("\n".join(rows) + "\n")
+    return filename
+
+
+def open_maze(rng, height, width, density):
+    """ Rows of a height x width maze: walls with probability density (often 0), A and B anywhere. """
+    grid = [["#" if rng.random() < density else " " for _ in range(width)] for _ in range(height)]
+    cells = [(i, j) for i in range(height) for j in range(width)]
+    (ai, aj), (bi, bj) = rng.sample(cells, 2)
+    grid[ai][aj], grid[bi][bj] = "A", "B"
+    return ["".join(row) for row in grid]
+
+
+class MazeTest(unittest.TestCase):
+    """ Temporary directory for maze files, and the checks shared by every strategy. """
+    #
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+    def tearDown(self):
+        self.directory.cleanup()
+    #
+    def assertValidSolution(self, maze):
+        actions, cells = maze.solution
+        self.assertEqual(len(actions), len(cells))
+        steps = {"up": (-1, 0), "down": (1, 0), "left": (0, -1), "right": (0, 1)}
+        previous = maze.start
+        for action, cell in zip(actions, cells):
+            self.assertEqual((previous[0] + steps[action][0], previous[1] + steps[action][1]), cell)
+            self.assertFalse(maze.walls[cell[0]][cell[1]], cell)
+            previous = cell
+        self.assertEqual(previous, maze.goal)
+    #
+    def cost(self, maze):
+        return sum(maze.cost(cell) for cell in maze.solution[1])
+
+
+#
+# #
+#
+class FrontierTestCase(unittest.TestCase):
+    """ mazer.py's StackFrontier/QueueFrontier: last-in first-out / first-in first-out, with contains_state counting every node holding a state. """
+    #
+    Node, StackFrontier, QueueFrontier = mazer.Node, mazer.StackFrontier, mazer.QueueFrontier
+    # # #
+    def test_order(self):
+        for frontier, expected in ((self.StackFrontier(), "cba"), (self.QueueFrontier(), "abc")):
+            for state in "abc":
+                frontier.add(self.Node(state, None, None))
+            self.assertEqual("".join(frontier.remove().state for _ in range(3)), expected, type(frontier).__name__)
+            self.assertTrue(frontier.empty())
+    #
+    def test_contains_state_after_remove(self):
+        for frontier in (self.StackFrontier(), self.QueueFrontier()):
+            for state in ("a", "b", "a"): #--the same state in the frontier twice
+                frontier.add(self.Node(state, None, None))
+            self.assertTrue(frontier.contains_state("a"))
+            self.assertFalse(frontier.contains_state("z"))
+            frontier.remove()
+            self.assertTrue(frontier.contains_state("a"), "one node still holds it")
+            frontier.remove(), frontier.remove()
+            self.assertFalse(frontier.contains_state("a"))
+            self.assertFalse(frontier.contains_state("b"))
+    #
+    def test_remove_from_empty(self):
+        for frontier in (self.StackFrontier(), self.QueueFrontier()):
+            self.assertTrue(frontier.empty())
+            with self.assertRaises(Exception):
+                frontier.remove()
+            frontier.add(self.Node("a", None, None))
+            frontier.remove()
+            with self.assertRaises(Exception):
+                frontier.remove()
+
+
+
+class MazeFrontierTestCase(FrontierTestCase):
+    """ The same for maze.py's copies. """
+    #
+    Node, StackFrontier, QueueFrontier = maze_module.Node, maze_module.StackFrontier, maze_module.QueueFrontier
+
+
+#
+# #
+#
+class GenerateTestCase(MazeTest):
+    """ generate() is a function of its arguments and seed; too-small mazes raise ValueError instead of overwriting A with B. """
+    #
+    def contents(self, name, *args, **options):
+        filename = os.path.join(self.directory.name, name)
+        generate(filename, *args, **options)
+        with open(filename, "rb") as f:
+            return f.read()
+    # # #
+    def test_same_seed_same_bytes(self):
+        for mode, options in (("backtracker", {"loops": 0.2, "weights": 0.3}), ("random", {"density": 0.3, "weights": 0.3})):
+            first = self.contents("a.txt", 21, 31, mode, 5, **options)
+            self.assertEqual(self.contents("b.txt", 21, 31, mode, 5, **options), first, mode)
+            self.assertNotEqual(self.contents("c.txt", 21, 31, mode, 6, **options), first, mode)
+    #
+    def test_too_small(self):
+        for height, width, mode in ((3, 3, "backtracker"), (4, 4, "backtracker"), (1, 1, "random")):
+            with self.assertRaises(ValueError, msg=f"{height}x{width} {mode}"):
+                generate(os.path.join(self.directory.name, "small.txt"), height, width, mode)
+        #--The smallest that fit:
+        for height, width, mode in ((3, 5, "backtracker"), (5, 3, "backtracker"), (1, 2, "random"), (2, 1, "random")):
+            self.contents("small.txt", height, width, mode)
+            maze = load(os.path.join(self.directory.name, "small.txt"))
+            self.assertNotEqual(maze.start, maze.goal, f"{height}x{width} {mode}")
+
+
+#
+# #
+#
+class SolveTestCase(MazeTest):
+    """ Optimal strategies must match Dijkstra; every strategy's solution must be a walk from A to B. """
+    # # #
+    def test_lecture_mazes(self):
+        for filename, steps in LECTURE_MAZES.items():
+            maze = load(os.path.join(HERE, filename))
+            self.assertEqual(cheapest(maze, lambda cell: 1), steps)
+            for strategy in ("dfs", "bfs", "ucs", "greedy", "astar"):
+                maze.solve(strategy)
+                self.assertValidSolution(maze)
+                if strategy in ("bfs", "ucs", "astar"):
+                    self.assertEqual(len(maze.solution[1]), steps, f"{filename} {strategy}")
+    #
+    def test_generated_mazes(self):
+        for filename in generated_mazes(self.directory.name):
+            maze = load(filename)
+            steps, cost = cheapest(maze, lambda cell: 1), cheapest(maze, maze.cost)
+            for strategy in ("dfs", "bfs", "ucs", "greedy", "astar"):
+                maze.solve(strategy)
+                self.assertValidSolution(maze)
+                if strategy == "bfs":
+                    self.assertEqual(len(maze.solution[1]), steps, f"{filename} {strategy}")
+                elif strategy in ("ucs", "astar"):
+                    self.assertEqual(self.cost(maze), cost, f"{filename} {strategy}")
+    #
+    def test_weights_change_the_answer(self):
+        """ A detour through cheap cells beats the short way through an expensive one. """
+        maze = load(write_maze(os.path.join(self.directory.name, "detour.txt"), ["#####", "#A9B#", "# # #", "#   #", "#####"]))
+        maze.solve("bfs")
+        self.assertEqual((len(maze.solution[1]), self.cost(maze)), (2, 10))
+        for strategy in ("ucs", "astar"):
+            maze.solve(strategy)
+            self.assertEqual((len(maze.solution[1]), self.cost(maze)), (6, 6), strategy)
+    #
+    def test_no_solution(self):
+        maze = load(write_maze(os.path.join(self.directory.name, "walled.txt"), ["A#B"]))
+        for strategy in Maze.STRATEGIES:
+            with self.assertRaisesRegex(Exception, "no solution"):
+                maze.solve(strategy)
+    #
+    def test_unknown_strategy(self):
+        maze = load(os.path.join(HERE, "maze1.txt"))
+        with self.assertRaises(ValueError):
+            maze.solve("bogo")
+
+
+
+#
+# #
+#
+class JumpPointTestCase(MazeTest):
+    """ Jump point search must be exactly as short as breadth-first search, on uniform-cost mazes only. """
+    #
+    def assertSameAsBFS(self, maze, name):
+        try:
+            maze.solve("bfs")
+        except Exception:
+            with self.assertRaisesRegex(Exception, "no solution"):
+                maze.solve("jps")
+            return False
+        steps = len(maze.solution[1])
+        maze.solve("jps")
+        self.assertValidSolution(maze)
+        self.assertEqual(len(maze.solution[1]), steps, name)
+        return True
+    # # #
+    def test_lecture_mazes(self):
+        for filename in LECTURE_MAZES:
+            self.assertTrue(self.assertSameAsBFS(load(os.path.join(HERE, filename)), filename))
+    #
+    def test_open_and_random_walls(self):
+        rng = random.Random(7)
+        solved = 0
+        for trial in range(300):
+            density = rng.choice([0.0, 0.0, 0.1, 0.25, 0.4])
+            rows = open_maze(rng, rng.randint(1, 15), rng.randint(2, 15), density)
+            filename = write_maze(os.path.join(self.directory.name, f"{trial}.txt"), rows)
+            solved += self.assertSameAsBFS(load(filename), "\n".join(rows))
+        self.assertGreater(solved, 200)
+    #
+    def test_generated_mazes(self):
+        for filename in generated_mazes(self.directory.name):
+            maze = load(filename)
+            if maze.costs:
+                with self.assertRaises(ValueError):
+                    maze.solve("jps")
+            else:
+                self.assertTrue(self.assertSameAsBFS(maze, filename))
+
+
+
+#
+# #
+#
+class GridMazeTestCase(MazeTest):
+    """ GridMaze.solve must give bfs's path length, explored count and explored cells; or fail when bfs does. """
+    #
+    def assertSameAsBFS(self, filename):
+        maze, grid = load(filename), GridMaze(filename)
+        try:
+            maze.solve("bfs")
+        except Exception:
+            with self.assertRaisesRegex(Exception, "no solution"):
+                grid.solve()
+            self.assertEqual(grid.num_explored, maze.num_explored, filename)
+            return False
+        grid.solve()
+        self.assertValidSolution(grid)
+        self.assertEqual(len(grid.solution[1]), len(maze.solution[1]), filename)
+        self.assertEqual(grid.num_explored, maze.num_explored, filename)
+        self.assertEqual({(int(i), int(j)) for i, j in zip(*grid.explored.nonzero())}, maze.explored, filename)
+        return True
+    # # #
+    def test_lecture_mazes(self):
+        for filename in LECTURE_MAZES:
+            self.assertTrue(self.assertSameAsBFS(os.path.join(HERE, filename)), filename)
+    #
+    def test_generated_mazes(self):
+        for filename in generated_mazes(self.directory.name):
+            self.assertTrue(self.assertSameAsBFS(filename), filename)
+    #
+    def test_open_and_random_walls(self):
+        """ Open areas reach most cells from two frontier cells at once: the wavefront must keep each once, in queue order. """
+        rng = random.Random(8)
+        solved = 0
+        for trial in range(200):
+            density = rng.choice([0.0, 0.0, 0.1, 0.25, 0.4])
+            rows = open_maze(rng, rng.randint(1, 15), rng.randint(2, 15), density)
+            solved += self.assertSameAsBFS(write_maze(os.path.join(self.directory.name, f"{trial}.txt"), rows))
+        self.assertGreater(solved, 100)
+    #
+    def test_no_solution(self):
+        filename = write_maze(os.path.join(self.directory.name, "walled.txt"), ["A  #  ", "   # B", "   #  "])
+        self.assertFalse(self.assertSameAsBFS(filename))
+        grid = GridMaze(filename)
+        with self.assertRaisesRegex(Exception, "no solution"):
+            grid.solve()
+        self.assertEqual(grid.num_explored, 9)
+        self.assertIsNone(grid.solution)
+
+
+
+def draw_image(maze, show_solution=True, show_explored=False, cell_size=50, cell_border=2):
+    """ The original Maze.output_image (PIL ImageDraw, one rectangle per cell), as an RGB image. """
+    from PIL import Image, ImageDraw
+    img = Image.new("RGBA", (maze.width * cell_size, maze.height * cell_size), "black")
+    draw = ImageDraw.Draw(img)
+    solution = maze.solution[1] if maze.solution is not None else None
+    for i, row in enumerate(maze.walls):
+        for j, col in enumerate(row):
+            if col:
+                fill = render.WALL
+            elif (i, j) == maze.start:
+                fill = render.START
+            elif (i, j) == maze.goal:
+                fill = render.GOAL
+            elif solution is not None and show_solution and (i, j) in solution:
+                fill = render.SOLUTION
+            elif solution is not None and show_explored and (i, j) in maze.explored:
+                fill = render.EXPLORED
+            else:
+                fill = render.EMPTY
+            draw.rectangle(([(j * cell_size + cell_border, i * cell_size + cell_border),
+                             ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]), fill=fill)
+    return img.convert("RGB")
+
+
+class CountingCompressor():
+    """ zlib.compressobj() that counts its compress() calls: one per strip output_image writes. """
+    #
+    compressobj = zlib.compressobj # the real one, while the test patches zlib's
+    #
+    def __init__(self, *args):
+        self.compressor = CountingCompressor.compressobj(*args)
+        self.calls = 0
+    def compress(self, data):
+        self.calls += 1
+        return self.compressor.compress(data)
+    def flush(self):
+        return self.compressor.flush()
+
+
+#
+# #
+#
+@unittest.skipUnless(importlib.util.find_spec("PIL"), "needs Pillow (pip install -r requirements.txt)")
+class RenderTestCase(MazeTest):
+    """ output_image must decode (with PIL) to exactly the pixels the ImageDraw renderer drew. """
+    #
+    def assertSamePixels(self, maze, name, **options):
+        from PIL import Image
+        filename = os.path.join(self.directory.name, "out.png")
+        maze.output_image(filename, **options)
+        with Image.open(filename) as img:
+            self.assertEqual(img.mode, "RGB")
+            self.assertEqual(img.tobytes(), draw_image(maze, **options).tobytes(), f"{name} {options}")
+    # # #
+    def test_same_pixels(self):
+        maze = load(os.path.join(HERE, "maze2.txt"))
+        self.assertSamePixels(maze, "unsolved")
+        maze.solve("bfs")
+        for options in ({}, {"show_explored": True}, {"show_solution": False, "show_explored": True}, {"cell_size": 7, "cell_border": 1}, {"cell_size": 3, "cell_border": 0}):
+            self.assertSamePixels(maze, "maze2.txt", **options)
+    #
+    def test_many_strips(self):
+        maze = load(generated_mazes(self.directory.name)[1])
+        maze.solve("bfs")
+        pixel_row = maze.width * 10 * 3
+        for strip_bytes, strips in ((pixel_row * 10 * 2, (maze.height + 1) // 2), (1, maze.height)): # 2 rows of cells per strip, then 1
+            compressors = []
+            def compressobj(*args):
+                compressors.append(CountingCompressor(*args))
+                return compressors[-1]
+            with unittest.mock.patch.object(render, "STRIP_BYTES", strip_bytes), unittest.mock.patch.object(render.zlib, "compressobj", compressobj):
+                self.assertSamePixels(maze, "generated", show_explored=True, cell_size=10, cell_border=1)
+            self.assertEqual([compressor.calls for compressor in compressors], [strips])
+
+
+
+# # # # # # # # # # # # # # # # #
+#                               #
+#--Run all the above tests:     #
+if __name__ == "__main__":      #
+    unittest.main()             #
+#                               #
+# # # # # # # # # # # # # # # # #
@@ -0,0 +1,168 @@
+"""
+Batch mode for degrees.py: answer many source/target pairs with one load of the data.
+    Usage: python batch.py directory queries.csv [--workers N] [--jsonl] [--compact] [--mode MODE] [--fuzzy]
+
+- queries.csv: two columns (source, target), each a person's name or IMDb id; an optional
+  "source,target" header row is skipped.
+- The graph is loaded once, in the parent. Worker processes are forked from it, so they share
+  its memory read-only (copy-on-write) instead of reloading; where fork isn't available each
+  worker opens the mmap'd snapshot (--compact), whose pages the OS shares between processes.
+- Results stream to stdout in input order, as text or JSON lines (--jsonl);
+  throughput (queries/s) is reported on stderr at the end.
+"""
+import argparse
+import csv
+import gc
+import json
+import multiprocessing
+import os
+import sys
+import time
+from functools import lru_cache
+
+import degrees
+
+# Search mode used by pool workers (set by run() before forking, or by init_worker)
+search_mode = "bfs"
+
+# Resolve unknown names to their closest match (--fuzzy)
+fuzzy = False
+
+
+
+def read_queries(filename):
+    """ Yields (source, target) string pairs from a CSV file. """
+    with open(filename, encoding="utf-8", newline="") as f:
+        for i, row in enumerate(csv.reader(f)):
+            if not row:
+                continue
+            if i == 0 and [cell.strip().lower() for cell in row[:2]] == ["source", "target"]:
+                continue
+            if len(row) < 2:
+                raise ValueError(f"{filename}, line {i + 1}: expected source,target")
+            yield row[0].strip(), row[1].strip()
+
+
+@lru_cache(maxsize=1 << 16)
+def resolve(value):
+    """
+    Person id for an IMDb id or an (unambiguous) name; raises LookupError otherwise.
+    - With --fuzzy, a name with no exact match resolves to its closest name (NameIndex.closest()).
+    - Cached: batches repeat the same names a lot.
+    """
+    if value in degrees.people:
+        return value
+    person_ids = degrees.names.get(value.lower(), set())
+    if len(person_ids) == 0 and fuzzy:
+        match = degrees.name_index().closest(value)
+        if match:
+            person_ids = degrees.names[match[1]]
+    if len(person_ids) == 0:
+        raise LookupError(f"person not found: {value}")
+    if len(person_ids) > 1:
+        raise LookupError(f"ambiguous name: {value} ({', '.join(sorted(person_ids))})")
+    return next(iter(person_ids))
+
+
+def answer(query, mode="bfs"):
+    """ Runs one query; returns a JSON-able result dict (never raises for bad input). """
+    source, target = query
+    result = {"source": source, "target": target}
+    try:
+        source_id, target_id = resolve(source), resolve(target)
+    except LookupError as e:
+        result["error"] = str(e)
+        return result
+    try:
+        path = degrees.shortest_path(source_id, target_id, mode=mode)
+    except ValueError as e: #--e.g. astar without landmark tables
+        result["error"] = str(e)
+        return result
+    result["degrees"] = None if path is None else len(path)
+    result["path"] = path
+    result["explored"] = degrees.nodes_explored
+    return result
+
+
+def format_text(result):
+    """ One line per query: source -> target: N degrees (person, movie, person...). """
+    head = f"{result['source']} -> {result['target']}: "
+    if "error" in result:
+        return head + f"error: {result['error']}"
+    if result["path"] is None:
+        return head + "not connected"
+    steps = [degrees.people[resolve(result["source"])]["name"]]
+    for movie_id, person_id in result["path"]:
+        steps.append(f"[{degrees.movies[movie_id]['title']}]")
+        steps.append(degrees.people[person_id]["name"])
+    return head + f"{result['degrees']} degrees: " + " ".join(steps)
+
+
+def init_worker(directory, compact, mode, fuzzy_names):
+    """ Pool initializer: only needed when workers weren't forked from the loaded parent. """
+    global search_mode, fuzzy
+    search_mode, fuzzy = mode, fuzzy_names
+    if degrees.graph is None:
+        degrees.load_data(directory, compact=compact, fuzzy=fuzzy_names)
+
+
+def work(query):
+    return answer(query, search_mode)
+
+
+def run(directory, queries, workers=None, compact=False, mode="bfs", chunksize=64):
+    """
+    Yields one result dict per query, in input order.
+    - workers=1 answers in-process; otherwise a multiprocessing pool shares the loaded graph.
+    """
+    global search_mode
+    search_mode = mode
+    if workers == 1:
+        for query in queries:
+            yield answer(query, mode)
+        return
+    #--Load before the pool starts so forked workers inherit it; freeze it so the GC's writes
+    #  to object headers don't copy every shared page into every worker.
+    gc.freeze()
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    try:
+        with context.Pool(workers, initializer=init_worker, initargs=(directory, compact, mode, fuzzy)) as pool:
+            yield from pool.imap(work, queries, chunksize)
+    finally:
+        gc.unfreeze()
+
+
+def main():
+    parser = argparse.ArgumentParser(usage="python batch.py directory queries.csv [--workers N] [--jsonl] [--compact] [--mode MODE] [--fuzzy]")
+    parser.add_argument("directory")
+    parser.add_argument("queries", help="CSV of source,target names or ids")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (1: no pool)")
+    parser.add_argument("--jsonl", action="store_true", help="write one JSON object per query")
+    parser.add_argument("--compact", action="store_true", help="integer-indexed CSR backend (see graph.py)")
+    parser.add_argument("--mode", default="bfs", choices=["bfs", "bidirectional", "astar"], help="search strategy")
+    parser.add_argument("--fuzzy", action="store_true", help="resolve unknown names to the closest match")
+    args = parser.parse_args()
+
+    global fuzzy
+    fuzzy = args.fuzzy
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory, compact=args.compact, fuzzy=args.fuzzy)
+    if args.mode == "astar" and degrees.landmark_tables is None:
+        parser.error("--mode astar needs --compact and landmark tables (python landmarks.py directory)")
+    if args.fuzzy:
+        index = degrees.name_index()
+        print(f"Name index: {len(index)} names, {index.nbytes() / 2 ** 20:.1f} MiB", file=sys.stderr)
+
+    start = time.perf_counter()
+    count = 0
+    for result in run(args.directory, read_queries(args.queries), args.workers, args.compact, args.mode):
+        print(json.dumps(result) if args.jsonl else format_text(result))
+        count += 1
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else float("inf")
+    print(f"{count} queries in {elapsed:.2f}s ({rate:.1f} queries/s, {args.workers} workers)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
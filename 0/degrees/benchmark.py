@@ -0,0 +1,275 @@
+"""
+Benchmarks for degrees.py
+    Usage: python benchmark.py [directory] [--compact] [--pairs N] [--modes M,M] [--json FILE] [--baseline FILE]
+           python benchmark.py [directory] --frontier [--pairs N]
+
+- Suite (default), one backend per run so its peak RSS is its own:
+    1. load_data time (and, with --compact, a second load from the warm snapshot).
+    2. neighbors_for_person time per call, on random people.
+    3. shortest_path per search mode, on random pairs bucketed by their true distance (1..--max-distance
+       degrees): mean time and mean nodes explored per query at each distance.
+    4. Peak RSS of the process.
+  --json writes the results; --baseline compares against an earlier --json file and exits 1 if any
+  time/explored/memory figure got worse by more than --threshold (fractional, default 0.25).
+  Datasets of any size and shape can be made with generate.py.
+- Frontier (--frontier): the original list-based frontiers (slice on every remove, linear contains_state)
+  vs util.py's deque + state-count frontiers.
+    1. A synthetic add/contains_state/remove workload at doubling sizes: the list version's time
+       roughly quadruples per doubling (quadratic), the deque version's only doubles (linear).
+    2. shortest_path (BFS) on random pairs of the dataset, run once with each frontier.
+"""
+import argparse
+import json
+import random
+import resource
+import sys
+import time
+
+import degrees
+from util import Node, QueueFrontier
+
+
+
+class ListStackFrontier():
+    """ The original StackFrontier, kept here as the baseline. """
+    def __init__(self):
+        self.frontier = []
+    #
+    def add(self, node):
+        self.frontier.append(node)
+    #
+    def contains_state(self, state):
+        return any(node.state == state for node in self.frontier)
+    #
+    def empty(self):
+        return len(self.frontier) == 0
+    #
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier[-1]
+            self.frontier = self.frontier[:-1]
+            return node
+
+
+class ListQueueFrontier(ListStackFrontier):
+    """ The original QueueFrontier, kept here as the baseline. """
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier[0]
+            self.frontier = self.frontier[1:]
+            return node
+
+
+
+def frontier_workload(frontier_class, n):
+    """ Seconds to push n nodes (checking contains_state before each, like BFS does) and pop them all. """
+    start = time.perf_counter()
+    frontier = frontier_class()
+    for state in range(n):
+        if not frontier.contains_state(state):
+            frontier.add(Node(state=state, parent=None, action=None))
+    while not frontier.empty():
+        frontier.remove()
+    return time.perf_counter() - start
+
+
+def bench_frontier_scaling(sizes=(1000, 2000, 4000, 8000, 16000)):
+    print("Frontier workload (add + contains_state + remove), seconds:")
+    print(f"{'n':>8} {'list':>10} {'deque':>10} {'speedup':>9}")
+    for n in sizes:
+        old = frontier_workload(ListQueueFrontier, n)
+        new = frontier_workload(QueueFrontier, n)
+        print(f"{n:>8} {old:>10.4f} {new:>10.4f} {old / new:>8.1f}x")
+
+
+def time_queries(pairs, **kwargs):
+    """ Runs shortest_path on every pair; returns (seconds, path lengths). """
+    lengths = []
+    start = time.perf_counter()
+    for source, target in pairs:
+        path = degrees.shortest_path(source, target, **kwargs)
+        lengths.append(None if path is None else len(path))
+    return time.perf_counter() - start, lengths
+
+
+def bench_frontier_bfs(pairs):
+    print(f"shortest_path (BFS) on {len(pairs)} random pairs, seconds:")
+    results = {}
+    for label, frontier_class in (("list", ListQueueFrontier), ("deque", QueueFrontier)):
+        degrees.QueueFrontier = frontier_class
+        try:
+            seconds, lengths = time_queries(pairs)
+        finally:
+            degrees.QueueFrontier = QueueFrontier
+        results[label] = lengths
+        print(f"{label:>8} {seconds:>10.3f}")
+    assert results["list"] == results["deque"], "frontiers disagree on path lengths"
+
+
+def random_pairs(count, seed=0):
+    person_ids = list(degrees.people)
+    rng = random.Random(seed)
+    return [(rng.choice(person_ids), rng.choice(person_ids)) for _ in range(count)]
+
+
+def timed(function, *args, **kwargs):
+    """ (seconds, return value) of one call. """
+    start = time.perf_counter()
+    value = function(*args, **kwargs)
+    return time.perf_counter() - start, value
+
+
+def peak_rss_mb():
+    """ Peak resident set size of this process so far, in MiB (ru_maxrss is KiB on Linux, bytes on macOS). """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def pairs_by_distance(g, distances, per_distance, seed=0, attempts=1000):
+    """
+    {distance: [(source id, target id), ...]} with up to per_distance pairs exactly `distance` degrees apart.
+    - BFS layers from random sources: layer d holds the people at distance d, so picking a
+      target from it gives a pair of known distance without running the search under test.
+    """
+    rng = random.Random(seed)
+    buckets = {distance: [] for distance in distances}
+    deepest = max(distances)
+    person_ids = list(degrees.people)
+    for _ in range(attempts):
+        if all(len(pairs) >= per_distance for pairs in buckets.values()):
+            break
+        source = g.node(rng.choice(person_ids))
+        seen, seen_movies = {source}, set()
+        layer = [source]
+        for depth in range(1, deepest + 1):
+            next_layer = []
+            for node in layer:
+                for movie in g.movies_of(node):
+                    if movie in seen_movies:
+                        continue
+                    seen_movies.add(movie)
+                    for star in g.stars_of(movie):
+                        if star not in seen:
+                            seen.add(star)
+                            next_layer.append(star)
+            if not next_layer:
+                break
+            if depth in buckets and len(buckets[depth]) < per_distance:
+                buckets[depth].append((g.person_id(source), g.person_id(rng.choice(next_layer))))
+            layer = next_layer
+    return buckets
+
+
+def bench_load(directory, compact):
+    results = {"load_s": timed(degrees.load_data, directory, compact=compact)[0]}
+    print(f"load_data ({'compact' if compact else 'dict'}): {results['load_s']:.3f}s")
+    if compact:
+        #--The first load may have had to parse the CSVs and write the snapshot; this one only mmaps it.
+        results["reload_s"] = timed(degrees.load_data, directory, compact=compact)[0]
+        print(f"load_data (snapshot): {results['reload_s']:.3f}s")
+    return results
+
+
+def bench_neighbors(count, seed=0):
+    rng = random.Random(seed)
+    person_ids = list(degrees.people)
+    sample = [rng.choice(person_ids) for _ in range(count)]
+    seconds, _ = timed(lambda: [degrees.neighbors_for_person(person_id) for person_id in sample])
+    print(f"neighbors_for_person: {seconds / count * 1e6:.1f}us per call ({count} calls)")
+    return {"neighbors_us": seconds / count * 1e6}
+
+
+def bench_search(buckets, modes):
+    """ {mode: {distance: {"seconds": mean, "explored": mean}}} over the pairs of each distance bucket. """
+    results = {}
+    print("shortest_path, mean per query (seconds / nodes explored):")
+    print(f"{'distance':>8} {'pairs':>6}" + "".join(f" {mode:>24}" for mode in modes))
+    for distance, pairs in buckets.items():
+        if not pairs:
+            continue
+        row = f"{distance:>8} {len(pairs):>6}"
+        for mode in modes:
+            seconds = explored = 0
+            for source, target in pairs:
+                elapsed, path = timed(degrees.shortest_path, source, target, mode=mode)
+                assert path is not None and len(path) == distance, f"{mode}: wrong path for {source} -> {target}"
+                seconds += elapsed
+                explored += degrees.nodes_explored
+            stats = {"seconds": seconds / len(pairs), "explored": explored / len(pairs)}
+            results.setdefault(mode, {})[str(distance)] = stats
+            row += f" {stats['seconds']:>12.5f} {stats['explored']:>11.0f}"
+        print(row)
+    return results
+
+
+def regressions(results, baseline, threshold, floor=1e-3, prefix=""):
+    """
+    Yields a description of every number in baseline that results exceeds by more than threshold.
+    - Differences under floor are noise (sub-millisecond timings jitter by far more than 25%).
+    """
+    for key, old in baseline.items():
+        new = results.get(key)
+        if isinstance(old, dict) and isinstance(new, dict):
+            yield from regressions(new, old, threshold, floor, f"{prefix}{key}.")
+        elif isinstance(old, (int, float)) and isinstance(new, (int, float)) and new > old * (1 + threshold) and new - old > floor:
+            yield f"{prefix}{key}: {old:.4g} -> {new:.4g} (+{(new / old - 1) * 100 if old else float('inf'):.0f}%)"
+
+
+def run_suite(args):
+    modes = args.modes.split(",")
+    results = {"backend": "compact" if args.compact else "dict"}
+    results.update(bench_load(args.directory, args.compact))
+    results["people"], results["movies"] = len(degrees.people), len(degrees.movies)
+    if "astar" in modes and degrees.landmark_tables is None:
+        print("(skipping astar: no landmark tables, run landmarks.py first)")
+        modes.remove("astar")
+    results.update(bench_neighbors(args.neighbors))
+    buckets = pairs_by_distance(degrees.current_graph(), range(1, args.max_distance + 1), args.pairs)
+    results["search"] = bench_search(buckets, modes)
+    results["peak_rss_mb"] = peak_rss_mb()
+    print(f"Peak RSS: {results['peak_rss_mb']:.1f} MiB")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(usage="python benchmark.py [directory] [--compact] [--pairs N] [--modes M,M] [--json FILE] [--baseline FILE] [--frontier]")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--compact", action="store_true", help="benchmark the CSR backend")
+    parser.add_argument("--pairs", type=int, default=20, help="source/target pairs per distance (or in total, with --frontier)")
+    parser.add_argument("--max-distance", type=int, default=6, help="largest distance bucket")
+    parser.add_argument("--neighbors", type=int, default=1000, help="neighbors_for_person calls to time")
+    parser.add_argument("--modes", default="bfs,bidirectional,astar", help="comma-separated search modes")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare against results written earlier by --json")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before a regression")
+    parser.add_argument("--frontier", action="store_true", help="list vs deque frontier comparison instead")
+    args = parser.parse_args()
+
+    if args.frontier:
+        bench_frontier_scaling()
+        print()
+        print("Loading data...")
+        degrees.load_data(args.directory, compact=args.compact)
+        bench_frontier_bfs(random_pairs(args.pairs))
+        return
+
+    results = run_suite(args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = list(regressions(results, json.load(f), args.threshold))
+        for regression in found:
+            print(f"REGRESSION {regression}")
+        if found:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} of {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
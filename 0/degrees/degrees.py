@@ -4,8 +4,18 @@
 
 import sys
 import csv
+import argparse
+import io
+import os
+from itertools import chain
 
 from util import Node, StackFrontier, QueueFrontier
+from graph import DictGraph, CompactGraph, PeopleView, MoviesView, NamesView
+from search import bidirectional, astar
+from paths import shortest_path_dag, enumerate_paths
+from nameindex import NameIndex
+import snapshot
+import landmarks
 
 # Maps names to a set of corresponding person_ids
 names = {} #--DICT{name:name_id,}
@@ -16,55 +26,216 @@ people = {} #--DICT{person_id:{name:?, birth:?, movies:(1,4,19...)}}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
-def load_data(directory):
+# Graph backend the search runs on (DictGraph over the dicts above, or a CompactGraph – see graph.py)
+graph = None
+
+# Landmark distance tables for mode="astar" (compact backend only – see landmarks.py)
+landmark_tables = None
+
+# Prefix/fuzzy index over the keys of names (see nameindex.py), built by load_data(fuzzy=True) or on first use
+name_lookup = None
+
+# Nodes the last shortest_path call explored
+nodes_explored = 0
+
+# Byte offset in each CSV up to which rows have been loaded (for update_data), and rows read by the last pass
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+watermarks = {}
+rows_read = {}
+
+# Whether the last compact load used the snapshot cache (update_data reloads the same way)
+cached = True
+
+# stars.csv rows naming a person/movie not loaded (yet): update_data retries them, as deltas may arrive out of order
+orphan_stars = []
+
+def load_data(directory, compact=False, cache=True, fuzzy=False):
     """
     Load data from CSV files into memory.
+    - compact=True interns ids to ints and keeps the graph as CSR arrays (far less memory on "large");
+      names/people/movies then become read-only views with the same shape as the dicts.
+    - cache (compact only): open directory/degrees.snapshot with mmap instead of parsing the CSVs,
+      (re)writing it first if it's missing or any CSV's size/mtime changed (see snapshot.py).
+      Landmark tables built by landmarks.py for the same CSVs are picked up too.
+    - fuzzy=True builds the prefix/trigram name index up front (otherwise it's built on the first miss).
     """
+    global graph, names, people, movies, landmark_tables, name_lookup, cached
+    landmark_tables = None
+    name_lookup = None
+    cached = cache
+    if compact:
+        graph = snapshot.load_or_build(directory) if cache else CompactGraph.from_csv(directory)
+        names, people, movies = NamesView(graph), PeopleView(graph), MoviesView(graph)
+        landmark_tables = landmarks.load(directory, graph.num_people())
+        if fuzzy:
+            name_index()
+        return
+    if not isinstance(people, dict): #--Switching back from a compact load:
+        names, people, movies = {}, {}, {}
+    names.clear(), people.clear(), movies.clear()
+    watermarks.clear()
+    orphan_stars.clear()
+
     # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            #--Add person to PEOPLE{...}
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
+    add_people(read_new_rows(directory, "people.csv"))
 
     # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
+    add_movies(read_new_rows(directory, "movies.csv"))
 
     # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    add_stars(read_new_rows(directory, "stars.csv"))
+
+    graph = DictGraph(people, movies)
+    #--Union-find pass: lets shortest_path answer "Not connected" without searching.
+    graph.components = graph.label_components()
+    if fuzzy:
+        name_index()
+
+
+def update_data(directory):
+    """
+    Appends the rows added to the CSVs since load_data/update_data last read them, without a reload.
+    Returns {"people.csv": rows read, "movies.csv": ..., "stars.csv": ...} (None if it had to reload).
+    - Each file is read from its byte-offset watermark, so a daily delta costs only its own rows.
+      The CSVs must only ever be appended to: a file that shrank is loaded again from scratch.
+    - The connected components and (if built) the name index are updated for the new rows only.
+    - Compact backend: its CSR arrays can't grow in place, so the snapshot is rebuilt and reopened instead.
+    """
+    global graph
+    if not isinstance(people, dict) or graph is None:
+        load_data(directory, compact=not isinstance(people, dict), cache=cached)
+        return {filename: None for filename in SOURCES}
+    for filename in SOURCES:
+        if os.path.getsize(os.path.join(directory, filename)) < watermarks.get(filename, 0):
+            load_data(directory)
+            return {filename: None for filename in SOURCES}
+
+    #--If a step raises, rows already applied are read again next time (applying a row twice is harmless),
+    #  but a name is only new once: the name index gets the new names whatever happens.
+    new_names = []
+    try:
+        add_people(read_new_rows(directory, "people.csv"), new_names)
+        add_movies(read_new_rows(directory, "movies.csv"))
+        retry = orphan_stars[:]
+        orphan_stars.clear()
+        try:
+            new_stars = add_stars(chain(retry, read_new_rows(directory, "stars.csv")))
+        except BaseException:
+            orphan_stars[:0] = retry
+            raise
+    finally:
+        if name_lookup is not None:
+            for name in new_names:
+                name_lookup.add(name)
+    graph.update_components(new_stars)
+    return dict(rows_read)
+
+
+def read_new_rows(directory, filename):
+    """
+    Yields the rows of directory/filename (as dicts) past its watermark, then moves the watermark past them.
+    - Only complete lines are read: a last line still missing its newline is left for the next update.
+    - The watermark only moves once the caller has taken (and applied) every row: if it stops early,
+      e.g. on an exception, the next update reads the same rows again.
+    - A file without even a header line (empty) has no rows.
+    """
+    rows_read[filename] = 0
+    with open(os.path.join(directory, filename), "rb") as f:
+        header = f.readline()
+        if not header.strip():
+            return
+        fieldnames = next(csv.reader([header.decode("utf-8")]))
+        offset = max(watermarks.get(filename, 0), f.tell())
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    for row in csv.DictReader(io.StringIO(data[:end].decode("utf-8"), newline=""), fieldnames=fieldnames):
+        rows_read[filename] += 1
+        yield row
+    watermarks[filename] = offset + end
+
+
+def add_people(rows, new_names=None):
+    """ Adds people rows to people & names; returns the names (lowercase) that are new (appended to new_names, if given). """
+    if new_names is None:
+        new_names = []
+    for row in rows:
+        #--Add person to PEOPLE{...}
+        people[row["id"]] = {
+            "name": row["name"],
+            "birth": row["birth"],
+            "movies": people[row["id"]]["movies"] if row["id"] in people else set()
+        }
+        if row["name"].lower() not in names:
+            names[row["name"].lower()] = {row["id"]}
+            new_names.append(row["name"].lower())
+        else:
+            names[row["name"].lower()].add(row["id"])
+    return new_names
+
+
+def add_movies(rows):
+    for row in rows:
+        movies[row["id"]] = {
+            "title": row["title"],
+            "year": row["year"],
+            "stars": movies[row["id"]]["stars"] if row["id"] in movies else set()
+        }
+
+
+def add_stars(rows):
+    """ Links people to movies; returns the (person_id, movie_id) pairs added. """
+    added = []
+    for row in rows:
+        if row["person_id"] not in people or row["movie_id"] not in movies:
+            orphan_stars.append(row)
+            continue
+        people[row["person_id"]]["movies"].add(row["movie_id"])
+        movies[row["movie_id"]]["stars"].add(row["person_id"])
+        added.append((row["person_id"], row["movie_id"]))
+    return added
+
+
+def name_index():
+    """ The NameIndex over the loaded names (prefix & fuzzy lookup), built on first use. """
+    global name_lookup
+    if name_lookup is None:
+        name_lookup = NameIndex(names)
+    return name_lookup
+
+
+def current_graph():
+    """
+    The loaded graph backend (or a DictGraph over the module dicts if load_data wasn't used).
+    - That fallback is built per call and never labels its components, so searches on it skip the component check.
+    """
+    return graph if graph is not None else DictGraph(people, movies)
+
+
+def component_sizes():
+    """ Histogram of connected component sizes {size: count} of the loaded graph. """
+    return current_graph().component_sizes()
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]") # USAGE
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(usage="python degrees.py [directory] [--compact [--no-cache]] [--mode MODE] [--all K] [--components]") # USAGE
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--compact", action="store_true", help="integer-indexed CSR backend (see graph.py)")
+    parser.add_argument("--no-cache", action="store_true", help="don't read/write the binary snapshot")
+    parser.add_argument("--components", action="store_true", help="print the component-size histogram")
+    parser.add_argument("--mode", default="bfs", choices=["bfs", "bidirectional", "astar"], help="search strategy")
+    parser.add_argument("--all", type=int, metavar="K", help="list up to K shortest paths, newest movies first")
+    args = parser.parse_args()
+    directory = args.directory
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(directory, compact=args.compact, cache=not args.no_cache)
     print("Data loaded.")
+    if args.components:
+        print("Component sizes (size: count):")
+        for size, count in component_sizes().items():
+            print(f"  {size}: {count}")
 
     source = person_id_for_name(input("Name: ")) # First actor's name (function)
     if source is None:
@@ -73,20 +244,34 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
+    if args.all:
+        number = 0
+        for number, path in enumerate(all_shortest_paths(source, target, limit=args.all, rank="newest"), 1):
+            print(f"Path {number}:")
+            print_path(source, path)
+        if number == 0:
+            print("Not connected.")
+        return
+
 # # # # # #
-    path = shortest_path(source, target) #TO DO: write shortest_path function
+    path = shortest_path(source, target, mode=args.mode) #TO DO: write shortest_path function
 # # # # # #
+    print(f"Nodes explored: {nodes_explored}")
     if path is None:
         print("Not connected.")
     else:
-        degrees = len(path)
-        print(f"{degrees} degrees of separation.")
-        path = [(None, source)] + path
-        for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
-            print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+        print_path(source, path)
+
+
+def print_path(source, path):
+    degrees = len(path)
+    print(f"{degrees} degrees of separation.")
+    path = [(None, source)] + path
+    for i in range(degrees):
+        person1 = people[path[i][1]]["name"]
+        person2 = people[path[i + 1][1]]["name"]
+        movie = movies[path[i + 1][0]]["title"]
+        print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
 
@@ -98,13 +283,36 @@ def main():
     #. if so, return path/degrees of connection
     #. if not, continue adding nodes to frontier and exploring.
 
-def shortest_path(source, target):
+def shortest_path(source, target, mode="bfs"):
     """
     Returns the shortest list of (movie_id, person_id) tuples that connect the source to the target.
        If no possible path, returns None. If multiple shortest paths, return any.
+    - mode: "bfs" (below), "bidirectional" or "astar" (search.py) – same path length, far fewer nodes explored.
+      "astar" needs the compact backend and landmark tables (python landmarks.py directory).
     """
-    #--Keep track of how many nodes were explored:
-    num_explored = 0
+    global nodes_explored
+    nodes_explored = 0
+    #--Search runs on graph nodes (person_ids, or ints on a CompactGraph):
+    g = current_graph()
+    source, target = g.node(source), g.node(target)
+    if source is None or target is None:
+        return None
+    #--Different connected components: no path, and no need to search the whole source component to find out.
+    if g.separated(source, target):
+        return None
+
+    if mode == "bidirectional":
+        path, nodes_explored = bidirectional(g, source, target)
+        return g.path_ids(path)
+    elif mode == "astar":
+        if landmark_tables is None:
+            raise ValueError("astar mode needs landmark tables: run landmarks.py and load with compact=True")
+        path, nodes_explored = astar(g, source, target, landmark_tables.heuristic(target))
+        return g.path_ids(path)
+    elif mode != "bfs":
+        raise ValueError(f"unknown search mode: {mode}")
+
+    #--Keep track of how many nodes were explored (module-level, so callers can report it):
 
     #--Search algorithm:
     frontier = QueueFrontier() #Breadth-First Search (first-in, first-out)
@@ -115,6 +323,8 @@ def shortest_path(source, target):
     frontier.add(start_node)
     #--Set of explored actors (person_ids)
     explored = set()
+    #--Movies whose cast is already in the frontier/explored (BFS reaches each movie first from its shallowest star):
+    seen_movies = set()
 
     #--Loop until we find path from person(A)_id to person(B)_id:
     while True:
@@ -132,59 +342,101 @@ def shortest_path(source, target):
             moves = int() # linked movies
             peeps = int() # linked people
             while node.parent is not None: # when None, you're at the original person(A):
-                moves = node.action # movie_id
-                peeps = node.state # person_id
+                moves = g.movie_id(node.action) # movie_id
+                peeps = g.person_id(node.state) # person_id
                 node = node.parent
                 path.append((moves, peeps)) # Add tuple to list (film, actor)
             #--Reverse the path:
             path.reverse()
-            print(f"Nodes explored: {num_explored}")
             return path # SOLUTION!
 
         #--Put 'spent' node in Explored (not the target/goal):
         explored.add(node.state)
-        num_explored += 1
-
-        #--Add neighbors to the frontier
-        neighbors = neighbors_for_person(node.state)
-        for film, actor in neighbors:
-            if not frontier.contains_state(actor) and actor not in explored:
-                child = Node(state=actor, parent=node, action=film) # initialize child
-                #
-                # TODO – MAKE ITS OWN FUNCTION (DRY!)
-                # Put in shortcut check: is child.state == target?
-                #
-                frontier.add(child) # add child-node to frontier
+        nodes_explored += 1
+
+        #--Add neighbors to the frontier, walking each movie's cast at most once per search
+        for film in g.movies_of(node.state):
+            if film in seen_movies:
+                continue
+            seen_movies.add(film)
+            for actor in g.stars_of(film):
+                if not frontier.contains_state(actor) and actor not in explored:
+                    child = Node(state=actor, parent=node, action=film) # initialize child
+                    #
+                    # TODO – MAKE ITS OWN FUNCTION (DRY!)
+                    # Put in shortcut check: is child.state == target?
+                    #
+                    frontier.add(child) # add child-node to frontier
 
 
 ################################################################################
 
 
 
+def all_shortest_paths(source, target, limit=None, rank=None):
+    """
+    Yields every shortest list of (movie_id, person_id) tuples that connects the source to the target
+    (nothing if they aren't connected), lazily: stop iterating, or pass limit, to take only the first few.
+    - rank orders them: "newest" (most recent movies first), "oldest", or cost(movie_id) -> number,
+      lowest total over the path first. None: no particular order, and the cheapest to enumerate.
+    - The BFS layer DAG is built up front (see paths.py), so nodes_explored is set by the first next().
+    """
+    global nodes_explored
+    nodes_explored = 0
+    g = current_graph()
+    source, target = g.node(source), g.node(target)
+    if source is None or target is None or g.separated(source, target):
+        return
+    parents, nodes_explored = shortest_path_dag(g, source, target)
+    if parents is None:
+        return
+
+    def year(movie):
+        return int(g.movie_year(movie) or 0)
+    if rank == "newest":
+        cost = lambda movie: -year(movie)
+    elif rank == "oldest":
+        cost = year
+    elif callable(rank):
+        cost = lambda movie: rank(g.movie_id(movie))
+    elif rank is None:
+        cost = None
+    else:
+        raise ValueError(f"unknown rank: {rank}")
+    for number, path in enumerate(enumerate_paths(parents, source, target, cost)):
+        if limit is not None and number >= limit:
+            return
+        yield g.path_ids(path)
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+    - No exact match: the closest names (typos, partial names – see nameindex.py) are offered instead.
     """
     person_ids = list(names.get(name.lower(), set()))
     if len(person_ids) == 0:
-        return None
-    elif len(person_ids) > 1:
-        print(f"Which '{name}'?")
-        for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
-            print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
-        try:
-            person_id = input("Intended Person ID: ")
-            if person_id in person_ids:
-                return person_id
-        except ValueError:
-            pass
-        return None
-    else:
+        suggestions = name_index().search(name, limit=5)
+        person_ids = [person_id for _, key in suggestions for person_id in sorted(names[key])]
+        if len(person_ids) == 0:
+            return None
+        print(f"No exact match for '{name}'.")
+    elif len(person_ids) == 1:
         return person_ids[0]
+    print(f"Which '{name}'?")
+    for person_id in person_ids:
+        person = people[person_id]
+        name = person["name"]
+        birth = person["birth"]
+        print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
+    try:
+        person_id = input("Intended Person ID: ")
+        if person_id in person_ids:
+            return person_id
+    except ValueError:
+        pass
+    return None
 
 
 def neighbors_for_person(person_id):
@@ -192,11 +444,13 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
+    g = current_graph()
+    node = g.node(person_id)
+    if node is None:
+        raise KeyError(person_id)
     neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
+    for movie, star in g.neighbors(node):
+        neighbors.add((g.movie_id(movie), g.person_id(star)))
     return neighbors
 
 
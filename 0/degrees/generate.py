@@ -0,0 +1,83 @@
+"""
+Synthetic dataset generator for degrees.py (same CSV layout as the CS50 small/large directories).
+    Usage: python generate.py directory [--people N] [--movies M] [--seed S]
+
+- Cast sizes follow a power law (most movies have a handful of stars, a few have hundreds),
+  and so does how often each person is cast (a few prolific actors, a long tail of one-offs),
+  like the real IMDb data. The same arguments + seed always write the same files.
+"""
+import argparse
+import csv
+import os
+import random
+from itertools import accumulate
+
+SYLLABLES = ["al", "an", "ar", "be", "bo", "ca", "da", "de", "el", "en", "fa", "ga", "ha", "is", "ja", "ka",
+             "la", "le", "li", "lo", "ma", "mi", "na", "ne", "no", "or", "pa", "ra", "re", "ri", "ro", "sa",
+             "se", "si", "ta", "te", "ti", "to", "va", "vi", "wa", "yo", "za"]
+
+
+def make_name(rng):
+    """ A pronounceable two-part name, e.g. "Maribo Kalenta". """
+    def word():
+        return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+    return f"{word()} {word()}"
+
+
+def cast_size(rng, alpha, largest):
+    """ Power-law (Pareto) cast size, at least 1 and at most largest. """
+    return min(largest, int(rng.paretovariate(alpha)))
+
+
+def generate(directory, num_people=10000, num_movies=5000, seed=0, alpha=1.5, zipf=0.8, largest=500):
+    """
+    Writes people.csv, movies.csv and stars.csv into directory.
+    - alpha: cast-size power-law exponent (smaller: heavier tail of huge casts)
+    - zipf: exponent of how often each person is cast (person i is cast ~ 1 / (i + 1) ** zipf as often)
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    person_ids = [str(100 + 7 * i) for i in range(num_people)]
+
+    with open(os.path.join(directory, "people.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for person_id in person_ids:
+            writer.writerow([person_id, make_name(rng), rng.choice(["", str(rng.randint(1920, 2005))])])
+
+    with open(os.path.join(directory, "movies.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for j in range(num_movies):
+            writer.writerow([str(1000000 + 3 * j), f"The {make_name(rng)} Story", rng.randint(1930, 2020)])
+
+    #--Popularity order is shuffled so prolific people aren't just the smallest ids:
+    popularity = person_ids[:]
+    rng.shuffle(popularity)
+    cum_weights = list(accumulate(1 / (i + 1) ** zipf for i in range(num_people)))
+    with open(os.path.join(directory, "stars.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for j in range(num_movies):
+            size = min(cast_size(rng, alpha, largest), num_people)
+            cast = set(rng.choices(popularity, cum_weights=cum_weights, k=size))
+            for person_id in sorted(cast):
+                writer.writerow([person_id, str(1000000 + 3 * j)])
+
+
+def main():
+    parser = argparse.ArgumentParser(usage="python generate.py directory [--people N] [--movies M] [--seed S]")
+    parser.add_argument("directory")
+    parser.add_argument("--people", type=int, default=10000)
+    parser.add_argument("--movies", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--alpha", type=float, default=1.5, help="cast-size power-law exponent")
+    parser.add_argument("--zipf", type=float, default=0.8, help="casting-frequency Zipf exponent")
+    parser.add_argument("--largest", type=int, default=500, help="largest cast")
+    args = parser.parse_args()
+    generate(args.directory, args.people, args.movies, args.seed, args.alpha, args.zipf, args.largest)
+    print(f"Wrote {args.people} people and {args.movies} movies to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
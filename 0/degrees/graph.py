@@ -0,0 +1,407 @@
+"""
+Graph backends for degrees.py
+- DictGraph: the original representation (dicts of sets keyed by IMDb id strings).
+- CompactGraph: person/movie ids interned to dense ints, person->movies & movie->stars
+  stored as CSR (compressed sparse row) offset/index arrays.
+
+Both expose the same small interface, which is all the search code in degrees.py uses:
+    node(person_id) -> node | None     person_id(node) -> IMDb id
+    movies_of(node) -> movies          movie_id(movie) -> IMDb id
+    stars_of(movie) -> nodes           neighbors(node) -> {(movie, node), ...}
+    movie_year(movie) -> year string (may be empty)
+    component(node) -> connected component id (from a union-find pass over every cast)
+    separated(a, b) -> True if a and b are known to be in different components
+"""
+import csv
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Mapping
+
+
+
+class Graph():
+    """ Shared helpers, written only against movies_of()/stars_of(). """
+    #
+    def neighbors(self, node):
+        """ Returns (movie, node) pairs for everyone who starred with node. """
+        neighbors = set()
+        for movie in self.movies_of(node):
+            for star in self.stars_of(movie):
+                neighbors.add((movie, star))
+        return neighbors
+    #
+    def path_ids(self, path):
+        """ Translates a [(movie, node), ...] path to [(movie_id, person_id), ...] (None stays None). """
+        if path is None:
+            return None
+        return [(self.movie_id(movie), self.person_id(node)) for movie, node in path]
+    #
+    def component(self, node):
+        """ Connected component id of node: two people are connected iff their ids match. """
+        if self.components is None:
+            self.components = self.label_components()
+        return self.components[node]
+    #
+    def separated(self, a, b):
+        """ True if a and b are in different components; False (unknown) if the components aren't labelled. """
+        return self.components is not None and self.components[a] != self.components[b]
+    #
+    def component_sizes(self):
+        """ Histogram {component size: number of components that size}, for diagnostics. """
+        if self.components is None:
+            self.components = self.label_components()
+        labels = self.components.values() if isinstance(self.components, dict) else self.components
+        return dict(sorted(Counter(Counter(labels).values()).items()))
+
+
+
+class DictGraph(Graph):
+    """ Nodes are the IMDb person_id strings themselves. """
+    #
+    def __init__(self, people, movies):
+        self.people = people
+        self.movies = movies
+        self.components = None # {person_id: component id}, labelled on first use
+    #
+    def node(self, person_id):
+        return person_id if person_id in self.people else None
+    #
+    def person_id(self, node):
+        return node
+    #
+    def movie_id(self, movie):
+        return movie
+    #
+    def movie_year(self, movie):
+        return self.movies[movie]["year"]
+    #
+    def movies_of(self, node):
+        return self.people[node]["movies"]
+    #
+    def stars_of(self, movie):
+        return self.movies[movie]["stars"]
+    #
+    def label_components(self):
+        parent = {node: node for node in self.people}
+        union_casts(parent, (movie["stars"] for movie in self.movies.values()))
+        return dict(zip(self.people, dense_labels(find(parent, node) for node in self.people)))
+    #
+    def update_components(self, new_stars):
+        """
+        Brings the component labels up to date after people/movies/stars were appended to the dicts,
+        given the (person, movie) links added: a union-find over the labels of the casts they touched.
+        - New people start in components of their own; everyone is relabelled only if components merged.
+        """
+        if self.components is None:
+            return
+        labels = self.components
+        next_label = max(labels.values(), default=-1) + 1
+        for node in self.people:
+            if node not in labels:
+                labels[node] = next_label
+                next_label += 1
+        parent = {}
+        for movie in {movie for _, movie in new_stars}:
+            cast = {labels[star] for star in self.stars_of(movie)}
+            for label in cast:
+                parent.setdefault(label, label)
+            union_casts(parent, [cast])
+        merged = {label: find(parent, label) for label in parent if find(parent, label) != label}
+        if merged:
+            for node, label in labels.items():
+                if label in merged:
+                    labels[node] = merged[label]
+
+
+
+class StringTable():
+    """
+    Read-only list of strings packed into one UTF-8 blob + an offsets array.
+    - A few bytes per string instead of a ~50 byte str object each.
+    - If the strings were packed in sorted order, index() is a binary search.
+    """
+    #
+    def __init__(self, blob, offsets):
+        self.blob = blob # bytes (or a memoryview into a snapshot)
+        self.offsets = offsets # len(self) + 1 entries
+    #
+    @classmethod
+    def pack(cls, strings):
+        offsets = array("q", [0])
+        parts = []
+        total = 0
+        for string in strings:
+            data = string.encode("utf-8")
+            parts.append(data)
+            total += len(data)
+            offsets.append(total)
+        return cls(b"".join(parts), offsets)
+    #
+    def __len__(self):
+        return len(self.offsets) - 1
+    #
+    def __getitem__(self, i):
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+    #
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+    #
+    def index(self, string):
+        """ Position of string in a sorted table, or None. """
+        i = bisect_left(self, string)
+        if i < len(self) and self[i] == string:
+            return i
+        return None
+    #
+    def nbytes(self):
+        return len(self.blob) + len(self.offsets) * self.offsets.itemsize
+
+
+
+class CompactGraph(Graph):
+    """
+    Integer-indexed graph: node i is the i-th person id in sorted order, movie j the j-th movie id.
+    - movies of person i: person_movies[person_offsets[i]:person_offsets[i + 1]]
+    - stars of movie j:   movie_stars[movie_offsets[j]:movie_offsets[j + 1]]
+    """
+    #--Fields persisted by snapshot.py (a snapshot is just these, laid out end to end):
+    TABLES = ("person_ids", "person_names", "person_births", "movie_ids", "movie_titles", "movie_years", "name_keys")
+    ARRAYS = ("person_offsets", "person_movies", "movie_offsets", "movie_stars", "name_people", "components")
+    #
+    def __init__(self, person_ids, person_names, person_births, movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_stars, name_keys, name_people, components=None):
+        self.person_ids = person_ids # StringTable, sorted
+        self.person_names = person_names # StringTable, parallel to person_ids
+        self.person_births = person_births
+        self.movie_ids = movie_ids # StringTable, sorted
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets # CSR person -> movies
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets # CSR movie -> stars
+        self.movie_stars = movie_stars
+        self.name_keys = name_keys # StringTable of lowercase names, sorted
+        self.name_people = name_people # node for each entry of name_keys
+        self.components = components # component id of each node
+    #
+    @classmethod
+    def from_csv(cls, directory):
+        """ Builds the graph from people.csv, movies.csv & stars.csv. """
+        #--Load people (later rows win, like the dict loader):
+        people = {}
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                people[row["id"]] = (row["name"], row["birth"])
+        person_ids = sorted(people)
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+
+        #--Load movies:
+        films = {}
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                films[row["id"]] = (row["title"], row["year"])
+        movie_ids = sorted(films)
+        movie_index = {movie_id: j for j, movie_id in enumerate(movie_ids)}
+
+        #--Load stars as (person, movie) int pairs, encoded as one int so duplicates collapse:
+        n_movies = len(movie_ids)
+        edges = set()
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    edges.add(person_index[row["person_id"]] * n_movies + movie_index[row["movie_id"]])
+                except KeyError:
+                    pass
+        edges = sorted(edges)
+        sources = array("i", (edge // n_movies for edge in edges))
+        targets = array("i", (edge % n_movies for edge in edges))
+        del edges
+
+        #--Name index: (lowercase name, node), sorted. Duplicate names keep every node.
+        name_pairs = sorted((people[person_id][0].lower(), i) for i, person_id in enumerate(person_ids))
+
+        person_offsets, person_movies = build_csr(len(person_ids), sources, targets)
+        movie_offsets, movie_stars = build_csr(n_movies, targets, sources)
+        graph = cls(
+            person_ids=StringTable.pack(person_ids),
+            person_names=StringTable.pack(people[person_id][0] for person_id in person_ids),
+            person_births=StringTable.pack(people[person_id][1] for person_id in person_ids),
+            movie_ids=StringTable.pack(movie_ids),
+            movie_titles=StringTable.pack(films[movie_id][0] for movie_id in movie_ids),
+            movie_years=StringTable.pack(films[movie_id][1] for movie_id in movie_ids),
+            person_offsets=person_offsets, person_movies=person_movies,
+            movie_offsets=movie_offsets, movie_stars=movie_stars,
+            name_keys=StringTable.pack(name for name, _ in name_pairs),
+            name_people=array("i", (node for _, node in name_pairs)),
+        )
+        graph.components = graph.label_components()
+        return graph
+    #
+    def num_people(self):
+        return len(self.person_ids)
+    #
+    def num_movies(self):
+        return len(self.movie_ids)
+    #
+    def node(self, person_id):
+        return self.person_ids.index(person_id)
+    #
+    def person_id(self, node):
+        return self.person_ids[node]
+    #
+    def movie_id(self, movie):
+        return self.movie_ids[movie]
+    #
+    def movie_year(self, movie):
+        return self.movie_years[movie]
+    #
+    def movies_of(self, node):
+        return self.person_movies[self.person_offsets[node]:self.person_offsets[node + 1]]
+    #
+    def stars_of(self, movie):
+        return self.movie_stars[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+    #
+    def label_components(self):
+        parent = array("i", range(self.num_people()))
+        union_casts(parent, (self.stars_of(movie) for movie in range(self.num_movies())))
+        return array("i", dense_labels(find(parent, node) for node in range(self.num_people())))
+    #
+    def nodes_for_name(self, name):
+        """ All nodes whose lowercase name is exactly name. """
+        i = bisect_left(self.name_keys, name)
+        nodes = []
+        while i < len(self.name_keys) and self.name_keys[i] == name:
+            nodes.append(self.name_people[i])
+            i += 1
+        return nodes
+    #
+    def nbytes(self):
+        """ Approximate size of the packed data, in bytes. """
+        tables = (self.person_ids, self.person_names, self.person_births,
+                  self.movie_ids, self.movie_titles, self.movie_years, self.name_keys)
+        arrays = (self.person_offsets, self.person_movies, self.movie_offsets, self.movie_stars, self.name_people)
+        if self.components is not None:
+            arrays += (self.components,)
+        return sum(t.nbytes() for t in tables) + sum(len(a) * a.itemsize for a in arrays)
+
+
+
+def find(parent, x):
+    """ Union-find root of x (with path halving). """
+    while parent[x] != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
+
+
+def union_casts(parent, casts):
+    """ Unions everyone who shares a cast: afterwards find() gives one root per connected component. """
+    for cast in casts:
+        first = None
+        for star in cast:
+            root = find(parent, star)
+            if first is None:
+                first = root
+            elif root != first:
+                parent[root] = first
+
+
+def dense_labels(roots):
+    """ Renumbers union-find roots 0, 1, 2... in order of first appearance. """
+    labels = {}
+    for root in roots:
+        yield labels.setdefault(root, len(labels))
+
+
+def build_csr(count, sources, targets):
+    """
+    Counting-sort (source, target) pairs into CSR form for sources 0..count-1.
+    Returns (offsets, index) with the targets of s at index[offsets[s]:offsets[s + 1]].
+    """
+    offsets = array("q", bytes(8 * (count + 1)))
+    for s in sources:
+        offsets[s + 1] += 1
+    for s in range(count):
+        offsets[s + 1] += offsets[s]
+    index = array("i", bytes(4 * len(sources)))
+    cursor = array("q", offsets)
+    for s, t in zip(sources, targets):
+        index[cursor[s]] = t
+        cursor[s] += 1
+    return offsets, index
+
+
+
+#--Views so code written against the people/movies/names dicts keeps working on a CompactGraph:
+
+class PeopleView(Mapping):
+    """ people[person_id] -> {"name", "birth", "movies": set of movie_ids} """
+    #
+    def __init__(self, graph):
+        self.graph = graph
+    #
+    def __getitem__(self, person_id):
+        node = self.graph.node(person_id)
+        if node is None:
+            raise KeyError(person_id)
+        return {
+            "name": self.graph.person_names[node],
+            "birth": self.graph.person_births[node],
+            "movies": {self.graph.movie_id(movie) for movie in self.graph.movies_of(node)}
+        }
+    #
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+    #
+    def __len__(self):
+        return len(self.graph.person_ids)
+
+
+
+class MoviesView(Mapping):
+    """ movies[movie_id] -> {"title", "year", "stars": set of person_ids} """
+    #
+    def __init__(self, graph):
+        self.graph = graph
+    #
+    def __getitem__(self, movie_id):
+        movie = self.graph.movie_ids.index(movie_id)
+        if movie is None:
+            raise KeyError(movie_id)
+        return {
+            "title": self.graph.movie_titles[movie],
+            "year": self.graph.movie_years[movie],
+            "stars": {self.graph.person_id(star) for star in self.graph.stars_of(movie)}
+        }
+    #
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+    #
+    def __len__(self):
+        return len(self.graph.movie_ids)
+
+
+
+class NamesView(Mapping):
+    """ names[lowercase name] -> set of person_ids """
+    #
+    def __init__(self, graph):
+        self.graph = graph
+    #
+    def __getitem__(self, name):
+        nodes = self.graph.nodes_for_name(name)
+        if not nodes:
+            raise KeyError(name)
+        return {self.graph.person_id(node) for node in nodes}
+    #
+    def __iter__(self):
+        previous = None
+        for name in self.graph.name_keys:
+            if name != previous:
+                yield name
+                previous = name
+    #
+    def __len__(self):
+        return sum(1 for _ in self)
@@ -0,0 +1,164 @@
+"""
+Landmark (ALT) distance tables for A* search in degrees.py.
+    Usage: python landmarks.py directory [-k K]
+
+- Offline: pick K landmark people (the best-connected ones) and store the BFS distance from each
+  landmark to every person, one byte per person per landmark, in directory/landmarks.bin.
+- Online: by the triangle inequality, for any landmark L
+      dist(n, t) >= |dist(L, t) - dist(L, n)|
+  so the max over landmarks is an admissible, consistent A* heuristic: paths stay optimal,
+  but the search heads straight for the target instead of flooding every direction.
+
+Tables are indexed by CompactGraph node, so this needs the compact backend.
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+from array import array
+
+import snapshot
+
+MAGIC = b"DEGLMK\0\0"
+VERSION = 1
+FILENAME = "landmarks.bin"
+PREAMBLE = struct.Struct("=8sII")
+UNREACHABLE = 255 # distances are capped at 254
+
+
+
+class Landmarks():
+    """ K landmark nodes + a uint8 distance table (indexed by node) for each. """
+    #
+    def __init__(self, nodes, tables):
+        self.nodes = nodes
+        self.tables = tables
+    #
+    def heuristic(self, target):
+        """
+        Returns h(node): a lower bound on the degrees between node and target
+        (inf if a landmark proves they're in different components).
+        """
+        #--Landmarks that reach the target give distance bounds; any that don't, must not reach node either.
+        useful = [(table, table[target]) for table in self.tables if table[target] != UNREACHABLE]
+        blind = [table for table in self.tables if table[target] == UNREACHABLE]
+
+        def h(node):
+            for table in blind:
+                if table[node] != UNREACHABLE:
+                    return float("inf")
+            best = 0
+            for table, to_target in useful:
+                to_node = table[node]
+                if to_node == UNREACHABLE:
+                    return float("inf")
+                bound = to_node - to_target if to_node > to_target else to_target - to_node
+                if bound > best:
+                    best = bound
+            return best
+        return h
+
+
+
+def select_landmarks(g, k):
+    """ The k nodes with the most co-star edges (sum of cast sizes over their movies). """
+    def degree(node):
+        return sum(len(g.stars_of(movie)) for movie in g.movies_of(node))
+    return sorted(range(g.num_people()), key=degree, reverse=True)[:k]
+
+
+def bfs_distances(g, landmark):
+    """ Degrees from landmark to every node, as a uint8 array (UNREACHABLE if not connected). """
+    distances = array("B", bytes([UNREACHABLE])) * g.num_people()
+    seen_movies = bytearray(g.num_movies())
+    distances[landmark] = 0
+    layer, depth = [landmark], 0
+    while layer:
+        depth = min(depth + 1, UNREACHABLE - 1)
+        next_layer = []
+        for node in layer:
+            for movie in g.movies_of(node):
+                #--Each movie's cast is scanned once: everyone in it is reached at this depth or earlier.
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for star in g.stars_of(movie):
+                    if distances[star] == UNREACHABLE:
+                        distances[star] = depth
+                        next_layer.append(star)
+        layer = next_layer
+    return distances
+
+
+def build(g, k=16):
+    nodes = select_landmarks(g, k)
+    return Landmarks(nodes, [bfs_distances(g, node) for node in nodes])
+
+
+
+def save(landmarks, directory, num_people):
+    header = json.dumps({
+        "sources": snapshot.source_stats(directory),
+        "people": num_people,
+        "nodes": landmarks.nodes
+    }).encode("utf-8")
+    path = os.path.join(directory, FILENAME)
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        f.write(bytes(snapshot.align(f.tell()) - f.tell()))
+        for table in landmarks.tables:
+            f.write(table)
+    os.replace(temp, path)
+
+
+def load(directory, num_people):
+    """ mmaps directory/landmarks.bin; None if it's missing or was built from other data. """
+    path = os.path.join(directory, FILENAME)
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None
+    view = memoryview(mm)
+    try:
+        magic, version, length = PREAMBLE.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            return None
+        header = json.loads(str(view[PREAMBLE.size:PREAMBLE.size + length], "utf-8"))
+    except (struct.error, ValueError):
+        return None
+    if header["sources"] != snapshot.source_stats(directory) or header["people"] != num_people:
+        return None
+    start = snapshot.align(PREAMBLE.size + length)
+    tables = [view[start + i * num_people:start + (i + 1) * num_people] for i in range(len(header["nodes"]))]
+    return Landmarks(header["nodes"], tables)
+
+
+
+def main():
+    parser = argparse.ArgumentParser(usage="python landmarks.py directory [-k K]")
+    parser.add_argument("directory")
+    parser.add_argument("-k", type=int, default=16, help="number of landmarks")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    g = snapshot.load_or_build(args.directory)
+    start = time.perf_counter()
+    landmarks = build(g, args.k)
+    save(landmarks, args.directory, g.num_people())
+    size = len(landmarks.nodes) * g.num_people()
+    print(f"{len(landmarks.nodes)} landmarks, {size} bytes, built in {time.perf_counter() - start:.1f}s")
+    for node in landmarks.nodes:
+        print(f"  {g.person_names[node]} ({g.person_id(node)})")
+
+
+if __name__ == "__main__":
+    main()
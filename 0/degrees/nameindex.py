@@ -0,0 +1,322 @@
+"""
+Prefix & fuzzy lookup over the lowercase names in degrees.names.
+- Prefix: the distinct names are packed in sorted order (graph.StringTable), so all names
+  starting with a prefix are one binary search + a short scan.
+- Fuzzy: an inverted index trigram -> names containing it. A query is scored against candidates
+  by Dice similarity of their trigram sets, 2|A & B| / (|A| + |B|), which tolerates typos,
+  missing/extra letters and partial names.
+- Fuzzy ids are numbered by trigram count, so the names of any range of sizes are one slice of
+  each (sorted) posting list; candidates are counted and scored in bulk with NumPy (see search()).
+- Typos: every name and its one-letter deletions are hashed, so the names one typo away from a
+  query are a few binary searches (see closest(), for bulk lookups).
+"""
+import sys
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from math import ceil, floor
+
+import numpy as np
+
+from graph import StringTable
+
+SEED_POSTINGS = 6000 # ids search() counts in the rarest posting lists for its first candidates
+SEEDS = 16 # of which it scores the most promising first
+COUNTED = 20000 # ids it counts at most when names outside those lists could still qualify
+
+
+def normalize(name):
+    """ Lowercase, accents stripped, whitespace collapsed: "Penélope  Cruz" -> "penelope cruz". """
+    decomposed = unicodedata.normalize("NFKD", name.lower())
+    return " ".join("".join(c for c in decomposed if not unicodedata.combining(c)).split())
+
+
+def trigrams(name):
+    """ Set of 3-letter substrings, padded so word starts count: "tom" -> {"  t", " to", "tom", "om "}. """
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def deletions(name):
+    """ name and every string one letter shorter: "tom" -> {"tom", "om", "tm", "to"}. """
+    return {name} | {name[:i] + name[i + 1:] for i in range(len(name))}
+
+
+def hashes(strings):
+    return np.array([hash(string) & 0xFFFFFFFF for string in strings], dtype=np.uint32)
+
+
+
+class HashPostings():
+    """
+    32-bit string hash -> ids of the names it came from, as two sorted NumPy arrays (+ a dict for add()).
+    - Hashes only: two strings can collide, so lookups return candidates, to be scored.
+    """
+    #
+    def __init__(self, keys, ids):
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.ids = ids[order]
+        self.added = {}
+    #
+    def add(self, string, i):
+        self.added.setdefault(hash(string) & 0xFFFFFFFF, []).append(i)
+    #
+    def lookup(self, strings):
+        """ Ids of the names any of strings came from (an int array; a name can be in it more than once). """
+        probes = hashes(strings)
+        starts = np.searchsorted(self.keys, probes).tolist()
+        stops = np.searchsorted(self.keys, probes, side="right").tolist()
+        pieces = [self.ids[start:stop] for start, stop in zip(starts, stops) if start < stop]
+        if self.added:
+            pieces.extend(np.array(self.added.get(probe, []), dtype=np.int32) for probe in probes.tolist())
+        if not pieces:
+            return np.zeros(0, dtype=np.int32)
+        return np.concatenate(pieces)
+    #
+    def nbytes(self):
+        return self.keys.nbytes + self.ids.nbytes + sys.getsizeof(self.added) + sum(sys.getsizeof(ids) for ids in self.added.values())
+
+
+
+class NameIndex():
+    """
+    Built from the keys of a names mapping (lowercase name -> person ids).
+    - keys are in alphabetical order (for prefix()); fuzzy ids in order of trigram count, then name.
+    - Names added later (add()) get the next ids after the size-ordered ones, so posting lists stay sorted.
+    """
+    #
+    def __init__(self, names):
+        self.keys = StringTable.pack(sorted(names))
+        self.added = [] # names added since, in id order
+        self.added_sorted = []
+        self.gram_ids = {} # trigram -> its posting list's index in self.postings
+
+        #--Trigram ids of every name, in alphabetical order first (and its hashed typo variants and words):
+        grams, ends, sizes = array("i"), array("q"), []
+        variants, variant_names, words, word_names = array("I"), array("i"), array("I"), array("i")
+        for k, key in enumerate(self.keys):
+            key = normalize(key)
+            name_grams = trigrams(key)
+            grams.extend(self.gram_ids.setdefault(gram, len(self.gram_ids)) for gram in name_grams)
+            ends.append(len(grams))
+            sizes.append(min(len(name_grams), 0xFFFF))
+            typos, key_words = deletions(key), set(key.split())
+            variants.extend(hash(variant) & 0xFFFFFFFF for variant in typos)
+            variant_names.extend([k] * len(typos))
+            words.extend(hash(word) & 0xFFFFFFFF for word in key_words)
+            word_names.extend([k] * len(key_words))
+
+        #--Then renumbered by size: self.order[i] is the position in keys of the name with fuzzy id i.
+        self.order = array("i", sorted(range(len(self.keys)), key=lambda k: (sizes[k], k)))
+        self.sized = len(self.order) # ids below this are in size order
+        self.sizes = array("H", (sizes[k] for k in self.order)) # number of trigrams of each name
+        self.grams = array("i") # trigram ids of each name, self.offsets[i]:self.offsets[i + 1]
+        self.offsets = array("q", [0])
+        postings = [[] for _ in self.gram_ids]
+        for i, k in enumerate(self.order):
+            name_grams = grams[ends[k - 1] if k else 0:ends[k]]
+            self.grams.extend(name_grams)
+            self.offsets.append(len(self.grams))
+            for gram in name_grams:
+                postings[gram].append(i)
+        #--Posting lists as sorted int arrays: 4 bytes per entry, and binary-searchable.
+        self.postings = [array("i", ids) for ids in postings]
+
+        rank = np.empty(len(self.order), dtype=np.int32) # position in keys -> fuzzy id
+        rank[np.frombuffer(self.order, dtype=np.int32)] = np.arange(len(self.order), dtype=np.int32)
+        self.typos = HashPostings(np.frombuffer(variants, dtype=np.uint32), rank[np.frombuffer(variant_names, dtype=np.int32)])
+        self.words = HashPostings(np.frombuffer(words, dtype=np.uint32), rank[np.frombuffer(word_names, dtype=np.int32)])
+    #
+    def __len__(self):
+        return self.sized + len(self.added)
+    #
+    def key(self, i):
+        return self.keys[self.order[i]] if i < self.sized else self.added[i - self.sized]
+    #
+    def add(self, key):
+        """ Indexes one more (lowercase, not yet indexed) name. """
+        i = len(self)
+        self.added.append(key)
+        insort(self.added_sorted, key)
+        normalized = normalize(key)
+        for variant in deletions(normalized):
+            self.typos.add(variant, i)
+        for word in set(normalized.split()):
+            self.words.add(word, i)
+        grams = trigrams(normalized)
+        self.sizes.append(min(len(grams), 0xFFFF))
+        for gram in grams:
+            if gram not in self.gram_ids:
+                self.gram_ids[gram] = len(self.postings)
+                self.postings.append(array("i"))
+            self.postings[self.gram_ids[gram]].append(i)
+            self.grams.append(self.gram_ids[gram])
+        self.offsets.append(len(self.grams))
+    #
+    def prefix(self, prefix, limit=10):
+        """ Up to limit names starting with prefix (case-insensitive), in alphabetical order. """
+        prefix = prefix.lower()
+        matches = []
+        for keys in (self.keys, self.added_sorted):
+            i = bisect_left(keys, prefix)
+            found = 0
+            while i < len(keys) and found < limit:
+                key = keys[i]
+                if not key.startswith(prefix):
+                    break
+                matches.append(key)
+                found += 1
+                i += 1
+        return sorted(matches)[:limit]
+    #
+    def search(self, name, limit=10, min_score=0.5):
+        """
+        Ranked [(score, name), ...] of the names most similar to name (best first), score in (0, 1].
+        - Exact: the same ranking as scoring every name, ties broken by name.
+        - The query's posting lists are taken rarest first. A name whose rarest shared trigram is in the
+          j-th list shares at most q - j trigrams, which only names of a narrow range of sizes (one id
+          range, see window()) can turn into a top score.
+        - The first lists' names are scored outright; the limit-th best score so far is the threshold
+          the rest must reach. Names first found further on are counted across the lists that can still
+          hold them, and only those frequent enough to reach the threshold are scored.
+        """
+        query = trigrams(normalize(name))
+        q = len(query)
+        gram_ids = [self.gram_ids[gram] for gram in query if gram in self.gram_ids]
+        lists = sorted((self.postings[gram] for gram in gram_ids), key=len)
+        in_query = np.zeros(len(self.postings), dtype=bool)
+        in_query[gram_ids] = True
+        #--Query trigrams no name has count towards q, but no name shares them:
+        most = len(gram_ids)
+
+        if not lists:
+            return []
+
+        #--Count the names in the rarest lists (at least the rarest, at most SEED_POSTINGS ids in all):
+        counted = 1
+        read = len(lists[0])
+        while counted < len(lists) and read + len(lists[counted]) <= SEED_POSTINGS:
+            read += len(lists[counted])
+            counted += 1
+        ids, counts = self.count([np.frombuffer(ids, dtype=np.int32) for ids in lists[:counted]])
+        sizes = np.frombuffer(self.sizes, dtype=np.uint16)[ids].astype(np.int64)
+
+        #--The SEEDS best of them at best (sharing every list not counted too) are scored first,
+        #  for a threshold close to the final one:
+        best = np.minimum(counts + (most - counted), sizes) / (q + sizes)
+        seeds = np.argpartition(best, len(ids) - SEEDS)[len(ids) - SEEDS:] if len(ids) > SEEDS else np.arange(len(ids))
+        scores = self.score(ids[seeds], q, in_query)
+        threshold = min_score
+        if 0 < limit <= len(scores):
+            threshold = max(threshold, float(np.partition(scores, len(scores) - limit)[len(scores) - limit]))
+
+        #--The rest only if in enough of the counted lists to reach it:
+        needed = np.ceil(threshold * (q + sizes) / 2 - 1e-9) - (most - counted)
+        keep = counts >= needed
+        keep[seeds] = False
+        more = ids[keep]
+        ids, scores = np.concatenate((ids[seeds], more)), np.concatenate((scores, self.score(more, q, in_query)))
+        if 0 < limit <= len(scores):
+            threshold = max(threshold, float(np.partition(scores, len(scores) - limit)[len(scores) - limit]))
+
+        #--Names in none of the counted lists share at most most - counted trigrams:
+        span = self.window(q, most - counted, threshold) if counted < len(lists) else None
+        if span is not None:
+            #--Count them over the lists that can hold them (and more, up to COUNTED ids in all),
+            #  and score only those in enough lists to reach the threshold.
+            last = counted + 1
+            while last < len(lists) and self.window(q, most - last, threshold) is not None:
+                last += 1
+            pieces = [self.slice(ids_j, span) for ids_j in lists[counted:last]]
+            read = sum(map(len, pieces))
+            while last < len(lists) and read + len(lists[last]) <= COUNTED:
+                pieces.append(self.slice(lists[last], span))
+                read += len(pieces[-1])
+                last += 1
+            more, counts = self.count(pieces)
+            needed = np.ceil(threshold * (q + np.frombuffer(self.sizes, dtype=np.uint16)[more]) / 2 - 1e-9)
+            scored = np.zeros(len(self), dtype=bool)
+            scored[ids] = True
+            more = more[(counts >= needed - (len(lists) - last)) & ~scored[more]]
+            ids, scores = np.concatenate((ids, more)), np.concatenate((scores, self.score(more, q, in_query)))
+
+        found = np.flatnonzero(scores >= threshold)
+        matches = sorted((-score, self.key(i)) for score, i in zip(scores[found].tolist(), ids[found].tolist()))
+        return [(-score, key) for score, key in matches[:limit]]
+    #
+    def closest(self, name, min_score=0.5):
+        """
+        (score, name) of a best match for name, for bulk lookups (None if no name scores min_score).
+        - The best scoring of the names one typo away (a letter missing, extra or wrong, or two swapped);
+          failing those, of the names with one of its words (partial names); failing those, search()'s.
+        - The first two are hash lookups, far cheaper than search(), but can miss a better scoring name
+          that is more than a typo away and has none of the words.
+        """
+        key = normalize(name)
+        query = trigrams(key)
+        gram_ids = [self.gram_ids[gram] for gram in query if gram in self.gram_ids]
+        in_query = np.zeros(len(self.postings), dtype=bool)
+        in_query[gram_ids] = True
+        for table, strings in ((self.typos, deletions(key)), (self.words, set(key.split()))):
+            ids = table.lookup(strings)
+            scores = self.score(ids, len(query), in_query)
+            found = np.flatnonzero(scores >= min_score)
+            if len(found):
+                score, match = min((-score, self.key(i)) for score, i in zip(scores[found].tolist(), ids[found].tolist()))
+                return -score, match
+        matches = self.search(name, 1, min_score)
+        return matches[0] if matches else None
+    #
+    def window(self, q, most, threshold):
+        """
+        (first id, stop id) of the sizes that can score >= threshold against a query of q trigrams
+        sharing at most `most` of them; None if none can.
+        """
+        #--Size s sharing m <= most trigrams: 2m / (q + s) >= threshold needs s >= lo and s <= hi.
+        lo = ceil(threshold * q / (2 - threshold) - 1e-9)
+        hi = floor(2 * most / threshold - q + 1e-9)
+        if lo > hi:
+            return None
+        return bisect_left(self.sizes, lo, 0, self.sized), bisect_left(self.sizes, hi + 1, 0, self.sized)
+    #
+    def slice(self, ids, span):
+        """ The ids (an int array) of posting list ids in span, and every added name's. """
+        view = np.frombuffer(ids, dtype=np.int32)
+        first = bisect_left(ids, span[0])
+        stop = bisect_left(ids, span[1], first)
+        #--Added names aren't in size order:
+        added = bisect_left(ids, self.sized, stop)
+        if added == len(ids):
+            return view[first:stop]
+        return np.concatenate((view[first:stop], view[added:]))
+    #
+    def count(self, pieces):
+        """ (ids, counts): each distinct id in the int arrays pieces, and how many of them it's in. """
+        found = np.concatenate(pieces)
+        found.sort()
+        starts = np.flatnonzero(np.concatenate(([len(found) > 0], found[1:] != found[:-1])))
+        return found[starts], np.diff(np.append(starts, len(found)))
+    #
+    def score(self, ids, q, in_query):
+        """ Dice similarity of each of ids to the query (in_query marks its trigram ids). """
+        if len(ids) == 0:
+            return np.zeros(0)
+        offsets = np.frombuffer(self.offsets, dtype=np.int64)
+        starts = offsets[ids]
+        lengths = offsets[ids + 1] - starts
+        #--Positions of all the names' trigram ids in self.grams, one name after the other:
+        ends = np.cumsum(lengths)
+        positions = np.arange(ends[-1]) + np.repeat(starts - (ends - lengths), lengths)
+        hits = in_query[np.frombuffer(self.grams, dtype=np.int32)[positions]]
+        shared = np.add.reduceat(hits, ends - lengths, dtype=np.int64)
+        return 2 * shared / (q + np.frombuffer(self.sizes, dtype=np.uint16)[ids])
+    #
+    def nbytes(self):
+        """ Approximate memory used by the index, in bytes. """
+        size = self.keys.nbytes() + sum(sys.getsizeof(a) for a in (self.order, self.sizes, self.grams, self.offsets))
+        size += sum(sys.getsizeof(key) for key in self.added) + 2 * sys.getsizeof(self.added)
+        size += sys.getsizeof(self.gram_ids) + sys.getsizeof(self.postings) + self.typos.nbytes() + self.words.nbytes()
+        for gram, ids in zip(self.gram_ids, self.postings):
+            size += sys.getsizeof(gram) + sys.getsizeof(ids)
+        return size
@@ -0,0 +1,113 @@
+"""
+Every shortest path between two people (for degrees.all_shortest_paths).
+- One BFS from the source labels people with their depth, up to the target's layer. The shortest paths
+  are then exactly the edges (movie, co-star) from depth d to depth d + 1 that lead back from the target:
+  a layered DAG, built once.
+- Paths are enumerated from the DAG lazily. Two people can be joined by millions of equally short paths,
+  but the DAG only holds one entry per edge on some shortest path, and the enumeration holds one
+  partial path per pending branch, each a linked list sharing its tail with its siblings.
+"""
+import heapq
+from itertools import count
+
+
+
+def shortest_path_dag(g, source, target):
+    """
+    Returns (parents, num_explored): parents maps every node on a shortest source -> target path to its
+    [(movie, node one step closer to source), ...], target first, layer by layer back to the source.
+    parents is None if they aren't connected.
+    """
+    if source == target:
+        return {source: []}, 0
+    depth = {source: 0}
+    layer = [source]
+    seen_movies = set()
+    num_explored = 0
+    while layer and target not in depth:
+        next_layer = []
+        for node in layer:
+            num_explored += 1
+            for movie in g.movies_of(node):
+                #--BFS reaches a movie first from its shallowest star, so its cast's depths are final:
+                if movie in seen_movies:
+                    continue
+                seen_movies.add(movie)
+                for star in g.stars_of(movie):
+                    if star not in depth:
+                        depth[star] = depth[node] + 1
+                        next_layer.append(star)
+            #--Everyone one layer short of the target is labelled already: the DAG needs no more.
+            if target in depth:
+                break
+        layer = next_layer
+    if target not in depth:
+        return None, num_explored
+
+    #--Walk back from the target: a node's parents are its co-stars exactly one layer closer to the source.
+    parents = {}
+    layer = [target]
+    while layer:
+        next_layer = {} # ordered set
+        for node in layer:
+            edges = parents[node] = []
+            for movie in g.movies_of(node):
+                for star in g.stars_of(movie):
+                    if depth.get(star) == depth[node] - 1:
+                        edges.append((movie, star))
+                        if star not in parents:
+                            next_layer[star] = None
+        layer = next_layer
+    return parents, num_explored
+
+
+def enumerate_paths(parents, source, target, cost=None):
+    """
+    Yields every source -> target path of the DAG as a [(movie, node), ...] list.
+    - cost=None: depth-first from the target, in no particular order.
+    - cost(movie) -> number: in ascending total cost over the path's movies, cheapest first.
+      Best-first search over the DAG, guided by the exact cheapest cost from each node back to the
+      source: every popped partial path extends to a complete one, so nothing is expanded in vain.
+    """
+    if cost is None:
+        stack = [(target, None)]
+        while stack:
+            node, tail = stack.pop()
+            if node == source:
+                yield unwind(tail)
+                continue
+            for movie, parent in reversed(parents[node]):
+                stack.append((parent, ((movie, node), tail)))
+        return
+
+    #--parents lists the target first and the source last, so reversed it's a topological order:
+    movie_costs = {}
+    def step(movie):
+        if movie not in movie_costs:
+            movie_costs[movie] = cost(movie)
+        return movie_costs[movie]
+    cheapest = {}
+    for node in reversed(list(parents)):
+        cheapest[node] = min((cheapest[parent] + step(movie) for movie, parent in parents[node]), default=0)
+
+    #--Equal costs pop newest first (never comparing the linked lists): tied branches are followed depth-first
+    #  to a complete path, so the heap holds about path length x branching entries, not one per tied path.
+    tiebreak = count()
+    frontier = [(cheapest[target], -next(tiebreak), 0, target, None)] # (estimate, -push order, suffix cost, node, tail)
+    while frontier:
+        _, _, suffix, node, tail = heapq.heappop(frontier)
+        if node == source:
+            yield unwind(tail)
+            continue
+        for movie, parent in parents[node]:
+            total = suffix + step(movie)
+            heapq.heappush(frontier, (cheapest[parent] + total, -next(tiebreak), total, parent, ((movie, node), tail)))
+
+
+def unwind(tail):
+    """ The linked list ((movie, node), ((movie, node), ... None)) as a path list. """
+    path = []
+    while tail is not None:
+        path.append(tail[0])
+        tail = tail[1]
+    return path
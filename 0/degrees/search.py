@@ -0,0 +1,146 @@
+"""
+Alternative search strategies for degrees.shortest_path.
+- Each works on graph nodes (see graph.py) and returns (path, num_explored),
+  path being a list of (movie, node) steps from source to target, or None if not connected.
+- Movies are visited nodes too: the first time a search reaches a movie it's from its best-placed
+  star, so every later visit can skip the cast entirely. Each cast is walked at most once per
+  search (per side), instead of once per cast member reached. (A* only skips a cast already walked
+  from a node at most as deep: see astar.)
+"""
+import heapq
+
+
+
+def bidirectional(g, source, target):
+    """
+    Bidirectional Breadth-First Search:
+    - Grows whole BFS layers from both the source and the target, always expanding the smaller side.
+    - Checks for the goal when a node is generated (it's in the other side's visited set), not when it's popped.
+    - Two balls of radius ~d/2 are far smaller than one of radius d when the branching factor is large.
+    """
+    if source == target:
+        return [], 0
+    #--Visited nodes of each side -> (movie, node one step closer to that side's start):
+    forward = {source: None}
+    backward = {target: None}
+    forward_movies, backward_movies = set(), set()
+    forward_layer, backward_layer = [source], [target]
+    num_explored = 0
+
+    while forward_layer and backward_layer:
+        #--Expand the smaller frontier:
+        if len(forward_layer) <= len(backward_layer):
+            forward_layer, meet, explored = expand_layer(g, forward_layer, forward, backward, forward_movies)
+        else:
+            backward_layer, meet, explored = expand_layer(g, backward_layer, backward, forward, backward_movies)
+        num_explored += explored
+        if meet is not None:
+            return join_paths(meet, forward, backward), num_explored
+    #--One side ran out of nodes: not connected.
+    return None, num_explored
+
+
+def expand_layer(g, layer, visited, other, seen_movies):
+    """
+    Expands every node of one BFS layer, returning (next_layer, meeting node or None, nodes expanded).
+    """
+    next_layer = []
+    explored = 0
+    for node in layer:
+        explored += 1
+        for movie in g.movies_of(node):
+            if movie in seen_movies:
+                continue
+            seen_movies.add(movie)
+            for star in g.stars_of(movie):
+                if star in visited:
+                    continue
+                visited[star] = (movie, node)
+                #--Goal check on generation: the two searches have met.
+                if star in other:
+                    return next_layer, star, explored
+                next_layer.append(star)
+    return next_layer, None, explored
+
+
+def join_paths(meet, forward, backward):
+    """ Rebuilds the (movie, node) path source -> meet -> target from both parent maps. """
+    path = walk_back(meet, forward)
+    node = meet
+    while backward[node] is not None:
+        movie, following = backward[node]
+        path.append((movie, following))
+        node = following
+    return path
+
+
+
+def astar(g, source, target, h):
+    """
+    A* search with heuristic h(node) -> lower bound on the degrees to target (see landmarks.py).
+    - h must be consistent (landmark bounds are), so no path is shorter than the f = g + h being expanded.
+    - Checks for the goal when a node is generated: a path to the target no longer than the f of the node
+      being expanded can't be beaten, so it's returned at once (otherwise, once the frontier's f reaches it).
+    - Ties on f go to the smaller h (the deeper node, closer to the target), then to the node generated
+      first, i.e. from the best parent, instead of falling back to node-id order.
+    - Unlike BFS, A* can expand a deeper node before a shallower one (its f is no larger), so a movie
+      can first be reached at more than its true depth. A movie is only skipped if it was already expanded
+      from a node at most as deep as this one; otherwise its cast is walked again to correct their depths.
+    """
+    if source == target:
+        return [], 0
+    estimate = h(source)
+    if estimate == float("inf"):
+        return None, 0
+    depth = {source: 0}
+    parents = {source: None}
+    frontier = [(estimate, estimate, 0, source)] # (f, h, generation order, node)
+    generated = 0
+    best = float("inf") # depth of the best path to target found so far
+    closed = set()
+    seen_movies = {} # movie -> depth of the shallowest node that has expanded it
+    num_explored = 0
+
+    while frontier:
+        f, _, _, node = heapq.heappop(frontier)
+        if f >= best:
+            break # nothing left on the frontier can reach the target sooner
+        if node in closed:
+            continue # stale entry: node was already reached more cheaply
+        closed.add(node)
+        num_explored += 1
+
+        child_depth = depth[node] + 1
+        for movie in g.movies_of(node):
+            if seen_movies.get(movie, child_depth) < child_depth:
+                continue
+            seen_movies[movie] = depth[node]
+            for star in g.stars_of(movie):
+                if child_depth < depth.get(star, float("inf")):
+                    if star == target:
+                        depth[star] = best = child_depth
+                        parents[star] = (movie, node)
+                        if best <= f:
+                            return walk_back(target, parents), num_explored
+                        continue
+                    estimate = h(star)
+                    if estimate == float("inf"):
+                        continue
+                    depth[star] = child_depth
+                    parents[star] = (movie, node)
+                    generated += 1
+                    heapq.heappush(frontier, (child_depth + estimate, estimate, generated, star))
+    if best == float("inf"):
+        return None, num_explored
+    return walk_back(target, parents), num_explored
+
+
+def walk_back(node, parents):
+    """ The (movie, node) path from the search's start to node, following parents. """
+    path = []
+    while parents[node] is not None:
+        movie, previous = parents[node]
+        path.append((movie, node))
+        node = previous
+    path.reverse()
+    return path
@@ -0,0 +1,132 @@
+"""
+Binary snapshot of a CompactGraph, written next to the CSVs so later runs skip parsing them.
+
+Layout (native byte order, every section 8-byte aligned so it can be cast in place):
+    b"DEGSNAP\\0" | version (uint32) | header length (uint32) | JSON header | sections...
+The JSON header records the size/mtime of each CSV the snapshot was built from and
+where each section lives: {"name": [offset, length, typecode]}.
+
+Loading mmaps the file and wraps each section in a memoryview: nothing is parsed or copied,
+pages are read lazily by the OS (and shared between processes opening the same file).
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+
+from graph import CompactGraph, StringTable
+
+MAGIC = b"DEGSNAP\0"
+VERSION = 2
+FILENAME = "degrees.snapshot"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+PREAMBLE = struct.Struct("=8sII")
+
+
+
+def snapshot_path(directory):
+    return os.path.join(directory, FILENAME)
+
+
+def source_stats(directory):
+    """ {csv filename: {"size", "mtime_ns"}} – what a snapshot has to match to still be fresh. """
+    stats = {}
+    for filename in SOURCES:
+        st = os.stat(os.path.join(directory, filename))
+        stats[filename] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    return stats
+
+
+def save(graph, directory):
+    """ Writes graph to directory/degrees.snapshot (atomically, via a temp file + rename). """
+    #--Every section as (name, typecode, buffer):
+    sections = []
+    for name in CompactGraph.TABLES:
+        table = getattr(graph, name)
+        sections.append((f"{name}.blob", "B", table.blob))
+        sections.append((f"{name}.offsets", element_type(table.offsets), table.offsets))
+    for name in CompactGraph.ARRAYS:
+        values = getattr(graph, name)
+        sections.append((name, element_type(values), values))
+
+    #--Work out offsets. The header's length depends on the offsets, so size it with placeholders first:
+    header = {"byteorder": sys.byteorder, "sources": source_stats(directory), "sections": {}}
+    for name, typecode, data in sections:
+        header["sections"][name] = [0, memoryview(data).nbytes, typecode]
+    position = align(PREAMBLE.size + len(json.dumps(header)) + 64 * len(sections))
+    for name, typecode, data in sections:
+        header["sections"][name][0] = position
+        position = align(position + memoryview(data).nbytes)
+    encoded = json.dumps(header).encode("utf-8")
+    assert PREAMBLE.size + len(encoded) <= header["sections"][sections[0][0]][0], "snapshot header overflow"
+
+    path = snapshot_path(directory)
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, VERSION, len(encoded)))
+        f.write(encoded)
+        for name, typecode, data in sections:
+            f.write(bytes(header["sections"][name][0] - f.tell()))
+            f.write(memoryview(data).cast("B"))
+    os.replace(temp, path)
+
+
+def load(directory):
+    """
+    Returns the CompactGraph stored in directory's snapshot,
+    or None if there is none, it's from another version/machine, or any CSV changed since.
+    """
+    path = snapshot_path(directory)
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError: # empty file
+            return None
+    view = memoryview(mm)
+    try:
+        magic, version, length = PREAMBLE.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            return None
+        header = json.loads(str(view[PREAMBLE.size:PREAMBLE.size + length], "utf-8"))
+    except (struct.error, ValueError):
+        return None
+    if header["byteorder"] != sys.byteorder or header["sources"] != source_stats(directory):
+        return None
+
+    def section(name):
+        offset, nbytes, typecode = header["sections"][name]
+        return view[offset:offset + nbytes].cast(typecode)
+
+    fields = {}
+    for name in CompactGraph.TABLES:
+        fields[name] = StringTable(section(f"{name}.blob"), section(f"{name}.offsets"))
+    for name in CompactGraph.ARRAYS:
+        fields[name] = section(name)
+    return CompactGraph(**fields)
+
+
+def load_or_build(directory):
+    """ Opens the snapshot if it's fresh, otherwise parses the CSVs and (re)writes it. """
+    graph = load(directory)
+    if graph is not None:
+        return graph
+    graph = CompactGraph.from_csv(directory)
+    try:
+        save(graph, directory)
+    except OSError as e: # e.g. read-only data directory: still usable, just not cached
+        print(f"Could not write snapshot: {e}", file=sys.stderr)
+    return graph
+
+
+def element_type(values):
+    """ Element type of an array.array, or of a memoryview from a loaded snapshot. """
+    return values.typecode if hasattr(values, "typecode") else values.format
+
+
+def align(n, to=8):
+    return (n + to - 1) // to * to
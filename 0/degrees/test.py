@@ -0,0 +1,745 @@
+import unittest
+import unittest.mock
+import random
+import copy
+import os
+import tempfile
+import io
+import sys
+import contextlib
+import heapq
+from collections import deque
+
+import degrees
+from graph import DictGraph, CompactGraph
+from landmarks import Landmarks, UNREACHABLE
+import landmarks
+from nameindex import NameIndex, normalize, trigrams
+from search import astar, bidirectional
+from paths import enumerate_paths
+import paths
+import util
+from generate import generate
+import snapshot
+import batch
+
+""" TESTS for degrees search strategies:
+
+- FrontierTestCase: the deque frontiers pop in stack/queue order and keep contains_state in step with what's in them– util.StackFrontier / util.QueueFrontier.
+
+- AStarTestCase: A* (with landmark bounds) and bidirectional BFS find paths as short as plain BFS– search.astar / search.bidirectional.
+
+- LandmarksTestCase: landmark tables match a reference BFS, survive landmarks.bin, and let shortest_path(mode="astar") on the compact backend match BFS– landmarks.py.
+
+- NameIndexTestCase: fuzzy name lookup ranks like a brute-force Dice similarity scan– nameindex.NameIndex.
+
+- UpdateTestCase: update_data after appending to the CSVs leaves what a fresh load_data would– degrees.update_data.
+
+- SnapshotTestCase: a CompactGraph saved and mmapped back is the same graph, and stale or foreign snapshots are refused– snapshot.py.
+
+- BackendTestCase: load_data(compact=True) answers exactly like the dict backend– graph.CompactGraph and its views.
+
+- AllPathsTestCase: all_shortest_paths yields every shortest path exactly once, in rank order– paths.py.
+
+- GenerateTestCase: the synthetic dataset generator writes the same bytes for the same seed, and load_data reads them– generate.py.
+
+- BatchTestCase: batch queries report bad input per query instead of aborting the batch– batch.py.
+
+- To run all tests:
+    $ python3 test.py
+
+"""
+
+
+
+def random_dataset(rng, num_people, num_movies, cast_size):
+    """ people/movies dicts (degrees.load_data's shape) with random casts. """
+    people = {str(p): {"name": str(p), "birth": "", "movies": set()} for p in range(num_people)}
+    movies = {}
+    for m in range(num_movies):
+        stars = set(rng.sample(sorted(people), rng.randint(1, cast_size)))
+        movies[str(100 + m)] = {"title": str(m), "year": "2000", "stars": stars}
+        for star in stars:
+            people[star]["movies"].add(str(100 + m))
+    return people, movies
+
+
+def landmark_tables(g, people, nodes):
+    """ Landmarks over a DictGraph: BFS degrees from each landmark to every person. """
+    tables = []
+    for landmark in nodes:
+        distances = dict.fromkeys(people, UNREACHABLE)
+        distances[landmark] = 0
+        queue = deque([landmark])
+        while queue:
+            node = queue.popleft()
+            for movie in g.movies_of(node):
+                for star in g.stars_of(movie):
+                    if distances[star] == UNREACHABLE:
+                        distances[star] = distances[node] + 1
+                        queue.append(star)
+        tables.append(distances)
+    return Landmarks(nodes, tables)
+
+
+
+def dice(a, b):
+    a, b = trigrams(a), trigrams(b)
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def random_names(rng, count):
+    syllables = ["an", "ber", "ca", "del", "er", "fo", "ga", "hal", "in", "jo", "ka", "lo", "mar", "ne", "ol", "pe", "ra", "son", "ti", "vy"]
+    word = lambda: "".join(rng.choice(syllables) for _ in range(rng.randint(1, 3)))
+    return sorted({" ".join(word() for _ in range(rng.randint(1, 3))) for _ in range(count)})
+
+
+HEADERS = {"people.csv": "id,name,birth", "movies.csv": "id,title,year", "stars.csv": "person_id,movie_id"}
+
+
+def csv_rows(rng, num_people, num_movies, cast_size):
+    """ {filename: rows} of a random dataset, in CSV column order (people named with random_names). """
+    names = random_names(rng, num_people)
+    people = [[str(p), name.title(), str(1900 + p % 100)] for p, name in enumerate(names)]
+    movies = [[str(1000 + m), f"Movie {m}", str(1950 + m % 70)] for m in range(num_movies)]
+    stars = [[person[0], movie[0]] for movie in movies for person in rng.sample(people, rng.randint(1, cast_size))]
+    return {"people.csv": people, "movies.csv": movies, "stars.csv": stars}
+
+
+def write_rows(directory, filename, rows, mode="a", end="\n"):
+    """ Writes (mode "w": a header and) rows to directory/filename; end is the last row's line ending. """
+    with open(os.path.join(directory, filename), mode, newline="") as f:
+        if mode == "w":
+            f.write(HEADERS[filename] + "\n")
+        f.write("".join(",".join(row) + "\n" for row in rows[:-1]))
+        if rows:
+            f.write(",".join(rows[-1]) + end)
+
+
+def partition(labels):
+    """ Components as a set of frozensets of nodes (labels themselves are arbitrary). """
+    groups = {}
+    for node, label in labels.items():
+        groups.setdefault(label, set()).add(node)
+    return {frozenset(group) for group in groups.values()}
+
+
+class SavedState():
+    """ Saves degrees' module-level data on setUp and puts it back on tearDown (load_data replaces it). """
+    #
+    FIELDS = ("graph", "names", "people", "movies", "name_lookup", "landmark_tables")
+    #
+    def setUp(self):
+        self.saved = {field: getattr(degrees, field) for field in self.FIELDS}
+        self.saved_watermarks = dict(degrees.watermarks), list(degrees.orphan_stars)
+        degrees.names, degrees.people, degrees.movies = {}, {}, {}
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name
+    def tearDown(self):
+        for field, value in self.saved.items():
+            setattr(degrees, field, value)
+        degrees.watermarks.clear(), degrees.watermarks.update(self.saved_watermarks[0])
+        degrees.orphan_stars[:] = self.saved_watermarks[1]
+        self.directory.cleanup()
+
+
+def typo(rng, name):
+    i = rng.randrange(len(name))
+    return rng.choice([name[:i] + name[i + 1:], name[:i] + "x" + name[i:], name[:i] + "q" + name[i + 1:]])
+
+
+#
+# #
+#
+class FrontierTestCase(unittest.TestCase):
+    """ StackFrontier is last-in first-out, QueueFrontier first-in first-out; contains_state counts every node holding a state. """
+    #
+    Node, StackFrontier, QueueFrontier = util.Node, util.StackFrontier, util.QueueFrontier
+    # # #
+    def test_order(self):
+        for frontier, expected in ((self.StackFrontier(), "cba"), (self.QueueFrontier(), "abc")):
+            for state in "abc":
+                frontier.add(self.Node(state, None, None))
+            self.assertEqual("".join(frontier.remove().state for _ in range(3)), expected, type(frontier).__name__)
+            self.assertTrue(frontier.empty())
+    #
+    def test_contains_state_after_remove(self):
+        for frontier in (self.StackFrontier(), self.QueueFrontier()):
+            for state in ("a", "b", "a"): #--the same state in the frontier twice
+                frontier.add(self.Node(state, None, None))
+            self.assertTrue(frontier.contains_state("a"))
+            self.assertFalse(frontier.contains_state("z"))
+            frontier.remove()
+            self.assertTrue(frontier.contains_state("a"), "one node still holds it")
+            frontier.remove(), frontier.remove()
+            self.assertFalse(frontier.contains_state("a"))
+            self.assertFalse(frontier.contains_state("b"))
+    #
+    def test_remove_from_empty(self):
+        for frontier in (self.StackFrontier(), self.QueueFrontier()):
+            self.assertTrue(frontier.empty())
+            with self.assertRaises(Exception):
+                frontier.remove()
+            frontier.add(self.Node("a", None, None))
+            frontier.remove()
+            with self.assertRaises(Exception):
+                frontier.remove()
+
+
+
+#
+# #
+#
+class AStarTestCase(SavedState, unittest.TestCase):
+    """ Every strategy must return a path of the same length as breadth-first search (or None when it does). """
+    #
+    def setUp(self):
+        super().setUp()
+        degrees.graph = None
+        degrees.landmark_tables = None
+    # # #
+    def test_same_length_as_bfs(self):
+        rng = random.Random(0)
+        for trial in range(200):
+            people, movies = random_dataset(rng, rng.randint(4, 30), rng.randint(2, 20), 4)
+            degrees.people, degrees.movies = people, movies
+            g = DictGraph(people, movies)
+            tables = landmark_tables(g, people, rng.sample(sorted(people), 2))
+            for _ in range(10):
+                source, target = rng.sample(sorted(people), 2)
+                expected = degrees.shortest_path(source, target, mode="bfs")
+                path, _ = astar(g, source, target, tables.heuristic(target))
+                both, _ = bidirectional(g, source, target)
+                for found in (path, both):
+                    if expected is None:
+                        self.assertIsNone(found, f"trial {trial}: {source} -> {target}")
+                    else:
+                        self.assertEqual(len(found), len(expected), f"trial {trial}: {source} -> {target}")
+
+
+
+#
+# #
+#
+class LandmarksTestCase(SavedState, unittest.TestCase):
+    """ Distance tables built on a CompactGraph, as written to and mmapped back from landmarks.bin, give A* paths as short as BFS. """
+    #
+    def setUp(self):
+        super().setUp()
+        self.rng = random.Random(8)
+        rows = csv_rows(self.rng, 150, 70, 4)
+        rows["people.csv"].append(["88888", "Nobody Cast", ""]) #--in no movie: unreachable from everyone
+        for filename, rows in rows.items():
+            write_rows(self.path, filename, rows, "w")
+        self.graph = CompactGraph.from_csv(self.path)
+    # # #
+    def test_bfs_distances(self):
+        g = self.graph
+        nodes = range(g.num_people())
+        for landmark in self.rng.sample(nodes, 10):
+            expected = landmark_tables(g, nodes, [landmark]).tables[0]
+            self.assertEqual(list(landmarks.bfs_distances(g, landmark)), [expected[node] for node in nodes])
+        self.assertEqual(landmarks.bfs_distances(g, g.node("88888")).count(UNREACHABLE), g.num_people() - 1)
+    #
+    def test_save_and_load(self):
+        g = self.graph
+        built = landmarks.build(g, k=4)
+        self.assertEqual(len(built.nodes), 4)
+        landmarks.save(built, self.path, g.num_people())
+        loaded = landmarks.load(self.path, g.num_people())
+        self.assertEqual(loaded.nodes, built.nodes)
+        self.assertEqual([bytes(table) for table in loaded.tables], [bytes(table) for table in built.tables])
+        self.assertIsNone(landmarks.load(self.path, g.num_people() + 1), "built for a different graph")
+        write_rows(self.path, "people.csv", [["99999", "Late Arrival", ""]])
+        self.assertIsNone(landmarks.load(self.path, g.num_people()), "stale: the CSVs changed")
+    #
+    def test_astar_on_compact_backend(self):
+        degrees.load_data(self.path, compact=True)
+        self.assertIsNone(degrees.landmark_tables)
+        landmarks.save(landmarks.build(degrees.graph, k=4), self.path, degrees.graph.num_people())
+        degrees.load_data(self.path, compact=True)
+        self.assertIsNotNone(degrees.landmark_tables)
+        people = sorted(degrees.people)
+        for _ in range(300):
+            source, target = self.rng.sample(people, 2)
+            expected = degrees.shortest_path(source, target, mode="bfs")
+            path = degrees.shortest_path(source, target, mode="astar")
+            if expected is None:
+                self.assertIsNone(path, f"{source} -> {target}")
+            else:
+                self.assertEqual(len(path), len(expected), f"{source} -> {target}")
+                previous = source
+                for movie, person in path:
+                    self.assertLessEqual({previous, person}, degrees.movies[movie]["stars"])
+                    previous = person
+                self.assertEqual(previous, target)
+
+
+
+#
+# #
+#
+class NameIndexTestCase(unittest.TestCase):
+    """ search() must return exactly the brute-force top matches; closest() a name at least as good as one typo away. """
+    #
+    def setUp(self):
+        self.rng = random.Random(1)
+        self.names = random_names(self.rng, 2000)
+        self.index = NameIndex(self.names)
+    #
+    def brute_force(self, query, limit, min_score=0.5):
+        key = normalize(query)
+        matches = sorted((-dice(key, name), name) for name in self.names)
+        return [(-score, name) for score, name in matches if -score >= min_score][:limit]
+    # # #
+    def test_search_matches_brute_force(self):
+        for _ in range(300):
+            name = self.rng.choice(self.names)
+            query = self.rng.choice([name, typo(self.rng, name), name.split()[0]])
+            found = self.index.search(query, limit=5)
+            expected = self.brute_force(query, 5)
+            self.assertEqual([n for _, n in found], [n for _, n in expected], query)
+            for (score, _), (want, _) in zip(found, expected):
+                self.assertAlmostEqual(score, want)
+    #
+    def test_closest(self):
+        for _ in range(300):
+            name = self.rng.choice(self.names)
+            query = typo(self.rng, name)
+            score, match = self.index.closest(query, min_score=0)
+            self.assertGreaterEqual(score + 1e-9, dice(normalize(query), name), query)
+            self.assertAlmostEqual(score, dice(normalize(query), match))
+        self.assertEqual(self.index.closest(self.names[0].upper()), (1.0, self.names[0]))
+        self.assertIsNone(self.index.closest("zzzzzz"))
+    #
+    def test_add(self):
+        self.index.add("zuzana wuchterl")
+        self.names.append("zuzana wuchterl")
+        self.assertEqual(self.index.closest("zuzana wuchterk")[1], "zuzana wuchterl")
+        self.assertEqual(self.index.closest("wuchterl")[1], "zuzana wuchterl")
+        self.assertEqual(self.index.search("zuzna wuchterl", limit=3), self.brute_force("zuzna wuchterl", 3))
+        self.assertEqual(self.index.prefix("zuz"), ["zuzana wuchterl"])
+
+
+
+#
+# #
+#
+class UpdateTestCase(SavedState, unittest.TestCase):
+    """ update_data must leave the same people/movies/names, components and name index as a fresh load_data. """
+    #
+    def setUp(self):
+        super().setUp()
+        self.rng = random.Random(2)
+        self.rows = csv_rows(self.rng, 80, 50, 4)
+    #
+    def loaded(self):
+        """ Copies of what's loaded, to compare with another load. """
+        index = degrees.name_index()
+        queries = sorted(degrees.names)[::7] + ["zzz", "an"]
+        return {
+            "people": copy.deepcopy(degrees.people),
+            "movies": copy.deepcopy(degrees.movies),
+            "names": copy.deepcopy(degrees.names),
+            "components": partition(degrees.graph.components),
+            "index": (len(index), [index.search(query, limit=3) for query in queries], [index.prefix(query[:2]) for query in queries]),
+        }
+    #
+    def assertSameAsFresh(self):
+        updated = self.loaded()
+        degrees.load_data(self.path, fuzzy=True)
+        fresh = self.loaded()
+        for field in fresh:
+            self.assertEqual(updated[field], fresh[field], field)
+    # # #
+    def test_appended_deltas(self):
+        people, movies, stars = self.rows["people.csv"], self.rows["movies.csv"], self.rows["stars.csv"]
+        base = {"people.csv": people[:50], "movies.csv": movies[:30]}
+        base["stars.csv"] = [row for row in stars if row[0] in {p[0] for p in people[:50]} and row[1] in {m[0] for m in movies[:30]}]
+        for filename, rows in base.items():
+            write_rows(self.path, filename, rows, "w")
+        degrees.load_data(self.path, fuzzy=True)
+        delta = [row for row in stars if row not in base["stars.csv"]]
+
+        #--Stars arrive before their people/movies, and the last movie row is half written:
+        write_rows(self.path, "stars.csv", delta)
+        write_rows(self.path, "people.csv", people[50:65])
+        write_rows(self.path, "movies.csv", movies[30:], end="")
+        read = degrees.update_data(self.path)
+        self.assertEqual(read, {"people.csv": 15, "movies.csv": 19, "stars.csv": len(delta)})
+        self.assertNotIn(movies[-1][0], degrees.movies)
+        self.assertTrue(degrees.orphan_stars)
+
+        #--The rest of the people, and the end of the partial line:
+        write_rows(self.path, "people.csv", people[65:])
+        write_rows(self.path, "movies.csv", [[]])
+        read = degrees.update_data(self.path)
+        self.assertEqual(read, {"people.csv": len(people) - 65, "movies.csv": 1, "stars.csv": 0})
+        self.assertIn(movies[-1][0], degrees.movies)
+        self.assertEqual(degrees.orphan_stars, [])
+        self.assertSameAsFresh()
+    #
+    def test_compact_update_keeps_cache_off(self):
+        for filename, rows in self.rows.items():
+            write_rows(self.path, filename, rows[:-5], "w")
+        degrees.load_data(self.path, compact=True, cache=False)
+        write_rows(self.path, "people.csv", self.rows["people.csv"][-5:])
+        self.assertEqual(degrees.update_data(self.path), dict.fromkeys(degrees.SOURCES))
+        self.assertFalse(os.path.exists(snapshot.snapshot_path(self.path)))
+        self.assertEqual(len(degrees.people), len(self.rows["people.csv"]))
+        degrees.load_data(self.path, compact=True)
+        degrees.update_data(self.path)
+        self.assertTrue(os.path.exists(snapshot.snapshot_path(self.path)))
+    #
+    def test_empty_csv(self):
+        for filename in degrees.SOURCES:
+            open(os.path.join(self.path, filename), "w").close()
+        degrees.load_data(self.path, fuzzy=True)
+        self.assertEqual((len(degrees.people), len(degrees.movies)), (0, 0))
+        self.assertEqual(degrees.update_data(self.path), dict.fromkeys(degrees.SOURCES, 0))
+        for filename, rows in self.rows.items():
+            write_rows(self.path, filename, rows, "w")
+        self.assertEqual(degrees.update_data(self.path), {filename: len(rows) for filename, rows in self.rows.items()})
+        self.assertSameAsFresh()
+    #
+    def test_interrupted_update(self):
+        """ Rows an update didn't get to apply (it raised partway) are read again by the next one. """
+        people, movies, stars = self.rows["people.csv"], self.rows["movies.csv"], self.rows["stars.csv"]
+        write_rows(self.path, "people.csv", people[:40], "w")
+        write_rows(self.path, "movies.csv", movies, "w")
+        write_rows(self.path, "stars.csv", [row for row in stars if int(row[0]) < 40], "w")
+        degrees.load_data(self.path, fuzzy=True)
+        write_rows(self.path, "people.csv", people[40:])
+        write_rows(self.path, "stars.csv", [row for row in stars if int(row[0]) >= 40])
+        add_stars = degrees.add_stars
+        def failing(rows):
+            rows = iter(rows)
+            add_stars([next(rows), next(rows)])
+            raise OSError("disk went away")
+        with unittest.mock.patch.object(degrees, "add_stars", failing):
+            with self.assertRaises(OSError):
+                degrees.update_data(self.path)
+        degrees.update_data(self.path)
+        self.assertEqual(degrees.orphan_stars, [])
+        self.assertSameAsFresh()
+    #
+    def test_shrunk_file_reloads(self):
+        for filename, rows in self.rows.items():
+            write_rows(self.path, filename, rows, "w")
+        degrees.load_data(self.path, fuzzy=True)
+        write_rows(self.path, "people.csv", self.rows["people.csv"][:40], "w")
+        write_rows(self.path, "movies.csv", self.rows["movies.csv"][:-1], "w")
+        self.assertEqual(degrees.update_data(self.path), dict.fromkeys(degrees.SOURCES))
+        self.assertEqual(len(degrees.people), 40)
+        self.assertSameAsFresh()
+
+
+
+#
+# #
+#
+class SnapshotTestCase(unittest.TestCase):
+    """ snapshot.load must give back the graph save wrote, and None for anything it can't trust. """
+    #
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name
+        for filename, rows in csv_rows(random.Random(3), 60, 40, 5).items():
+            write_rows(self.path, filename, rows, "w")
+    def tearDown(self):
+        self.directory.cleanup()
+    #
+    def contents(self, g):
+        """ Everything a CompactGraph answers, as plain Python values. """
+        people = range(g.num_people())
+        return {
+            "people": [(g.person_id(i), g.person_names[i], g.person_births[i], sorted(g.neighbors(i))) for i in people],
+            "movies": [(g.movie_id(j), g.movie_titles[j], g.movie_year(j), list(g.stars_of(j))) for j in range(g.num_movies())],
+            "names": [(key, g.nodes_for_name(key)) for key in g.name_keys],
+            "components": list(g.components),
+        }
+    # # #
+    def test_round_trip(self):
+        built = CompactGraph.from_csv(self.path)
+        snapshot.save(built, self.path)
+        loaded = snapshot.load(self.path)
+        self.assertIsNotNone(loaded)
+        self.assertIsInstance(loaded.person_movies, memoryview)
+        self.assertEqual(self.contents(loaded), self.contents(built))
+    #
+    def test_changed_csv(self):
+        snapshot.load_or_build(self.path)
+        self.assertIsNotNone(snapshot.load(self.path))
+        #--Touched (same size, newer mtime):
+        stars = os.path.join(self.path, "stars.csv")
+        stat = os.stat(stars)
+        os.utime(stars, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertIsNone(snapshot.load(self.path))
+        #--load_or_build rewrites it, then a grown CSV makes it stale again:
+        snapshot.load_or_build(self.path)
+        self.assertIsNotNone(snapshot.load(self.path))
+        people = os.path.join(self.path, "people.csv")
+        stat = os.stat(people)
+        write_rows(self.path, "people.csv", [["999", "Late Arrival", ""]])
+        os.utime(people, ns=(stat.st_atime_ns, stat.st_mtime_ns)) #--only the size differs
+        self.assertIsNone(snapshot.load(self.path))
+        g = snapshot.load_or_build(self.path)
+        self.assertEqual(g.person_names[g.node("999")], "Late Arrival")
+        self.assertEqual(self.contents(snapshot.load(self.path)), self.contents(g))
+    #
+    def test_wrong_magic_or_version(self):
+        snapshot.save(CompactGraph.from_csv(self.path), self.path)
+        path = snapshot.snapshot_path(self.path)
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, length = snapshot.PREAMBLE.unpack_from(data)
+        for preamble in (snapshot.PREAMBLE.pack(b"NOTSNAP\0", version, length), snapshot.PREAMBLE.pack(magic, version + 1, length)):
+            with open(path, "wb") as f:
+                f.write(preamble + data[snapshot.PREAMBLE.size:])
+            self.assertIsNone(snapshot.load(self.path))
+        for truncated in (b"", data[:5]):
+            with open(path, "wb") as f:
+                f.write(truncated)
+            self.assertIsNone(snapshot.load(self.path))
+
+
+
+#
+# #
+#
+class BackendTestCase(SavedState, unittest.TestCase):
+    """ The same CSVs loaded with CompactGraph and DictGraph must give the same people, movies, names, neighbors and paths. """
+    #
+    def setUp(self):
+        super().setUp()
+        self.rng = random.Random(4)
+        rows = csv_rows(self.rng, 120, 60, 4)
+        rows["people.csv"].append(["77777", rows["people.csv"][0][1], ""]) #--a duplicate name
+        rows["stars.csv"].append(["424242", "1000"]) #--a star row naming nobody
+        for filename, rows in rows.items():
+            write_rows(self.path, filename, rows, "w")
+    #
+    def loaded(self, compact):
+        degrees.load_data(self.path, compact=compact)
+        people = {person_id: dict(person) for person_id, person in degrees.people.items()}
+        movies = {movie_id: dict(movie) for movie_id, movie in degrees.movies.items()}
+        names = {name: set(person_ids) for name, person_ids in degrees.names.items()}
+        neighbors = {person_id: degrees.neighbors_for_person(person_id) for person_id in people}
+        return people, movies, names, neighbors
+    # # #
+    def test_same_answers(self):
+        expected, found = self.loaded(compact=False), self.loaded(compact=True)
+        for field, dicts, views in zip(("people", "movies", "names", "neighbors"), expected, found):
+            self.assertEqual(views, dicts, field)
+        pairs = [self.rng.sample(sorted(expected[0]), 2) for _ in range(200)]
+        lengths = {}
+        for compact in (False, True):
+            degrees.load_data(self.path, compact=compact)
+            for mode in ("bfs", "bidirectional"):
+                paths = [degrees.shortest_path(source, target, mode=mode) for source, target in pairs]
+                lengths[compact, mode] = [None if path is None else len(path) for path in paths]
+        self.assertEqual(len(set(map(tuple, lengths.values()))), 1, lengths)
+        self.assertIn(None, lengths[True, "bfs"])
+
+
+
+def count_shortest_paths(people, movies, source, target):
+    """ Number of shortest (movie, person) paths, by BFS layers: ways(node) = sum of ways over its (movie, parent) edges. """
+    depth, layer = {source: 0}, [source]
+    while layer:
+        next_layer = []
+        for node in layer:
+            for movie in people[node]["movies"]:
+                for star in movies[movie]["stars"]:
+                    if star not in depth:
+                        depth[star] = depth[node] + 1
+                        next_layer.append(star)
+        layer = next_layer
+    if target not in depth:
+        return 0
+    ways = {source: 1}
+    for node in sorted(depth, key=depth.get)[1:]:
+        ways[node] = sum(ways[star] for movie in people[node]["movies"] for star in movies[movie]["stars"] if depth[star] == depth[node] - 1)
+    return ways[target]
+
+
+#
+# #
+#
+class AllPathsTestCase(SavedState, unittest.TestCase):
+    """ Every path all_shortest_paths yields is valid and shortest; together they're all of them, once each. """
+    #
+    def setUp(self):
+        super().setUp()
+        degrees.graph = None
+        rng = random.Random(5)
+        #--s -> a0..a2 -> b0..b3 -> t, one movie per pair, plus a second s-a0 movie: 3 * 4 + 4 = 16 paths of 3 movies.
+        casts = [("s", a) for a in ("a0", "a1", "a2")] + [("s", "a0")]
+        casts += [(a, b) for a in ("a0", "a1", "a2") for b in ("b0", "b1", "b2", "b3")]
+        casts += [(b, "t") for b in ("b0", "b1", "b2", "b3")]
+        casts += [("s", "x"), ("x", "y"), ("y", "z"), ("z", "w"), ("w", "t")] #--a longer way round
+        people = {person: {"name": person, "birth": "", "movies": set()} for cast in casts for person in cast}
+        movies = {}
+        for m, cast in enumerate(casts):
+            movies[str(m)] = {"title": str(m), "year": str(rng.randint(1950, 2020)), "stars": set(cast)}
+            for person in cast:
+                people[person]["movies"].add(str(m))
+        degrees.people, degrees.movies = people, movies
+    #
+    def assertShortestPaths(self, paths, source, target):
+        length = len(degrees.shortest_path(source, target))
+        for path in paths:
+            self.assertEqual(len(path), length)
+            previous = source
+            for movie, person in path:
+                self.assertLessEqual({previous, person}, degrees.movies[movie]["stars"])
+                previous = person
+            self.assertEqual(previous, target)
+        self.assertEqual(len(set(map(tuple, paths))), len(paths), "duplicate paths")
+    # # #
+    def test_known_count(self):
+        paths = list(degrees.all_shortest_paths("s", "t"))
+        self.assertEqual(len(paths), 16)
+        self.assertShortestPaths(paths, "s", "t")
+        self.assertEqual(len(list(degrees.all_shortest_paths("s", "t", limit=5))), 5)
+        self.assertEqual(len(list(degrees.all_shortest_paths("s", "t", limit=100))), 16)
+        self.assertEqual(list(degrees.all_shortest_paths("s", "s")), [[]])
+    #
+    def test_rank(self):
+        paths = list(degrees.all_shortest_paths("s", "t"))
+        years = lambda path: sum(int(degrees.movies[movie]["year"]) for movie, _ in path)
+        for rank, sign in (("newest", -1), ("oldest", 1), (lambda movie: int(movie) % 7, None)):
+            ranked = list(degrees.all_shortest_paths("s", "t", rank=rank))
+            self.assertEqual(sorted(ranked), sorted(paths))
+            if sign is None:
+                costs = [sum(int(movie) % 7 for movie, _ in path) for path in ranked]
+            else:
+                costs = [sign * years(path) for path in ranked]
+            self.assertEqual(costs, sorted(costs), rank)
+        #--limit keeps the best ones:
+        newest = list(degrees.all_shortest_paths("s", "t", rank="newest", limit=3))
+        self.assertEqual(newest, list(degrees.all_shortest_paths("s", "t", rank="newest"))[:3])
+        with self.assertRaises(ValueError):
+            list(degrees.all_shortest_paths("s", "t", rank="longest"))
+    #
+    def test_tied_costs_stay_small(self):
+        """ A 30-wide, 5-deep DAG with every movie costing the same: 30 ** 4 tied paths, but the first comes out of a small heap. """
+        width, depth = 30, 5
+        layers = [["s"]] + [[f"{d}.{i}" for i in range(width)] for d in range(1, depth)] + [["t"]]
+        parents = {}
+        for d in range(depth, 0, -1):
+            for node in layers[d]:
+                parents[node] = [(f"{node}<{parent}", parent) for parent in layers[d - 1]]
+        parents["s"] = []
+        largest = 0
+        heappush = heapq.heappush
+        def counted(heap, item):
+            nonlocal largest
+            heappush(heap, item)
+            largest = max(largest, len(heap))
+        with unittest.mock.patch.object(paths.heapq, "heappush", counted):
+            path = next(enumerate_paths(parents, "s", "t", cost=lambda movie: 0))
+        self.assertEqual(len(path), depth)
+        self.assertEqual(path[-1][1], "t")
+        self.assertLessEqual(largest, depth * width)
+    #
+    def test_random_graphs(self):
+        rng = random.Random(6)
+        for trial in range(100):
+            people, movies = random_dataset(rng, rng.randint(4, 25), rng.randint(2, 20), 4)
+            degrees.people, degrees.movies = people, movies
+            source, target = rng.sample(sorted(people), 2)
+            paths = list(degrees.all_shortest_paths(source, target))
+            self.assertEqual(len(paths), count_shortest_paths(people, movies, source, target), f"trial {trial}")
+            if paths:
+                self.assertShortestPaths(paths, source, target)
+
+
+
+#
+# #
+#
+class GenerateTestCase(SavedState, unittest.TestCase):
+    """ generate() is a function of its arguments and seed, and writes CSVs both backends load. """
+    #
+    def setUp(self):
+        super().setUp()
+        self.other = tempfile.TemporaryDirectory()
+    def tearDown(self):
+        self.other.cleanup()
+        super().tearDown()
+    #
+    def contents(self, directory):
+        contents = {}
+        for filename in ("people.csv", "movies.csv", "stars.csv"):
+            with open(os.path.join(directory, filename), "rb") as f:
+                contents[filename] = f.read()
+        return contents
+    # # #
+    def test_same_seed_same_bytes(self):
+        generate(self.path, 300, 150, seed=11)
+        generate(self.other.name, 300, 150, seed=11)
+        self.assertEqual(self.contents(self.path), self.contents(self.other.name))
+        generate(self.other.name, 300, 150, seed=12)
+        self.assertNotEqual(self.contents(self.path)["stars.csv"], self.contents(self.other.name)["stars.csv"])
+    #
+    def test_loads(self):
+        generate(self.path, 300, 150, seed=11)
+        degrees.load_data(self.path)
+        self.assertEqual((len(degrees.people), len(degrees.movies)), (300, 150))
+        stars = sum(len(movie["stars"]) for movie in degrees.movies.values())
+        self.assertEqual(stars, self.contents(self.path)["stars.csv"].count(b"\n") - 1)
+        self.assertEqual(stars, sum(len(person["movies"]) for person in degrees.people.values()))
+        people = {person_id: dict(person) for person_id, person in degrees.people.items()}
+        degrees.load_data(self.path, compact=True)
+        self.assertEqual({person_id: dict(person) for person_id, person in degrees.people.items()}, people)
+
+#
+# #
+#
+class BatchTestCase(SavedState, unittest.TestCase):
+    """ answer() reports errors in its result dict; main() refuses --mode astar it can't serve before starting a pool. """
+    #
+    def setUp(self):
+        super().setUp()
+        batch.resolve.cache_clear()
+        self.rows = csv_rows(random.Random(7), 30, 20, 4)
+        for filename, rows in self.rows.items():
+            write_rows(self.path, filename, rows, "w")
+        self.queries = os.path.join(self.path, "queries.csv")
+        with open(self.queries, "w") as f:
+            f.write("source,target\n0,1\n2,3\n")
+    def tearDown(self):
+        batch.resolve.cache_clear()
+        super().tearDown()
+    # # #
+    def test_answer_reports_errors(self):
+        degrees.load_data(self.path)
+        source = "0"
+        target = next(person for person in degrees.people if person != source and degrees.shortest_path(source, person))
+        self.assertEqual(batch.answer((source, target))["path"], degrees.shortest_path(source, target))
+        self.assertEqual(batch.answer((source, "nobody"))["error"], "person not found: nobody")
+        result = batch.answer((source, target), mode="astar")
+        self.assertIn("landmark tables", result["error"])
+        self.assertNotIn("path", result)
+    #
+    def test_astar_without_landmarks_is_a_usage_error(self):
+        for compact in ([], ["--compact"]):
+            argv = ["batch.py", self.path, self.queries, "--workers", "2", "--mode", "astar"] + compact
+            stderr = io.StringIO()
+            with unittest.mock.patch.object(sys, "argv", argv), contextlib.redirect_stderr(stderr), contextlib.redirect_stdout(io.StringIO()):
+                with self.assertRaises(SystemExit) as raised:
+                    batch.main()
+            self.assertEqual(raised.exception.code, 2)
+            self.assertIn("--mode astar needs --compact and landmark tables", stderr.getvalue())
+
+
+
+
+# # # # # # # # # # # # # # # # #
+#                               #
+#--Run all the above tests:     #
+if __name__ == "__main__":      #
+    unittest.main()             #
+#                               #
+# # # # # # # # # # # # # # # # #
@@ -1,3 +1,6 @@
+from collections import deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -9,15 +12,19 @@ class Node():
 
 
 class StackFrontier():
-    """ StackFrontier is Depth-First Search: last-in, first-out. """
+    """ StackFrontier is Depth-First Search: last-in, first-out.
+    - Nodes live in a deque, and a count of each state in the frontier makes contains_state a hash lookup:
+      add/remove/contains_state are all O(1) (list slicing + a linear scan made BFS quadratic). """
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        self.states = {} # state -> number of nodes in the frontier holding it
     #
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
     #
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
     #
     def empty(self):
         return len(self.frontier) == 0
@@ -26,9 +33,17 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.forget(node)
             return node
+    #
+    def forget(self, node):
+        """ Drops one occurrence of node.state from the membership counts. """
+        count = self.states[node.state]
+        if count == 1:
+            del self.states[node.state]
+        else:
+            self.states[node.state] = count - 1
 
 
 
@@ -39,6 +54,6 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.forget(node)
             return node
@@ -0,0 +1,108 @@
+"""
+Tic Tac Toe bitboards
+- A position is two 9-bit ints, one per player: bit 3 * i + j is set if that player has cell (i, j).
+- Everything the search needs per node is a table lookup, precomputed once over all 512 masks:
+    WINNING[mask]: does the mask contain one of the 8 win lines?
+    MOVES[empty]:  the single-bit moves available in an empty-cells mask, in cell order.
+    PREFERRED[empty]: the same moves strongest first: centre, then corners, then edges.
+    SYMMETRIES[s][mask]: the mask rotated/reflected by the s-th of the board's 8 symmetries.
+    TERNARY[mask]: the mask's cells as base-3 digits, so TERNARY[x] + 2 * TERNARY[o] numbers every board (< 3 ** 9).
+- tictactoe.py converts the list-of-lists board at its public functions and searches on bits.
+"""
+X = "X"
+O = "O"
+EMPTY = None
+
+FULL = 0b111111111 # all 9 cells
+
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000, # rows
+    0b001001001, 0b010010010, 0b100100100, # columns
+    0b100010001, 0b001010100,              # diagonals
+)
+
+WINNING = bytes(any(mask & win == win for win in WIN_MASKS) for mask in range(512))
+MOVES = tuple(tuple(1 << cell for cell in range(9) if empty >> cell & 1) for empty in range(512))
+PREFERRED = tuple(tuple(1 << cell for cell in (4, 0, 2, 6, 8, 1, 3, 5, 7) if empty >> cell & 1) for empty in range(512))
+COUNTS = bytes(bin(mask).count("1") for mask in range(512))
+TERNARY = tuple(sum(3 ** cell for cell in range(9) if mask >> cell & 1) for mask in range(512))
+
+
+def permute(mask, cells):
+    """ mask with the bit of cell k moved to cells[k]. """
+    return sum(1 << cells[k] for k in range(9) if mask >> k & 1)
+
+
+#--The 8 symmetries of the square as cell permutations: 4 rotations, each optionally mirrored.
+_rotate = [3 * j + (2 - i) for i in range(3) for j in range(3)] # (i, j) -> (j, 2 - i)
+_mirror = [3 * i + (2 - j) for i in range(3) for j in range(3)] # (i, j) -> (i, 2 - j)
+_symmetries = [list(range(9))]
+for _ in range(3):
+    _symmetries.append([_rotate[k] for k in _symmetries[-1]])
+_symmetries += [[_mirror[k] for k in cells] for cells in _symmetries]
+SYMMETRIES = tuple(tuple(permute(mask, cells) for mask in range(512)) for cells in _symmetries)
+
+
+def from_board(board):
+    """ (x, o) bitboards of a list-of-lists board. """
+    x = o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (3 * i + j)
+            elif cell == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def to_board(x, o):
+    """ The list-of-lists board of (x, o) bitboards. """
+    return [[X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1 else EMPTY for j in range(3)] for i in range(3)]
+
+
+def bit(action):
+    """ Bit of cell (i, j). """
+    return 1 << (3 * action[0] + action[1])
+
+
+def cell(bit):
+    """ (i, j) of a single-bit move. """
+    return divmod(bit.bit_length() - 1, 3)
+
+
+def canonical(x, o):
+    """
+    One key for a position and all its rotations/reflections: the smallest (x << 9 | o) over the 8.
+    (Whose turn it is follows from the mark counts, so it needn't be in the key.)
+    """
+    return min(table[x] << 9 | table[o] for table in SYMMETRIES)
+
+
+def index(x, o):
+    """ Base-3 number of the board (cell k is digit k: 0 empty, 1 X, 2 O). """
+    return TERNARY[x] + 2 * TERNARY[o]
+
+
+def to_move(x, o):
+    """ X goes first, and again whenever O has caught up. """
+    return O if COUNTS[x] > COUNTS[o] else X
+
+
+def winner(x, o):
+    if WINNING[x]:
+        return X
+    if WINNING[o]:
+        return O
+    return EMPTY
+
+
+def terminal(x, o):
+    return WINNING[x] or WINNING[o] or x | o == FULL
+
+
+def utility(x, o):
+    if WINNING[x]:
+        return 1
+    if WINNING[o]:
+        return -1
+    return 0
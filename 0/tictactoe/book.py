@@ -0,0 +1,102 @@
+"""
+Tic Tac Toe opening book
+- Solves the whole game once: every position reachable from the empty board, with its minimax move and value.
+- Saved as BOOK_FILE: MAGIC, a VERSION byte, then one byte per board numbered by bitboard.index (3 ** 9 bytes):
+    low 4 bits:  the move's cell 3 * i + j (NO_MOVE if the game is over there)
+    next 2 bits: value + 1 (0: O wins, 1: tie, 2: X wins)
+    UNREACHABLE (0xFF) for boards no game can reach.
+- tictactoe.minimax looks moves up here (loading the file on first use), and searches if there is no file.
+- Re-run after any change to the search: $ python3 book.py
+"""
+import os
+import sys
+import math
+
+from bitboard import FULL, MOVES, WINNING, index, to_move, terminal
+
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+MAGIC = b"TTTB"
+VERSION = 2 # 2: moves from the negamax search (move ordering picks different moves among equals)
+SIZE = 3 ** 9
+NO_MOVE = 0xF
+UNREACHABLE = 0xFF
+
+
+
+def pack(move, value):
+    """ Book byte of a move's cell (or NO_MOVE) and a value in -1, 0, 1. """
+    return move | (value + 1) << 4
+
+
+def unpack(entry):
+    """ (move cell or NO_MOVE, value) of a book byte; None for UNREACHABLE. """
+    if entry == UNREACHABLE:
+        return None
+    return entry & 0xF, (entry >> 4) - 1
+
+
+def reachable():
+    """ Every position reachable from the empty board, as (x, o) bitboards. """
+    seen = {(0, 0)}
+    stack = [(0, 0)]
+    while stack:
+        x, o = stack.pop()
+        if terminal(x, o):
+            continue
+        for move in MOVES[FULL & ~(x | o)]:
+            child = (x | move, o) if to_move(x, o) == "X" else (x, o | move)
+            if child not in seen:
+                seen.add(child)
+                stack.append(child)
+    return seen
+
+
+def solve():
+    """ The book's bytes (without header): the search's own move and value for every reachable position. """
+    import tictactoe as ttt
+    searching = ttt.use_book
+    ttt.use_book = False
+    try:
+        book = bytearray([UNREACHABLE]) * SIZE
+        for x, o in reachable():
+            if WINNING[x]:
+                book[index(x, o)] = pack(NO_MOVE, 1)
+            elif WINNING[o]:
+                book[index(x, o)] = pack(NO_MOVE, -1)
+            elif x | o == FULL:
+                book[index(x, o)] = pack(NO_MOVE, 0)
+            else:
+                board = ttt.to_board(x, o)
+                i, j = ttt.minimax(board)
+                value = ttt.max_value(board, -math.inf, math.inf) if to_move(x, o) == "X" else ttt.min_value(board, -math.inf, math.inf)
+                book[index(x, o)] = pack(3 * i + j, value)
+        return bytes(book)
+    finally:
+        ttt.use_book = searching
+
+
+def write(filename=BOOK_FILE):
+    book = solve()
+    with open(filename, "wb") as f:
+        f.write(MAGIC + bytes([VERSION]) + book)
+    return sum(entry != UNREACHABLE for entry in book)
+
+
+def load(filename=BOOK_FILE):
+    """ The book's bytes, or None if the file is missing or isn't a book of this VERSION. """
+    try:
+        with open(filename, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    header = len(MAGIC) + 1
+    if len(data) != header + SIZE or data[:len(MAGIC)] != MAGIC or data[len(MAGIC)] != VERSION:
+        return None
+    return data[header:]
+
+
+
+if __name__ == "__main__":
+    filename = sys.argv[1] if len(sys.argv) > 1 else BOOK_FILE
+    positions = write(filename)
+    print(f"Wrote {positions} positions to {filename}")
@@ -0,0 +1,299 @@
+"""
+m,n,k games: get k in a row (across, down or diagonally) on an m x n board.
+- Tic-tac-toe is MNKGame(3, 3, 3); 4x4 / 5x5 variants and gomoku (15, 15, 5) are the same game.
+- MNKGame has tictactoe.py's interface (initial_state, player, actions, result, winner, terminal, utility)
+  on the same list-of-lists boards, of any size.
+- MNKGame.minimax(board, budget) is iterative-deepening alpha-beta on bitboards (one m*n-bit int per player):
+    -> searches 1 ply deep, then 2, ... each time trying the last iteration's best move first,
+    -> scores positions at the depth limit with a pluggable heuristic(game, x, o) (X's point of view),
+       and wins with game.win, which is derived from the heuristic's bound so no evaluation can reach it,
+    -> orders moves: winning moves, then blocks, then the most central cells,
+    -> stops after budget seconds and returns the best move found so far.
+"""
+import sys
+import math
+import time
+import argparse
+
+X = "X"
+O = "O"
+EMPTY = None
+
+
+
+class Timeout(Exception):
+    """ The move's time budget ran out mid-search. """
+
+
+def popcount(mask):
+    return bin(mask).count("1")
+
+
+def line_heuristic(game, x, o):
+    """
+    Default evaluation, from X's point of view: each k-line only one player has marks on
+    is worth 10 ** (their marks on it) to them. Lines both players are on are dead.
+    Its absolute value is always below line_bound(game).
+    """
+    score = 0
+    for line in game.lines:
+        mine, theirs = x & line, o & line
+        if mine and not theirs:
+            score += 10 ** popcount(mine)
+        elif theirs and not mine:
+            score -= 10 ** popcount(theirs)
+    return score
+
+
+def line_bound(game):
+    """ More than line_heuristic can score: every line at 10 ** k (a line never holds more than k marks). """
+    return len(game.lines) * 10 ** game.k
+
+
+
+class MNKGame():
+
+    def __init__(self, m=3, n=3, k=3, heuristic=line_heuristic, radius=None, bound=line_bound):
+        """
+        m rows, n columns, k in a row to win.
+        radius: if set, the search only considers empty cells within that many rows/columns of a mark
+        (much narrower trees on big boards like gomoku; None searches every empty cell).
+        bound(game): a number heuristic's absolute value always stays below (pass your own with your own heuristic).
+        """
+        if not 1 <= k <= max(m, n):
+            raise ValueError(f"can't get {k} in a row on a {m}x{n} board")
+        if radius is not None and radius < 1:
+            raise ValueError("radius must be at least 1 (a mark's own cell is never empty)")
+        self.m, self.n, self.k = m, n, k
+        self.heuristic = heuristic
+        self.full = (1 << m * n) - 1
+
+        #--Every k-line as a mask, and for each cell the lines through it (all a move can complete):
+        self.lines = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    if 0 <= i + di * (k - 1) < m and 0 <= j + dj * (k - 1) < n:
+                        self.lines.append(sum(1 << self.index(i + di * s, j + dj * s) for s in range(k)))
+        self.through = [[line for line in self.lines if line >> cell & 1] for cell in range(m * n)]
+
+        #--Score of a win on the board; a win d plies into the search scores win - d (sooner is better).
+        #  Every win (win - m * n at the latest) outscores any heuristic evaluation:
+        self.win = bound(self) + m * n + 1
+
+        #--Cells nearest the middle first (the tiebreak of move ordering):
+        self.central = sorted(range(m * n), key=lambda cell: (abs(2 * (cell // n) - (m - 1)) + abs(2 * (cell % n) - (n - 1)), cell))
+
+        self.near = None
+        if radius is not None:
+            self.near = [sum(1 << self.index(a, b)
+                             for a in range(max(0, i - radius), min(m, i + radius + 1))
+                             for b in range(max(0, j - radius), min(n, j + radius + 1)))
+                         for i in range(m) for j in range(n)]
+
+        #--Stats of the last minimax() call:
+        self.nodes = 0
+        self.depth = 0
+
+    # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+    def index(self, i, j):
+        """ Bit of cell (i, j). """
+        return i * self.n + j
+
+    def from_board(self, board):
+        """ (x, o) bitboards of a list-of-lists board. """
+        x = o = 0
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell == X:
+                    x |= 1 << self.index(i, j)
+                elif cell == O:
+                    o |= 1 << self.index(i, j)
+        return x, o
+
+    def to_board(self, x, o):
+        """ The list-of-lists board of (x, o) bitboards. """
+        return [[X if x >> self.index(i, j) & 1 else O if o >> self.index(i, j) & 1 else EMPTY for j in range(self.n)] for i in range(self.m)]
+
+    def wins(self, mask, cell):
+        """ Does a move on cell complete a k-line of mask (which already includes it)? """
+        return any(mask & line == line for line in self.through[cell])
+
+    # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+    def initial_state(self):
+        return [[EMPTY] * self.n for _ in range(self.m)]
+
+    def player(self, board):
+        """ X goes first, and again whenever O has caught up. """
+        x, o = self.from_board(board)
+        return O if popcount(x) > popcount(o) else X
+
+    def actions(self, board):
+        """ Set of all (i, j) still empty on the board. """
+        return {(i, j) for i, row in enumerate(board) for j, cell in enumerate(row) if cell is EMPTY}
+
+    def result(self, board, action):
+        """ The board after the player to move marks action (i, j); the board passed in is left alone. """
+        if action not in self.actions(board):
+            raise Exception("Move is not legal")
+        new = [row[:] for row in board]
+        new[action[0]][action[1]] = self.player(board)
+        return new
+
+    def winner(self, board):
+        x, o = self.from_board(board)
+        if any(x & line == line for line in self.lines):
+            return X
+        if any(o & line == line for line in self.lines):
+            return O
+        return EMPTY
+
+    def terminal(self, board):
+        x, o = self.from_board(board)
+        return self.winner(board) is not EMPTY or x | o == self.full
+
+    def utility(self, board):
+        """ 1 if X has won, -1 if O has, 0 otherwise. """
+        return {X: 1, O: -1, EMPTY: 0}[self.winner(board)]
+
+    # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+    def minimax(self, board, budget=1.0, max_depth=None):
+        """
+        Best action (i, j) for the player to move within budget seconds (None if the game is over).
+        Iterative deepening: every finished iteration's best move is kept, so running out of time only
+        costs the iteration in progress (and not even that if it has already found a better move).
+        """
+        if self.terminal(board):
+            return None
+        x, o = self.from_board(board)
+        deadline = time.perf_counter() + budget
+        maximizing = self.player(board) == X
+        mover, other = (x, o) if maximizing else (o, x)
+        moves = self.ordered(mover, other, x | o)
+        best = moves[0]
+        empty = popcount(self.full & ~(x | o))
+        limit = empty if max_depth is None else min(max_depth, empty)
+        self.nodes = self.depth = 0
+
+        for depth in range(1, limit + 1):
+            found = None
+            alpha, beta = -math.inf, math.inf
+            try:
+                for cell in moves:
+                    if time.perf_counter() > deadline:
+                        raise Timeout
+                    if maximizing:
+                        score = self.min_value(x | 1 << cell, o, cell, depth - 1, alpha, beta, 1, deadline)
+                        if score > alpha:
+                            alpha, found = score, cell
+                    else:
+                        score = self.max_value(x, o | 1 << cell, cell, depth - 1, alpha, beta, 1, deadline)
+                        if score < beta:
+                            beta, found = score, cell
+            except Timeout:
+                #--moves[0] (last iteration's best) is searched first, so anything found beats it at this depth too:
+                if found is not None:
+                    best = found
+                break
+            best = found
+            self.depth = depth
+            #--Search the best move first next time:
+            moves.remove(best)
+            moves.insert(0, best)
+            #--A forced win or loss has been found; deeper won't change it:
+            if abs(alpha if maximizing else beta) > self.win - self.m * self.n:
+                break
+        return divmod(best, self.n)
+
+    def ordered(self, mover, other, occupied):
+        """ Candidate cells for mover: wins first, then blocks of other's wins, then most central. """
+        empty = self.full & ~occupied
+        if self.near is not None and occupied:
+            reach = 0
+            for cell in range(self.m * self.n):
+                if occupied >> cell & 1:
+                    reach |= self.near[cell]
+            empty &= reach
+        cells = [cell for cell in self.central if empty >> cell & 1]
+        wins = [cell for cell in cells if self.wins(mover | 1 << cell, cell)]
+        if wins:
+            return wins + [cell for cell in cells if cell not in wins]
+        blocks = [cell for cell in cells if self.wins(other | 1 << cell, cell)]
+        return blocks + [cell for cell in cells if cell not in blocks]
+
+    def tick(self, deadline):
+        """
+        Counts a node and checks the clock: on big boards a node (move ordering, heuristic over
+        every line) costs far more than a perf_counter() call, so checking only every N nodes overshoots.
+        """
+        self.nodes += 1
+        if time.perf_counter() > deadline:
+            raise Timeout
+
+    def max_value(self, x, o, last, depth, alpha, beta, ply, deadline):
+        """ Value of X to move, O having just played cell last. """
+        self.tick(deadline)
+        if self.wins(o, last):
+            return ply - self.win
+        if x | o == self.full:
+            return 0
+        if depth == 0:
+            return self.heuristic(self, x, o)
+        v = -math.inf
+        for cell in self.ordered(x, o, x | o):
+            v = max(v, self.min_value(x | 1 << cell, o, cell, depth - 1, alpha, beta, ply + 1, deadline))
+            alpha = max(alpha, v)
+            if alpha >= beta:
+                break
+        return v
+
+    def min_value(self, x, o, last, depth, alpha, beta, ply, deadline):
+        """ Value of O to move, X having just played cell last. """
+        self.tick(deadline)
+        if self.wins(x, last):
+            return self.win - ply
+        if x | o == self.full:
+            return 0
+        if depth == 0:
+            return self.heuristic(self, x, o)
+        v = math.inf
+        for cell in self.ordered(o, x, x | o):
+            v = min(v, self.max_value(x, o | 1 << cell, cell, depth - 1, alpha, beta, ply + 1, deadline))
+            beta = min(beta, v)
+            if alpha >= beta:
+                break
+        return v
+
+
+
+def main():
+    """ AI vs. AI: plays out an m,n,k game, printing each move. """
+    parser = argparse.ArgumentParser(usage="python mnk.py [m n k] [--budget SECONDS] [--radius R]")
+    parser.add_argument("m", type=int, nargs="?", default=3)
+    parser.add_argument("n", type=int, nargs="?", default=3)
+    parser.add_argument("k", type=int, nargs="?", default=3)
+    parser.add_argument("--budget", type=float, default=1.0, help="seconds per move")
+    parser.add_argument("--radius", type=int, default=None, help="only search cells this close to a mark")
+    args = parser.parse_args()
+    try:
+        game = MNKGame(args.m, args.n, args.k, radius=args.radius)
+    except ValueError as e:
+        sys.exit(str(e))
+
+    board = game.initial_state()
+    while not game.terminal(board):
+        who = game.player(board)
+        start = time.perf_counter()
+        action = game.minimax(board, args.budget)
+        print(f"{who} plays {action}: depth {game.depth}, {game.nodes} nodes, {time.perf_counter() - start:.2f}s")
+        board = game.result(board, action)
+    for row in board:
+        print(" ".join(cell or "." for cell in row))
+    print(f"Winner: {game.winner(board) or 'tie'}")
+
+
+if __name__ == "__main__":
+    main()
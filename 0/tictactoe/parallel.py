@@ -0,0 +1,212 @@
+"""
+Parallel root split
+- The root's moves are independent subtrees, so a process pool searches them side by side, one task per move.
+- Workers share the best root score found so far, and which move has it, through a small multiprocessing.Array.
+  A move after that one (in serial order) is searched with the best score as its bound, so it has to beat it;
+  a move before it, one point short of it, so a tie still counts. Moves that can't fail early; ones that
+  can come back with their exact score.
+- That margin is only sound if no score lies between best - 1 and best, so scores must be integers:
+  tictactoe's are -1, 0 or 1, and an MNKGame's heuristic must return ints (line_heuristic does).
+  A fractional score raises ValueError. Scores are shared as 64-bit ints.
+- The move picked is the one the serial loop would pick, the first (in serial order) with the best exact
+  score, so results are identical to serial search however the work was split or timed.
+- Tic-tac-toe (tictactoe.py, full depth) by default, or an MNKGame board searched to a fixed depth.
+    $ python3 parallel.py [--workers W] [--board XX.O.O...]
+    $ python3 parallel.py --mnk 4 4 4 --depth 6
+"""
+import os
+import sys
+import math
+import time
+import argparse
+import multiprocessing
+
+import tictactoe as ttt
+from bitboard import WINNING, from_board, to_move
+from mnk import MNKGame
+
+#--Shared bound before any root move has an exact score (further than any score from both ends):
+NO_SCORE = 2 ** 63 - 1
+
+#--Set in each worker process by _start_worker:
+_bound = None # [best root score so far, its move's position in serial order]
+_game = None
+
+
+
+def _start_worker(bound, game):
+    global _bound, _game
+    _bound = bound
+    _game = game
+    ttt.use_book = False # workers search (a book lookup isn't a root split)
+    ttt.clear_table() # a forked worker starts with a copy of the parent's table
+
+
+def _search(task):
+    """ (score, exact) of one root move; score is only a bound (no better than the best) when not exact. """
+    x, o, move, order, maximizing, depth = task
+    with _bound.get_lock():
+        best, holder = _bound[0], _bound[1]
+    #--A move after the best one's in serial order has to beat it; one before it only has to tie:
+    margin = 0 if order > holder else 1
+    if _game is None:
+        #--Negamax: x is the player to move and scores are theirs, so the root always maximizes
+        alpha = best - margin
+        score = -ttt._negamax(o, x | move, -math.inf, -alpha)
+        exact = score > alpha
+    elif maximizing:
+        alpha = best - margin
+        score = _game.min_value(x | 1 << move, o, move, depth - 1, alpha, math.inf, 1, math.inf)
+        exact = score > alpha
+    else:
+        beta = best + margin
+        score = _game.max_value(x, o | 1 << move, move, depth - 1, -math.inf, beta, 1, math.inf)
+        exact = score < beta
+    if score != math.floor(score):
+        raise ValueError(f"root split needs integer scores (the one-point tie margin), got {score}")
+    score = int(score)
+    if exact:
+        with _bound.get_lock():
+            better = score > _bound[0] if maximizing else score < _bound[0]
+            if better or (score == _bound[0] and order < _bound[1]):
+                _bound[0], _bound[1] = score, order
+    return score, exact
+
+
+def root_moves(board, game=None):
+    """
+    (x, o, moves, maximizing): the root's moves in the order the serial search tries them.
+    For tictactoe x is whoever is to move and o their opponent (negamax), and maximizing is True.
+    """
+    if game is None:
+        x, o = from_board(board)
+        mine, theirs = (x, o) if to_move(x, o) == ttt.X else (o, x)
+        return mine, theirs, ttt.root_moves(mine, theirs), True
+    x, o = game.from_board(board)
+    maximizing = game.player(board) == ttt.X
+    mover, other = (x, o) if maximizing else (o, x)
+    return x, o, game.ordered(mover, other, x | o), maximizing
+
+
+def action(move, game=None):
+    """ (i, j) of a root move (a bit for tictactoe, a cell number for an MNKGame). """
+    if game is None:
+        return divmod(move.bit_length() - 1, 3)
+    return divmod(move, game.n)
+
+
+
+class RootSplit():
+    """
+    A pool of worker processes that search root moves in parallel; reuse it for many moves.
+    game=None plays tictactoe.py to the end; an MNKGame is searched depth plies deep.
+    """
+
+    def __init__(self, workers=None, game=None, depth=None):
+        if game is not None and depth is None:
+            raise ValueError("MNKGame root splits need a depth")
+        if game is not None and game.win >= NO_SCORE:
+            raise ValueError("MNKGame scores don't fit the shared 64-bit bound (its heuristic bound is too large)")
+        self.game = game
+        self.depth = depth
+        self.workers = workers or os.cpu_count()
+        self.bound = multiprocessing.Array("q", 2)
+        self.pool = multiprocessing.Pool(self.workers, _start_worker, (self.bound, game))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    def minimax(self, board):
+        """ Best action (i, j) for the player to move, as serial search would choose it (None if the game is over). """
+        terminal = ttt.terminal(board) if self.game is None else self.game.terminal(board)
+        if terminal:
+            return None
+        x, o, moves, maximizing = root_moves(board, self.game)
+
+        #--tictactoe.minimax plays the first immediately winning move it comes to, searched or not:
+        if self.game is None:
+            for move in moves:
+                if WINNING[x | move]:
+                    return action(move)
+
+        self.bound[0], self.bound[1] = (-NO_SCORE if maximizing else NO_SCORE), len(moves)
+        tasks = [(x, o, move, order, maximizing, self.depth) for order, move in enumerate(moves)]
+        results = self.pool.map(_search, tasks, chunksize=1)
+        scores = [score for score, exact in results if exact]
+        best = max(scores) if maximizing else min(scores)
+        for move, (score, exact) in zip(moves, results):
+            if exact and score == best:
+                return action(move, self.game)
+
+
+
+def serial_minimax(board, game=None, depth=None):
+    """ The serial search RootSplit must agree with (for an MNKGame: one fixed-depth alpha-beta pass). """
+    if game is None:
+        return ttt.minimax(board)
+    if game.terminal(board):
+        return None
+    x, o, moves, maximizing = root_moves(board, game)
+    alpha, beta, found = -math.inf, math.inf, None
+    for cell in moves:
+        if maximizing:
+            score = game.min_value(x | 1 << cell, o, cell, depth - 1, alpha, beta, 1, math.inf)
+            if score > alpha:
+                alpha, found = score, cell
+        else:
+            score = game.max_value(x, o | 1 << cell, cell, depth - 1, alpha, beta, 1, math.inf)
+            if score < beta:
+                beta, found = score, cell
+    return action(found, game)
+
+
+def main():
+    parser = argparse.ArgumentParser(usage="python parallel.py [--workers W] [--board CELLS] [--mnk M N K --depth D]")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--board", default=None, help="row by row, X / O / . per cell (default: empty board)")
+    parser.add_argument("--mnk", type=int, nargs=3, metavar=("M", "N", "K"), default=None)
+    parser.add_argument("--depth", type=int, default=None, help="plies to search (MNKGame boards)")
+    args = parser.parse_args()
+
+    try:
+        game = None if args.mnk is None else MNKGame(*args.mnk)
+        if game is not None and args.depth is None:
+            raise ValueError("--mnk needs --depth")
+    except ValueError as e:
+        sys.exit(str(e))
+    m, n = (3, 3) if game is None else (game.m, game.n)
+    cells = args.board or "." * (m * n)
+    if len(cells) != m * n:
+        sys.exit(f"--board needs {m * n} cells")
+    board = [[None if c == "." else c for c in cells[i * n:(i + 1) * n]] for i in range(m)]
+
+    #--Fair comparison: both sides search, each from an empty transposition table.
+    ttt.use_book = False
+    ttt.clear_table()
+    start = time.perf_counter()
+    serial = serial_minimax(board, game, args.depth)
+    serial_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with RootSplit(args.workers, game, args.depth) as split:
+        pool_time = time.perf_counter() - start
+        start = time.perf_counter()
+        parallel = split.minimax(board)
+        parallel_time = time.perf_counter() - start
+
+    print(f"serial:   {serial} in {serial_time:.3f}s")
+    print(f"parallel: {parallel} in {parallel_time:.3f}s ({split.workers} workers, +{pool_time:.3f}s pool start)")
+    print(f"speedup:  {serial_time / parallel_time:.2f}x")
+    if parallel != serial:
+        sys.exit("parallel and serial moves differ")
+
+
+if __name__ == "__main__":
+    main()
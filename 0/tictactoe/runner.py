@@ -1,6 +1,8 @@
 import pygame
 import sys
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import tictactoe as ttt
 
@@ -17,14 +19,27 @@ mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
+clock = pygame.time.Clock()
+fps = 60
+
+# The AI searches on a background thread so the window keeps drawing and handling events meanwhile.
+# Its move is applied once the future is done (and shown as "thinking" for at least think_time seconds).
+# A restart (or quitting) cancels the future if it hasn't started, and sets its cancel event if it has:
+# minimax then stops at its next node (raising ttt.Cancelled, which nothing waits for).
+ai = ThreadPoolExecutor(max_workers=1)
+think_time = 0.5
+
 user = None
 board = ttt.initial_state()
-ai_turn = False
+thinking = None # (future of the AI's move, board it's for, time it started, its cancel event)
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            if thinking is not None:
+                thinking[3].set()
+            ai.shutdown(wait=False, cancel_futures=True)
             sys.exit()
 
     screen.fill(black)
@@ -102,21 +117,23 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            title = "Computer thinking" + "." * int(time.time() * 3 % 4)
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move: start searching in the background, apply the move when it's ready
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
+            if thinking is None:
+                cancel = threading.Event()
+                thinking = (ai.submit(ttt.minimax, board, cancel), board, time.time(), cancel)
             else:
-                ai_turn = True
+                future, searched, started, _ = thinking
+                if future.done() and time.time() - started >= think_time:
+                    thinking = None
+                    if searched is board:
+                        board = ttt.result(board, future.result())
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -127,20 +144,24 @@ while True:
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
                         board = ttt.result(board, (i, j))
 
-        if game_over:
-            againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
-            again = mediumFont.render("Play Again", True, black)
-            againRect = again.get_rect()
-            againRect.center = againButton.center
-            pygame.draw.rect(screen, white, againButton)
-            screen.blit(again, againRect)
-            click, _, _ = pygame.mouse.get_pressed()
-            if click == 1:
-                mouse = pygame.mouse.get_pos()
-                if againButton.collidepoint(mouse):
-                    time.sleep(0.2)
-                    user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+        # Play again once the game is over, or restart at any time (even while the computer is thinking)
+        againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
+        again = mediumFont.render("Play Again" if game_over else "Restart", True, black)
+        againRect = again.get_rect()
+        againRect.center = againButton.center
+        pygame.draw.rect(screen, white, againButton)
+        screen.blit(again, againRect)
+        click, _, _ = pygame.mouse.get_pressed()
+        if click == 1:
+            mouse = pygame.mouse.get_pos()
+            if againButton.collidepoint(mouse):
+                time.sleep(0.2)
+                user = None
+                board = ttt.initial_state()
+                if thinking is not None:
+                    thinking[0].cancel()
+                    thinking[3].set()
+                    thinking = None
 
     pygame.display.flip()
+    clock.tick(fps)
@@ -1,7 +1,20 @@
 import unittest
 import os
+import io
+import json
+import time
+import contextlib
+import math
+import threading
+import tempfile
 
 from tictactoe import player, actions, result, winner, terminal, utility, minimax, max_value, min_value
+from mnk import MNKGame, line_heuristic, line_bound
+from parallel import RootSplit, serial_minimax
+import tictactoe
+import tictactoeMINIMAX
+import book
+import bitboard
 
 """ TESTS for Tic-Tac-Toe AI Game:
 
@@ -12,10 +25,18 @@ from tictactoe import player, actions, result, winner, terminal, utility, minima
 - TerminalTestCase: tests whether game is won/tied, or still going– terminal().
 - UtilityTestCase: tests game utility output (score)– utility().
 – MinimaxTestCase: tests optimal move finder– minimax().
+– TableTestCase: the transposition table shares one entry between a position's 8 rotations/reflections, and counts its hits– tictactoe.table_stats().
+– BookTestCase: the opening book round-trips through its file, is refused when stale or damaged, and plays as well as the search– book.py.
+– MNKTestCase: tests the m,n,k game engine (any board size, k in a row)– mnk.MNKGame.
+– ParallelTestCase: tests the process-pool root split picks the serial search's moves– parallel.RootSplit.
+– PerformanceTestCase: counts minimax()'s search nodes for both engines against benchmark.json, and times the two engines against each other (opt-in, see below).
 
 
 - To run all tests:
     $ python3 test.py
+- To also run the performance regression suite (~1 min: the plain engine is slow), or to rewrite its baselines:
+    $ TTT_BENCHMARK=1 python3 test.py
+    $ TTT_BENCHMARK=update python3 test.py
 
 """
 
@@ -218,6 +239,410 @@ class MinimaxTestCase(CommonTest):
         board = self.create_board("XOXOXXO.O")
         self.assertEqual(minimax(board), (2,1), "X is last to go, has to play last available cell to simply tie.")
 
+#
+# #
+#
+class CancelTestCase(CommonTest):
+    """ minimax(board, cancel) stops as soon as cancel is set, and leaves the transposition table usable. """
+    #
+    def setUp(self):
+        super().setUp()
+        self.use_book = tictactoe.use_book
+        tictactoe.use_book = False # the book answers without searching
+        tictactoe.clear_table()
+    def tearDown(self):
+        tictactoe.use_book = self.use_book
+        tictactoe.clear_table()
+    # # #
+    def test_cancel(self):
+        board = self.create_board("X........")
+        cancel = threading.Event()
+        cancel.set()
+        with self.assertRaises(tictactoe.Cancelled):
+            minimax(board, cancel)
+        self.assertEqual(tictactoe.table_stats()["entries"], 0)
+        expected = minimax(board)
+        tictactoe.clear_table()
+        self.assertEqual(minimax(board, threading.Event()), expected)
+    #
+    def test_cancel_from_another_thread(self):
+        cancel = threading.Event()
+        calls = []
+        negamax = tictactoe._negamax
+        def slow(*args):
+            calls.append(1)
+            if len(calls) == 50:
+                threading.Timer(0.01, cancel.set).start()
+            time.sleep(0.001)
+            return negamax(*args)
+        tictactoe._negamax = slow
+        try:
+            start = time.perf_counter()
+            with self.assertRaises(tictactoe.Cancelled):
+                minimax(self.create_board("........."), cancel)
+            self.assertLess(time.perf_counter() - start, 1.0)
+        finally:
+            tictactoe._negamax = negamax
+        self.assertIsNone(tictactoe._cancel)
+
+#
+# #
+#
+class WindowTestCase(CommonTest):
+    """ max_value/min_value with an empty alpha-beta window (alpha >= beta) still give the true value, and don't corrupt the transposition table. """
+    #
+    def setUp(self):
+        super().setUp()
+        tictactoe.clear_table()
+    def tearDown(self):
+        tictactoe.clear_table()
+    # # #
+    def test_empty_window(self):
+        board = self.create_board("OX.......")
+        self.assertEqual(max_value(board, 0, 0), 0)
+        self.assertEqual(max_value(board, -math.inf, math.inf), 0, "the table mustn't keep a wrong bound from the empty window")
+        self.assertEqual(min_value(self.create_board("X........"), 1, -1), 0)
+
+#
+# #
+#
+class TableTestCase(CommonTest):
+    """ A rotation or reflection of a position already searched is a table hit, not a new entry. """
+    #
+    def setUp(self):
+        super().setUp()
+        tictactoe.clear_table()
+    def tearDown(self):
+        tictactoe.clear_table()
+    #
+    def symmetries(self, board):
+        """ The board's 8 rotations/reflections (some may be equal). """
+        boards = []
+        for _ in range(4):
+            board = [list(row) for row in zip(*board[::-1])] # rotate a quarter turn
+            boards += [board, [row[::-1] for row in board]]
+        return boards
+    # # #
+    def test_one_canonical_key(self):
+        for str_board in ["X........", ".X.......", "XO.......", "X.O.X...O", ".X.OX..O."]:
+            boards = self.symmetries(self.create_board(str_board))
+            self.assertEqual(len({bitboard.canonical(*bitboard.from_board(board)) for board in boards}), 1, str_board)
+    #
+    def test_symmetric_position_hits(self):
+        board = self.create_board("XO.......")
+        value = max_value(board, -math.inf, math.inf)
+        searched = tictactoe.table_stats()
+        self.assertEqual(searched["entries"], len(tictactoe.table))
+        self.assertGreater(searched["entries"], 0)
+        for i, symmetric in enumerate(self.symmetries(board)):
+            hits = tictactoe.table_stats()["hits"]
+            self.assertEqual(max_value(symmetric, -math.inf, math.inf), value)
+            self.assertGreater(tictactoe.table_stats()["hits"], hits, f"symmetry {i}")
+            self.assertEqual(len(tictactoe.table), searched["entries"], f"symmetry {i}")
+    #
+    def test_without_table(self):
+        tictactoe.use_table = False
+        try:
+            max_value(self.create_board("X...O...."), -math.inf, math.inf)
+            self.assertEqual(tictactoe.table_stats(), {"hits": 0, "misses": 0, "entries": 0})
+        finally:
+            tictactoe.use_table = True
+
+#
+# #
+#
+class BookTestCase(CommonTest):
+    """ book.load() gives back what book.write() wrote (None for any other file), and every book move is worth what minimax's is. """
+    #
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.filename = os.path.join(cls.directory.name, "book.bin")
+        cls.positions = book.write(cls.filename)
+        with open(cls.filename, "rb") as f:
+            cls.data = f.read()
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+    def setUp(self):
+        super().setUp()
+        self.use_book = tictactoe.use_book
+        tictactoe.use_book = False # minimax searches: the book is what's under test
+        tictactoe.clear_table()
+    def tearDown(self):
+        tictactoe.use_book = self.use_book
+        tictactoe.clear_table()
+    #
+    def value(self, board):
+        """ The board's minimax value (X wins: 1), searched. """
+        if terminal(board):
+            return utility(board)
+        return max_value(board, -math.inf, math.inf) if player(board) == self.X else min_value(board, -math.inf, math.inf)
+    # # #
+    def test_round_trip(self):
+        self.assertEqual(self.positions, 5478)
+        data = book.load(self.filename)
+        self.assertEqual(len(data), book.SIZE)
+        self.assertEqual(sum(entry != book.UNREACHABLE for entry in data), self.positions)
+    #
+    def test_stale_or_damaged_file(self):
+        header = len(book.MAGIC) + 1
+        damaged = {
+            "missing": None,
+            "wrong magic": b"NOPE" + self.data[len(book.MAGIC):],
+            "old version": book.MAGIC + bytes([book.VERSION - 1]) + self.data[header:],
+            "truncated": self.data[:-1],
+            "too long": self.data + b"\0",
+            "header only": self.data[:header],
+        }
+        for name, data in damaged.items():
+            filename = os.path.join(self.directory.name, "damaged.bin")
+            if data is None:
+                filename = os.path.join(self.directory.name, "nothing.bin")
+            else:
+                with open(filename, "wb") as f:
+                    f.write(data)
+            self.assertIsNone(book.load(filename), name)
+    #
+    def test_moves_match_search(self):
+        data = book.load(self.filename)
+        for x, o in book.reachable():
+            board = bitboard.to_board(x, o)
+            move, value = book.unpack(data[bitboard.index(x, o)])
+            self.assertEqual(value, self.value(board), board)
+            if terminal(board):
+                self.assertEqual(move, book.NO_MOVE, board)
+                continue
+            action = (move // 3, move % 3)
+            self.assertIn(action, actions(board), board)
+            self.assertEqual(self.value(result(board, action)), self.value(result(board, minimax(board))), board)
+
+#
+# #
+#
+class MNKTestCase(CommonTest):
+    """ MNKGame(m, n, k) plays the same interface on bigger boards; its minimax() searches within a time budget. """
+    #
+    def test_3_3_3_matches_tictactoe(self):
+        game = MNKGame(3, 3, 3)
+        for str_board in ["XX.O.O...", "XOXOXXO.O", "XXOOOXXXO", "X...O...X"]:
+            board = self.create_board(str_board)
+            self.assertEqual(game.player(board), player(board))
+            self.assertEqual(game.actions(board), actions(board))
+            self.assertEqual(game.winner(board), winner(board))
+            self.assertEqual(game.terminal(board), terminal(board))
+    #
+    def test_3_3_3_wins_and_blocks(self):
+        game = MNKGame(3, 3, 3)
+        self.assertEqual(game.minimax(self.create_board("XX.O.O...")), (0,2), "X should play top-right to immediately win.")
+        self.assertEqual(game.minimax(self.create_board("OO.X...X.")), (0,2), "X should play to block O's next winning move.")
+    #
+    def test_4_in_a_row_on_5x5(self):
+        game = MNKGame(5, 5, 4)
+        board = game.initial_state()
+        for i, j in [(1,1), (0,4), (2,2), (4,0), (3,3)]:
+            board = game.result(board, (i, j))
+        self.assertEqual(game.player(board), self.O)
+        self.assertIsNone(game.winner(board))
+        self.assertIn(game.minimax(board, budget=1), {(0,0), (4,4)}, "O must block X's diagonal.")
+        self.assertEqual(game.winner(game.result(game.result(board, (0,3)), (4,4))), self.X)
+    #
+    def test_radius_must_reach_a_neighbor(self):
+        with self.assertRaises(ValueError):
+            MNKGame(5, 5, 4, radius=0)
+        game = MNKGame(5, 5, 4, radius=1)
+        self.assertIn(game.minimax(game.result(game.initial_state(), (2,2)), budget=0.2), {(1,1), (1,2), (1,3), (2,1), (2,3), (3,1), (3,2), (3,3)})
+    #
+    def test_win_outscores_the_heuristic(self):
+        for m, n, k in ((3, 3, 3), (15, 15, 5), (19, 19, 9), (19, 19, 12)):
+            game = MNKGame(m, n, k)
+            self.assertGreater(game.win - m * n, line_bound(game), (m, n, k))
+            #--k - 1 marks on every line X could use, none blocked: as much as line_heuristic scores a non-terminal board
+            x = sum(1 << game.index(i, j) for i in range(m) for j in range(n) if (i + j) % k)
+            self.assertLess(abs(line_heuristic(game, x, 0)), line_bound(game), (m, n, k))
+    #
+    def test_big_evaluation_is_not_a_forced_win(self):
+        """ A heuristic bigger than 10 ** 9 (the old fixed win score) mustn't end iterative deepening early. """
+        game = MNKGame(5, 5, 4, heuristic=lambda game, x, o: 5 * 10 ** 9, bound=lambda game: 10 ** 10)
+        board = game.result(game.initial_state(), (2,2))
+        game.minimax(board, budget=5, max_depth=3)
+        self.assertEqual(game.depth, 3)
+    #
+    def test_budget_returns_a_move_in_time(self):
+        for game in (MNKGame(15, 15, 5, radius=1), MNKGame(19, 19, 5)):
+            board = game.initial_state()
+            board[game.m // 2][game.n // 2] = self.X
+            for budget in (0.05, 0.2):
+                start = time.perf_counter()
+                action = game.minimax(board, budget=budget)
+                self.assertLess(time.perf_counter() - start, budget * 1.5, f"{game.m}x{game.n}, budget {budget}")
+                self.assertIn(action, game.actions(board))
+
+#
+# #
+#
+class ParallelTestCase(CommonTest):
+    """ RootSplit searches the root's moves across worker processes; it must choose exactly what serial search does. """
+    #
+    def test_same_moves_as_minimax(self):
+        with RootSplit(2) as split:
+            for str_board in ["XX.O.O...", "OO.X...X.", "XX.OO..X.", "X...O....", "........."]:
+                board = self.create_board(str_board)
+                self.assertEqual(split.minimax(board), minimax(board), str_board)
+    #
+    def test_same_moves_as_serial_mnk(self):
+        game = MNKGame(4, 4, 3)
+        board = game.result(game.result(game.initial_state(), (1,1)), (0,0))
+        with RootSplit(2, game, depth=3) as split:
+            self.assertEqual(split.minimax(board), serial_minimax(board, game, depth=3))
+    #
+    def test_big_integer_scores(self):
+        """ Scores past 2 ** 53 (where doubles stop telling neighbours apart) are shared exactly. """
+        game = MNKGame(4, 4, 3, heuristic=lambda game, x, o: 2 ** 60 + line_heuristic(game, x, o), bound=lambda game: 2 ** 61)
+        board = game.result(game.result(game.initial_state(), (1,1)), (0,0))
+        with RootSplit(2, game, depth=3) as split:
+            self.assertEqual(split.minimax(board), serial_minimax(board, game, depth=3))
+    #
+    def test_fractional_scores_refused(self):
+        game = MNKGame(4, 4, 3, heuristic=lambda game, x, o: line_heuristic(game, x, o) / 3)
+        with RootSplit(2, game, depth=2) as split:
+            with self.assertRaises(ValueError):
+                split.minimax(game.result(game.initial_state(), (1,1)))
+        with self.assertRaises(ValueError):
+            RootSplit(1, MNKGame(4, 4, 3, bound=lambda game: 2 ** 63), depth=2)
+
+
+
+#
+# #
+#
+#--Performance regression suite: what minimax() costs from each class of position, for each engine.
+BENCHMARK = os.environ.get("TTT_BENCHMARK")
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark.json")
+#--The original tictactoe.py (list-of-lists max_value/min_value alpha-beta, before bitboards, the
+#  transposition table and negamax), measured once with run_engine: what the rewrite is compared against.
+ORIGINAL = "alphabeta (original)"
+POSITIONS = {
+    "empty": ["........."],
+    "one move": ["X........", ".X.......", "....X...."], # corner, edge, centre
+    "mid-game": ["X.O.X...O", ".X.OX..O.", "XO...X.O."],
+    "near-terminal": ["XOXOX..O.", "XOX.O.OX.", "XOXXOO.X."],
+}
+#--Each engine's module, and the functions its search recurses through (counted as nodes):
+ENGINES = {
+    "minimax": (tictactoeMINIMAX, ["max_value", "min_value"]),
+    "alphabeta": (tictactoe, ["_negamax"]),
+}
+REPEATS = {"minimax": 1, "alphabeta": 5} # timings are the best of this many runs
+TIME_FLOOR = 0.005 # seconds: positions quicker than this (for both engines) are timer noise, not compared
+
+
+def parse_board(str_board):
+    """ create_board outside a test case: "X...O...." -> list of lists. """
+    return [[None if c == "." else c for c in str_board[3 * i:3 * i + 3]] for i in range(3)]
+
+
+def run_engine(module, node_functions, board, repeats):
+    """ (best seconds, nodes) of module.minimax(board); nodes counted by wrapping the module's search functions. """
+    seconds = math.inf
+    for _ in range(repeats):
+        if module is tictactoe:
+            tictactoe.clear_table()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()): # tictactoeMINIMAX prints its own timing
+            module.minimax(board)
+        seconds = min(seconds, time.perf_counter() - start)
+
+    nodes = 0
+    def counted(function):
+        def wrapper(*args):
+            nonlocal nodes
+            nodes += 1
+            return function(*args)
+        return wrapper
+    originals = {name: getattr(module, name) for name in node_functions}
+    for name, function in originals.items():
+        setattr(module, name, counted(function)) # the recursion looks these up as module globals
+    try:
+        if module is tictactoe:
+            tictactoe.clear_table()
+        with contextlib.redirect_stdout(io.StringIO()):
+            module.minimax(board)
+    finally:
+        for name, function in originals.items():
+            setattr(module, name, function)
+    return seconds, nodes
+
+
+def run_benchmark():
+    """ {engine: {position class: {"seconds", "nodes"}}}, summed over the class's positions. Only the nodes are deterministic; seconds depend on the machine. """
+    results = {}
+    use_book = tictactoe.use_book
+    tictactoe.use_book = False # the book answers without searching: nothing to measure
+    try:
+        for engine, (module, node_functions) in ENGINES.items():
+            results[engine] = {}
+            for kind, boards in POSITIONS.items():
+                seconds = nodes = 0
+                for str_board in boards:
+                    s, n = run_engine(module, node_functions, parse_board(str_board), REPEATS[engine])
+                    seconds += s
+                    nodes += n
+                results[engine][kind] = {"seconds": round(seconds, 6), "nodes": nodes}
+    finally:
+        tictactoe.use_book = use_book
+    return results
+
+
+@unittest.skipUnless(BENCHMARK, "set TTT_BENCHMARK=1 to run the performance suite")
+class PerformanceTestCase(unittest.TestCase):
+    """ minimax() mustn't search more nodes than the baselines in benchmark.json. Node counts are the same on every machine; wall-clock time isn't, so timings are only compared between the two engines within this run. """
+    #
+    @classmethod
+    def setUpClass(cls):
+        cls.results = run_benchmark()
+        print()
+        print(f"{'engine':<10} {'positions':<14} {'nodes':>10} {'seconds':>9}")
+        for engine, kinds in cls.results.items():
+            for kind, result in kinds.items():
+                print(f"{engine:<10} {kind:<14} {result['nodes']:>10} {result['seconds']:>9.4f}")
+        with open(BASELINE_FILE) as f:
+            cls.baseline = json.load(f)
+        for kind, nodes in cls.baseline[ORIGINAL].items():
+            print(f"{'original':<10} {kind:<14} {nodes:>10} {'-':>9}")
+        if BENCHMARK == "update":
+            #--ORIGINAL's counts can't be re-measured (that engine is gone): they're kept as they are.
+            cls.baseline.update({engine: {kind: result["nodes"] for kind, result in kinds.items()} for engine, kinds in cls.results.items()})
+            with open(BASELINE_FILE, "w") as f:
+                json.dump(cls.baseline, f, indent=2)
+                f.write("\n")
+    #
+    def check(self, engine):
+        for kind, old_nodes in self.baseline[engine].items():
+            self.assertLessEqual(self.results[engine][kind]["nodes"], old_nodes, f"{engine}, {kind}: more nodes searched")
+    #
+    def test_minimax_no_regression(self):
+        self.check("minimax")
+    #
+    def test_alphabeta_no_regression(self):
+        self.check("alphabeta")
+    #
+    def test_alphabeta_searches_less(self):
+        for kind in POSITIONS:
+            self.assertLess(self.results["alphabeta"][kind]["nodes"], self.results["minimax"][kind]["nodes"], kind)
+    #
+    def test_no_more_than_the_original_engine(self):
+        """ Never more nodes than tictactoe.py's alpha-beta searched before the bitboard/table/negamax rewrite. """
+        for kind, old_nodes in self.baseline[ORIGINAL].items():
+            self.assertLessEqual(self.results["alphabeta"][kind]["nodes"], old_nodes, kind)
+    #
+    def test_alphabeta_is_faster(self):
+        """ Same process, same machine: the plain engine is the calibration run. """
+        for kind in POSITIONS:
+            plain, pruned = self.results["minimax"][kind]["seconds"], self.results["alphabeta"][kind]["seconds"]
+            if max(plain, pruned) > TIME_FLOOR:
+                self.assertLess(pruned, plain, kind)
+
 
 
 
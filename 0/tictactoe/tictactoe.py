@@ -3,17 +3,50 @@ Tic Tac Toe AI-Player
 - MJ Spitzer, Dec. 5, 2020
 - CS50: Intro to Artificial Intelligence w/ Python
     -> This is the optimized Minimax + Alpha_Beta Pruning version.
+    -> The search runs on bitboards (bitboard.py); the functions below keep the list-of-lists API.
+    -> One negamax function searches for both players, trying likely-best moves first (wins, blocks,
+       then killer/history-ordered centre, corners, edges) so alpha-beta cuts off as early as possible.
+    -> Positions already searched (in any move order, rotation or reflection) come from a transposition table.
+    -> With an opening book written (book.py), minimax is a lookup and doesn't search at all.
 """
-from copy import deepcopy
 import math # math.inf / -math.inf
-import re
-import time
+
+from bitboard import FULL, MOVES, PREFERRED, WINNING, COUNTS, from_board, to_board, bit, cell, to_move, canonical, index
+import bitboard
+import book
 
 # Player variables / pieces-values:
 X = "X"
 O = "O"
 EMPTY = None
 
+#--Transposition table: canonical(x, o) -> (value, flag). Alpha-beta scores are only exact inside the
+#  window they were searched with, so each entry records what its value means:
+EXACT = 0 # the position's value
+LOWER = 1 # the value is at least this (search failed high)
+UPPER = 2 # the value is at most this (search failed low)
+use_table = True
+table = {}
+tt_hits = 0
+tt_misses = 0
+
+#--Move ordering: per depth (number of marks), the last move to cause a cutoff there ("killer"),
+#  and per move, how much cutting off it has done (deeper cutoffs count for more):
+killers = [0] * 10
+history = {1 << cell: 0 for cell in range(9)}
+
+#--Opening book: read from book.BOOK_FILE the first time minimax needs it.
+use_book = True
+_book = None # None: not read yet; False: no (usable) book file
+
+#--The cancel event of the minimax call in progress (see minimax): checked at every node.
+_cancel = None
+
+
+
+class Cancelled(Exception):
+    """ minimax's cancel event was set while it searched. """
+
 
 
 def initial_state():
@@ -29,23 +62,7 @@ def player(board):
     """
     Returns player who has the next turn on a board.
     """
-    #--Flatten the list:
-    flat_board = [cell for row in board for cell in row]
-    #--Check if Xs/Os are NOT on the board: X goes first:
-    Xs, Os = 0, 0
-    if X not in flat_board and O not in flat_board:
-        return X #--Game start, X goes first.
-    for cell in flat_board:
-        if 'X' == cell:
-            Xs += 1
-        elif 'O' == cell:
-            Os +=1
-        else: # Cell is EMPTY.
-            pass
-    if Xs > Os:
-        return O
-    else: # Os >= Xs:
-        return X
+    return to_move(*from_board(board))
 
 # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
 
@@ -53,16 +70,9 @@ def actions(board):
     """
     Returns set of all possible actions (i, j) available on the board.
     """
-    #--Create empty set to store current legal available moves.
-    moves = set()
-    for i, row in enumerate(board):
-        for j, cell in enumerate(row):
-            if board[i][j] != "X" and board[i][j] != "O":
-                #--Create tuple of [EMPTY] cell:
-                move = (i, j)
-                #--Add move-tuple to moves-set:
-                moves.add(move)
-    return moves
+    #--Empty cells are the bits in neither player's mask:
+    x, o = from_board(board)
+    return {cell(move) for move in MOVES[FULL & ~(x | o)]}
 
 # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
 
@@ -71,16 +81,15 @@ def result(board, action):
     Returns the board that results from making move (i, j) on the board.
     """
     #--Check legal moves:
-    legal_moves = actions(board)
-    if action not in legal_moves:
+    if action not in actions(board):
         raise Exception("Move is not legal")
-    #--Determine whose turn it is:
-    mark = player(board)
-    #--Create a deepcopy of the board:
-    board_copy = deepcopy(board)
-    #--Apply the mark to the board_copy:
-    board_copy[action[0]][action[1]] = mark
-    return board_copy
+    #--Apply the mark of whoever's turn it is (a new board: the one passed in is left alone):
+    x, o = from_board(board)
+    if to_move(x, o) == X:
+        x |= bit(action)
+    else:
+        o |= bit(action)
+    return to_board(x, o)
 
 # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
 
@@ -89,51 +98,8 @@ def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-    """
-    An easier (for horizontal... ) check would be like:
-    for i, row in enumerate(board):
-        if len(set(row)) == 1 and row[1] != EMPTY:
-            # easy!
-    """
-    #--All Possible win conditions (for either piece)
-        #--Notice win conditions ignore a) adversary's pieces and b) your own irrelevant pieces (".")
-    wins = [
-        "ooo......", #Horizontal win, top
-        "...ooo...", #Horizontal win, mid
-        "......ooo", #Horizontal win, bottom
-        "o...o...o", #Diagonal win, L-R
-        "..o.o.o..", #Diagonal win, R-L
-        "o..o..o..", #Vertical win, L
-        ".o..o..o.", #Vertical win, mid
-        "..o..o..o", #Vertical win, R
-    ]
-    #--Flatten the board to a string:
-    fboard = [cell for row in board for cell in row]
-    fboard = [x if x != EMPTY else "." for x in fboard]
-    fboard = "".join(fboard)
-    #--Construct checkboards for X & O:
-    X_check = fboard.replace(X,"o").replace(O,".")
-    O_check = fboard.replace(O,"o").replace(X,".")
-    winner = ""
-    for win in wins:
-        X_winReg = str(win.replace(".", "[o\.]{1}"))
-        O_winReg = str(win.replace(".", "[o\.]{1}"))
-        #
-        Xwin = re.search(str(X_winReg), str(X_check))
-        Owin = re.search(str(O_winReg), str(O_check))
-        if Xwin:
-            return X
-        if Owin:
-            return O
-    # Tie/game still going:
-    return EMPTY
-
-
-
-
-
-
-
+    #--A player has won if their mask contains any of the 8 win lines (precomputed for every mask):
+    return bitboard.winner(*from_board(board))
 
 
 # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
@@ -143,17 +109,7 @@ def terminal(board):
     """
     Returns True if game is over (winner or tie), False otherwise.
     """
-    #--Has the game been won?
-    check = winner(board)
-    if check == X or check == O:
-        return True
-    #--Check if remaining cells (if not, a tie, game over):
-        #--TODO (better): simply call actions(board) and if returned set is empty...
-    for row in board:
-        for cell in row:
-            if cell == EMPTY:
-                return False # Game goes on!
-    return True #--All cells are occupied, it's a tie.
+    return bool(bitboard.terminal(*from_board(board)))
 
 # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
 
@@ -161,13 +117,7 @@ def utility(board):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 for tie. Only called when terminal(board) is True (game over).
     """
-    champ = winner(board)
-    if champ == X:
-        return 1
-    elif champ == O:
-        return -1
-    else: #--Tie:
-        return 0
+    return bitboard.utility(*from_board(board))
 
 # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
 
@@ -177,98 +127,189 @@ def utility(board):
 #
 # #
 #
-def minimax(board): # really 'def alphabeta(board):'
+def minimax(board, cancel=None): # really 'def alphabeta(board):'
     """
     Returns the optimal action for the current player on the board using minimax algorithm.
+    cancel: a threading.Event; setting it (e.g. from a UI thread) stops the search, which raises Cancelled.
 
     Maximizing player (X) asks, "To know what O will do,I need to imagine I'm O: O will think, 'if I take this action, what action will X play to get the best value?'... and so on, recursively!"
+    (Negamax: both players maximize their own score, which is minus the other's, so one function serves both sides.)
     """
-#    start_time = time.time() # CLOCK STARTS!
-
     #--Game is already over:
-    if terminal(board):
+    x, o = from_board(board)
+    if bitboard.terminal(x, o):
         return None
     #
-    #--Who is getting their best move?:
-    who = player(board)
-
-    #--Alpha-beta Pruning (more effecient minimax):
-    alpha = -math.inf # worst possible score for X (maximizer)
-    beta = math.inf # worst possible score for O (minimizer)
-
-    #--Maximizing player: wants to pick |action in actions(board)| that produces the highest value of min_value(result(board, action)):
-    if who == X:
-        #-- '-∞' is our starting best, which we work up from.
-        best = -math.inf # -∞
-        #--Run through each possible action at this state:
-        for action in actions(board):
-            #
-            #--Check is an IMMEDIATELY winning move (AI will use 'insta-kill' to win faster/avoid ties):
-            check = winner(result(board,action))
-            if check:
-                return action
-            #
-            #--What is the highest value from the minimum values O will optimize for?
-            high = min_value(result(board, action), alpha, beta)
-            if high > best:
-                best = high
-                best_move = action
-
-
+    #--Every reachable position's move is in the opening book (if there is one):
+    if use_book and opening_book() is not None:
+        entry = book.unpack(opening_book()[index(x, o)])
+        if entry is not None:
+            return cell(1 << entry[0])
     #
-    elif who == O:
-        best = math.inf # ∞
-        for action in actions(board):
-            #
-            #--Check is an IMMEDIATELY winning move:
-            check = winner(result(board,action))
-            if check:
-                return action
-            #
-            low = max_value(result(board, action), alpha, beta)
-            if low < best:
-                best = low
-                best_move = action
-
-
+    #--Whose move is it? Scores below are from their side:
+    mine, theirs = (x, o) if to_move(x, o) == X else (o, x)
+    moves = root_moves(mine, theirs)
     #
-#    print(time.time() - start_time)
-    return best_move
-
+    #--Check is an IMMEDIATELY winning move (AI will use 'insta-kill' to win faster/avoid ties):
+    for move in moves:
+        if WINNING[mine | move]:
+            return cell(move)
+    #
+    #--Best move is the first one that scores highest (Alpha-beta Pruning: later moves only need to beat it):
+    global _cancel
+    _cancel = cancel
+    try:
+        alpha = -math.inf
+        for move in moves:
+            score = -_negamax(theirs, mine | move, -math.inf, -alpha)
+            if score > alpha:
+                alpha = score
+                best_move = move
+    finally:
+        _cancel = None
+    return cell(best_move)
+#
+# #
+#
+def root_moves(mine, theirs):
+    """ The moves minimax tries, in order: blocks of the opponent's wins, then centre, corners, edges. """
+    moves = PREFERRED[FULL & ~(mine | theirs)]
+    blocks = [move for move in moves if WINNING[theirs | move]]
+    return blocks + [move for move in moves if move not in blocks]
+#
+# #
+#
+def opening_book():
+    """ The opening book's bytes (see book.py), loaded on first use; None if it hasn't been written. """
+    global _book
+    if _book is None:
+        _book = book.load() or False
+    return _book or None
 #
 # #
 #
 def max_value(board, alpha, beta):
     """ Returns max utility of the current state of the board. """
-    #
-    if terminal(board):
-        return utility(board)
-    #
-    v = -math.inf
-    for action in actions(board):
-        #--Imagine what the other player will think while optimizing their game (they min while you max) [recursion]:
-        v = max(v, min_value(result(board, action), alpha, beta))
-        #--Alpha-beta pruning:
-        alpha = max(alpha, v)
-        if alpha > beta: # ! ! ! ! ! ! !
-            break
-    return v
+    x, o = from_board(board)
+    if bitboard.terminal(x, o):
+        return bitboard.utility(x, o)
+    #--An empty window (alpha >= beta) would cut off after any first move, so search it in full instead:
+    if alpha >= beta:
+        alpha, beta = -math.inf, math.inf
+    return _negamax(x, o, alpha, beta)
 #
 # #
 #
 def min_value(board, alpha, beta):
     """ Returns minimum utility of the current state of the board. """
-    #--Game is over, just return the score:
-    if terminal(board):
-        return utility(board)
+    x, o = from_board(board)
+    if bitboard.terminal(x, o):
+        return bitboard.utility(x, o)
+    if alpha >= beta:
+        alpha, beta = -math.inf, math.inf
+    #--O's best score is minus X's:
+    return -_negamax(o, x, -beta, -alpha)
+#
+# #
+#
+def clear_table():
+    """ Empties the transposition table (and the killer/history move-ordering tables) and zeroes its hit/miss counters. """
+    global tt_hits, tt_misses
+    table.clear()
+    tt_hits = tt_misses = 0
+    killers[:] = [0] * len(killers)
+    history.update(dict.fromkeys(history, 0))
+#
+# #
+#
+def table_stats():
+    """ Transposition table hits, misses and stored positions so far. """
+    return {"hits": tt_hits, "misses": tt_misses, "entries": len(table)}
+#
+# #
+#
+def _probe(key, alpha, beta):
+    """ (value, alpha, beta): value is the stored score if it settles this window (else None), with the window narrowed by any stored bound. """
+    global tt_hits, tt_misses
+    entry = table.get(key)
+    if entry is None:
+        tt_misses += 1
+        return None, alpha, beta
+    tt_hits += 1
+    value, flag = entry
+    if flag == EXACT or (flag == LOWER and value >= beta) or (flag == UPPER and value <= alpha):
+        return value, alpha, beta
+    if flag == LOWER:
+        return None, max(alpha, value), beta
+    return None, alpha, min(beta, value)
+#
+# #
+#
+def _store(key, v, alpha, beta):
+    """ Records v as searched in the (alpha, beta) window the node was entered with (never empty: see _negamax). """
+    if v <= alpha:
+        table[key] = (v, UPPER)
+    elif v >= beta:
+        table[key] = (v, LOWER)
+    else:
+        table[key] = (v, EXACT)
+#
+# #
+#
+def _negamax(mine, theirs, alpha, beta):
+    """
+    Score of the position for the player to move (mine): 1 win, 0 tie, -1 loss.
+    The player who just moved (theirs) hasn't won: whoever made their move checked that first.
+    """
+    #--Cancelled mid-search: unwinding stores nothing in the table, so it stays valid.
+    if _cancel is not None and _cancel.is_set():
+        raise Cancelled
+    empty = FULL & ~(mine | theirs)
+    moves = PREFERRED[empty]
+    #--A winning move decides it, without building (or searching) any child:
+    for move in moves:
+        if WINNING[mine | move]:
+            return 1
+    if not empty:
+        return 0
+    #--Seen this position (or a rotation/reflection of it) before? (Not for an empty window, alpha >= beta:
+    #  its search stops after the first move, and what that returns isn't a bound on anything.)
+    probed = use_table and alpha < beta
+    if probed:
+        key = canonical(mine, theirs)
+        entered = alpha, beta
+        value, alpha, beta = _probe(key, alpha, beta)
+        if value is not None:
+            return value
     #
-    v = math.inf
-    for action in actions(board):
-        v = min(v, max_value(result(board, action), alpha, beta))
-        #--Alpha-beta pruning:
-        beta = min(beta, v)
-        if alpha > beta:
-            break
+    #--The opponent threatens a win: block it (every other move loses), or lose anyway if there are two:
+    blocks = [move for move in moves if WINNING[theirs | move]]
+    if len(blocks) > 1:
+        v = -1
+    else:
+        if blocks:
+            order = blocks
+        else:
+            #--Move ordering: this depth's last cutoff move first, then moves that have cut off most often
+            #  (centre, corners, edges breaking ties), so alpha-beta finds its cutoffs early:
+            ply = COUNTS[mine | theirs]
+            order = sorted(moves, key=history.__getitem__, reverse=True)
+            if killers[ply] & empty:
+                order.remove(killers[ply])
+                order.insert(0, killers[ply])
+        v = -math.inf
+        for move in order:
+            #--Imagine what the other player will think while optimizing their game (they maximize their score, minus yours) [recursion]:
+            v = max(v, -_negamax(theirs, mine | move, -beta, -alpha))
+            #--Alpha-beta pruning:
+            alpha = max(alpha, v)
+            if alpha >= beta:
+                if not blocks:
+                    killers[ply] = move
+                    history[move] += 1 << COUNTS[empty]
+                break
+    if probed:
+        _store(key, v, *entered)
     return v
 
 